@@ -1,17 +1,26 @@
 import argparse
 import os
+import shutil
+import sys
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
 from colorama import Fore, init
 
-from aspm_cli.scan.sast import SASTScanner
-from aspm_cli.scan.sq_sast import SQSASTScanner
-from aspm_cli.utils.git import GitInfo
-from .utils import ConfigValidator, ALLOWED_SCAN_TYPES, upload_results, handle_failure
-from .scan import IaCScanner
+from aspm_cli.utils.git import GitInfo, GitSnapshot
+from .utils import handle_failure, prefetch_images
+from .scan.registry import BUILTIN_SCANNERS, is_registered, load_scanner, plugin_scanners, scanner_names
+from .utils.backends import BACKEND_CHOICES, backend_for, selected_backend
+from .utils.cache import ResultCache
+from .utils.profiler import Profiler
+from .utils.run_controller import STOPPED_EXIT_CODES, RunCancelled, RunController
 from .utils.spinner import Spinner
 from .utils.logger import Logger
 
 init(autoreset=True)
 
+# Ways to split an IaC scan into parallel Checkov containers (--shard-by)
+SHARD_MODES = ("directory", "framework", "both")
+
 def clean_env_vars():
     """Removes surrounding quotes from all environment variables."""
     for key, value in os.environ.items():
@@ -34,84 +43,627 @@ def print_env(args):
     except Exception as e:
         Logger.get_logger().error(f"Error printing environment variables: {e}")
 
+def build_scanner(scantype, args, validator):
+    """Validate the arguments for a scan type and return its scanner and upload data type."""
+    scanner_class = load_scanner(scantype)
+    if scanner_class is None:
+        return None, None
+    return scanner_class.from_args(args, validator), scanner_class.data_type
+
+def get_accuknox_config():
+    return {
+        "accuknox_endpoint": os.getenv("ACCUKNOX_ENDPOINT"),
+        "accuknox_tenant": os.getenv("ACCUKNOX_TENANT"),
+        "accuknox_label": os.getenv("ACCUKNOX_LABEL"),
+        "accuknox_token": os.getenv("ACCUKNOX_TOKEN")
+    }
+
+def apply_git_defaults(args, snapshot=None):
+    """Fill in Git metadata arguments that were not passed on the command line."""
+    snapshot = snapshot or GitInfo.snapshot()
+    for attr, field in (("repo_url", "repo_url"), ("repo_branch", "branch"), ("branch", "branch"),
+                        ("commit_sha", "commit_sha"), ("commit_ref", "commit_ref")):
+        if hasattr(args, attr) and getattr(args, attr) is None:
+            setattr(args, attr, getattr(snapshot, field))
+
+def get_baseline_store(args):
+    """Baseline of previous results for --delta-upload, keyed by repository and branch."""
+    if not args.delta_upload:
+        return None
+    from .utils.baseline import BaselineStore
+    branch = getattr(args, "repo_branch", None) or getattr(args, "branch", None) or getattr(args, "commit_ref", None)
+    return BaselineStore(args.repo_url, branch)
+
+def _prepare_upload(result_file, baseline):
+    """Return (file to upload, callback to run once it is uploaded)."""
+    if baseline is None:
+        return result_file, lambda: None
+    from .utils.baseline import prepare_delta_upload
+    try:
+        return prepare_delta_upload(result_file, baseline)
+    except Exception as e:
+        Logger.get_logger().warning(f"Unable to compute the delta for {result_file} ({e}), uploading the full result.")
+        return result_file, lambda: None
+
+def spool_result_files(result_file, accuknox_config, data_type, baseline=None):
+    """Copy a scanner's result files to the upload spool and upload them in the background.
+
+    Returns {"file", "spooled": entry id} per file, shaped like upload_result_files.
+    """
+    from .utils.spool import SpoolFlusher, UploadSpool
+    spool = UploadSpool()
+    results = []
+    for path in (result_file if isinstance(result_file, list) else [result_file]):
+        upload_file, on_uploaded = _prepare_upload(path, baseline)
+        try:
+            entry_id = spool.add(upload_file, accuknox_config["accuknox_endpoint"], accuknox_config["accuknox_tenant"], accuknox_config["accuknox_label"], data_type)
+        except OSError as e:
+            Logger.get_logger().error(f"Unable to spool {upload_file} for upload: {e}")
+            results.append({"file": path, "error": str(e)})
+            continue
+        Logger.get_logger().info(f"Spooled {upload_file} for upload.")
+        SpoolFlusher.get().submit(spool, entry_id, accuknox_config["accuknox_token"], on_uploaded)
+        results.append({"file": path, "spooled": entry_id})
+    return results if isinstance(result_file, list) else results[0]
+
+def upload_result_files(result_file, accuknox_config, data_type, baseline=None, spool=False):
+    """Upload a scanner's result: a single file, or a list of files uploaded concurrently.
+
+    With a baseline store, only the findings added, changed or removed since the
+    last successful upload are sent. With spool, the files go through the
+    on-disk upload spool instead (see spool_result_files).
+    """
+    from .utils import get_uploader, upload_results
+    if spool:
+        return spool_result_files(result_file, accuknox_config, data_type, baseline)
+    if not isinstance(result_file, list):
+        upload_file, on_uploaded = _prepare_upload(result_file, baseline)
+        stats = upload_results(upload_file, accuknox_config["accuknox_endpoint"], accuknox_config["accuknox_tenant"], accuknox_config["accuknox_label"], accuknox_config["accuknox_token"], data_type)
+        if stats:
+            on_uploaded()
+        return stats
+
+    prepared = [_prepare_upload(path, baseline) for path in result_file]
+    uploader = get_uploader(accuknox_config["accuknox_endpoint"], accuknox_config["accuknox_tenant"], accuknox_config["accuknox_token"], accuknox_config["accuknox_label"])
+    results = uploader.upload_many([(path, data_type, None) for path, _ in prepared])
+    for (_, on_uploaded), stats in zip(prepared, results):
+        if "error" not in stats:
+            on_uploaded()
+    uploaded = [stats for stats in results if "error" not in stats]
+    Logger.get_logger().info(f"Uploaded {len(uploaded)} of {len(results)} result files.")
+    return results
+
+def index_result_files(result_file, args):
+    """Add a scan's result files to the local findings index when --index-findings is set."""
+    if not args.index_findings:
+        return
+    from .utils.findings_index import FindingsIndex
+    index = FindingsIndex()
+    branch = getattr(args, "repo_branch", None) or getattr(args, "branch", None)
+    commit_sha = getattr(args, "commit_sha", None) or GitInfo.snapshot().commit_sha
+    for path in (result_file if isinstance(result_file, list) else [result_file]):
+        try:
+            index.ingest(path, getattr(args, "repo_url", None), branch, commit_sha)
+        except Exception as e:
+            Logger.get_logger().warning(f"Unable to index {path}: {e}")
+
 def run_scan(args):
     """Run the specified scan type."""
+    # pydantic and requests are only imported once a scan actually runs
+    from .utils import ConfigValidator
     try:
+        apply_git_defaults(args)
         softfail = args.softfail
-        accuknox_config = {
-            "accuknox_endpoint": os.getenv("ACCUKNOX_ENDPOINT"),
-            "accuknox_tenant": os.getenv("ACCUKNOX_TENANT"),
-            "accuknox_label": os.getenv("ACCUKNOX_LABEL"),
-            "accuknox_token": os.getenv("ACCUKNOX_TOKEN")
-        }
+        accuknox_config = get_accuknox_config()
         
         # Validate configurations
         validator = ConfigValidator(args.scantype.lower(), **accuknox_config, softfail=softfail)
 
         # Select scan type and run respective scanner
-        if args.scantype.lower() == "iac":
-            validator.validate_iac_scan(args.repo_url, args.repo_branch, args.file, args.directory, args.compact, args.quiet, args.framework)
-            scanner = IaCScanner(args.repo_url, args.repo_branch, args.file, args.directory, args.compact, args.quiet, args.framework)
-            data_type = "IAC"
-        elif args.scantype.lower() == "sast":
-            validator.validate_sast_scan(args.repo_url, args.commit_ref, args.commit_sha, args.pipeline_id, args.job_url)
-            scanner = SASTScanner(args.repo_url, args.commit_ref, args.commit_sha, args.pipeline_id, args.job_url)
-            data_type = "SQ"
-        elif args.scantype.lower() == "sq-sast":
-            print(args.skip_sonar_scan)
-            validator.validate_sq_sast_scan(args.sonar_project_key, args.sonar_token, args.sonar_host_url, args.sonar_org_id, args.repo_url, args.branch, args.commit_sha, args.pipeline_url)
-            scanner = SQSASTScanner(args.skip_sonar_scan, args.sonar_project_key, args.sonar_token, args.sonar_host_url, args.sonar_org_id, args.repo_url, args.branch, args.commit_sha, args.pipeline_url)
-            data_type = "SQ"
-        else:
+        scanner, data_type = build_scanner(args.scantype.lower(), args, validator)
+        if scanner is None:
             Logger.get_logger().error("Invalid scan type.")
             return
 
         # Run scan with spinner
         spinner = Spinner(message=f"Running {args.scantype.lower()} scan...", color=Fore.GREEN)
+        scanner.on_status = lambda status: spinner.update(f"Running {args.scantype.lower()} scan... {status}")
         spinner.start()
-        exit_code, result_file = scanner.run()
+        with Profiler.phase(f"scan:{args.scantype.lower()}"):
+            exit_code, result_file = scanner.run()
         spinner.stop()
 
         # Upload results and handle failure
         if result_file:
-            upload_results(result_file, accuknox_config["accuknox_endpoint"], accuknox_config["accuknox_tenant"], accuknox_config["accuknox_label"], accuknox_config["accuknox_token"], data_type)
+            index_result_files(result_file, args)
+            upload_result_files(result_file, accuknox_config, data_type, get_baseline_store(args), args.spool)
         handle_failure(exit_code, softfail)
     except Exception as e:
         Logger.get_logger().error("Scan failed.")
         Logger.get_logger().error(e)
 
+def _run_and_upload(scantype, scanner, data_type, accuknox_config, args):
+    """Run a single scanner and upload its result as soon as it finishes."""
+    controller = RunController.get()
+    Logger.get_logger().info(f"Running {scantype} scan...")
+    try:
+        with Profiler.phase(f"scan:{scantype}"):
+            exit_code, result_file = scanner.run()
+    except RunCancelled:
+        Logger.get_logger().info(f"{scantype} scan cancelled.")
+        return 1
+    except Exception as e:
+        Logger.get_logger().error(f"{scantype} scan failed: {e}")
+        controller.fail(scantype, str(e))
+        return 1
+    if controller.cancelled.is_set() and controller.failure[0] != scantype:
+        # Stopped part-way; its result is incomplete
+        Logger.get_logger().info(f"{scantype} scan stopped, not uploading its result.")
+        return exit_code or 1
+    Logger.get_logger().info(f"{scantype} scan finished with exit code {exit_code}.")
+    if exit_code != 0 and not args.softfail:
+        controller.fail(scantype, f"exit code {exit_code}")
+
+    if result_file:
+        index_result_files(result_file, args)
+        with controller.acting_for(scantype):
+            upload_result_files(result_file, accuknox_config, data_type, get_baseline_store(args), args.spool)
+    return exit_code
+
+def run_all_scans(args):
+    """Run the selected scan types in parallel, one worker per scanner."""
+    from .utils import ConfigValidator
+    try:
+        apply_git_defaults(args)
+        softfail = args.softfail
+        accuknox_config = get_accuknox_config()
+        # The "all" parser only exposes --repo-branch; sq-sast reads it as --branch
+        args.branch = args.repo_branch
+
+        scantypes = [s.strip().lower() for s in args.scantypes.split(",") if s.strip()]
+        invalid = [s for s in scantypes if s not in scanner_names()]
+        if not scantypes or invalid:
+            Logger.get_logger().error(f"Invalid scan types: {', '.join(invalid) or args.scantypes}. Allowed values: {', '.join(scanner_names())}.")
+            return
+
+        # Validate everything up front so that no scanner starts on a bad configuration
+        scanners = {}
+        for scantype in dict.fromkeys(scantypes):
+            validator = ConfigValidator(scantype, **accuknox_config, softfail=softfail)
+            scanners[scantype] = build_scanner(scantype, args, validator)
+
+        exit_codes = {}
+        with ThreadPoolExecutor(max_workers=len(scanners)) as executor:
+            futures = {
+                executor.submit(_run_and_upload, scantype, scanner, data_type, accuknox_config, args): scantype
+                for scantype, (scanner, data_type) in scanners.items()
+            }
+            for future in as_completed(futures):
+                exit_codes[futures[future]] = future.result()
+
+        for scantype in scanners:
+            Logger.get_logger().info(f"{scantype}: exit code {exit_codes[scantype]}")
+        if RunController.get().report():
+            exit(1)
+        exit_code = next((code for code in exit_codes.values() if code != 0), 0)
+        handle_failure(exit_code, softfail)
+    except Exception as e:
+        Logger.get_logger().error("Scan failed.")
+        Logger.get_logger().error(e)
+
+def build_job_args(job, args):
+    """Arguments for a batch job: the scan's command line defaults with the manifest overrides applied."""
+    parser = argparse.ArgumentParser(add_help=False)
+    add_arguments = SCAN_ARGUMENTS.get(job.scantype) or getattr(load_scanner(job.scantype), "add_arguments", None)
+    if add_arguments:
+        add_arguments(parser)
+    job_args = parser.parse_args([])
+    for key, value in job.overrides.items():
+        attr = key.lstrip("-").replace("-", "_")
+        if not hasattr(job_args, attr):
+            raise ValueError(f"Job {job.name}: unknown {job.scantype} option '{key}'")
+        setattr(job_args, attr, value)
+    job_args.scantype = job.scantype
+    job_args.softfail = args.softfail
+    job_args.delta_upload = args.delta_upload
+    job_args.index_findings = args.index_findings
+    job_args.spool = args.spool
+    job_args.spool_wait = args.spool_wait
+    apply_git_defaults(job_args, GitSnapshot(job.path))
+    return job_args
+
+def _run_batch_job(job, scanner, data_type, accuknox_config, output_dir, job_args):
+    """Run one batch job in a worker process from the job's directory and upload its result."""
+    started = time.perf_counter()
+    outcome = {"name": job.name, "path": job.path, "scantype": job.scantype, "result_files": []}
+    try:
+        os.chdir(job.path)
+        # Worker processes are reused; Git metadata belongs to the previous job's directory,
+        # and CI variables only describe the job if it scans the CI checkout
+        GitInfo.use_snapshot(GitSnapshot(job.path))
+        exit_code, result_file = scanner.run()
+        if exit_code in STOPPED_EXIT_CODES and os.getenv("ASPM_RUN_ID"):
+            # Stopped by --fail-fast from the parent; the result is incomplete
+            for path in (result_file if isinstance(result_file, list) else [result_file] if result_file else []):
+                if os.path.exists(path):
+                    os.remove(path)
+            outcome.update(status="cancelled", exit_code=exit_code, seconds=round(time.perf_counter() - started, 3))
+            return outcome
+        job_output = os.path.join(output_dir, job.name)
+        os.makedirs(job_output, exist_ok=True)
+        for path in (result_file if isinstance(result_file, list) else [result_file] if result_file else []):
+            target = os.path.join(job_output, os.path.basename(path))
+            shutil.move(path, target)
+            outcome["result_files"].append(target)
+        if outcome["result_files"]:
+            moved = outcome["result_files"] if isinstance(result_file, list) else outcome["result_files"][0]
+            index_result_files(moved, job_args)
+            uploaded = upload_result_files(moved, accuknox_config, data_type, get_baseline_store(job_args), job_args.spool)
+            uploaded = uploaded if isinstance(uploaded, list) else [uploaded]
+            if job_args.spool:
+                from .utils.spool import SpoolFlusher
+                # The worker moves on to the next job afterwards; what is left stays spooled
+                left = SpoolFlusher.get().wait([stats["spooled"] for stats in uploaded if "spooled" in stats], job_args.spool_wait)
+                outcome["spooled"] = sorted(left)
+            outcome["uploaded"] = all(stats and "error" not in stats for stats in uploaded) and not outcome.get("spooled")
+        outcome.update(status="passed" if exit_code == 0 else "failed", exit_code=exit_code)
+    except (Exception, SystemExit) as e:
+        Logger.get_logger().error(f"Batch job {job.name} failed: {e}")
+        outcome.update(status="error", exit_code=1, error=str(e))
+    outcome["seconds"] = round(time.perf_counter() - started, 3)
+    return outcome
+
+def run_batch(args):
+    """Run the scans listed in a manifest on a pool of worker processes."""
+    from .utils import ConfigValidator
+    from concurrent.futures import ProcessPoolExecutor
+    from .utils.batch import load_manifest, write_report
+    started = time.perf_counter()
+    try:
+        jobs, manifest_concurrency = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        Logger.get_logger().error(f"Invalid batch manifest {args.manifest}: {e}")
+        exit(1)
+
+    # Workers change directory per job, so every path they use must be absolute
+    output_dir = os.path.abspath(args.output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    if os.getenv("ASPM_CACHE_DIR"):
+        os.environ["ASPM_CACHE_DIR"] = os.path.abspath(os.environ["ASPM_CACHE_DIR"])
+    accuknox_config = get_accuknox_config()
+
+    # Validate every job up front, sharing one validated AccuKnox configuration per scan type
+    validators = {}
+    scanners = {}
+    for job in jobs:
+        if not is_registered(job.scantype):
+            Logger.get_logger().error(f"Job {job.name}: invalid scan type {job.scantype}. Allowed values: {', '.join(scanner_names())}.")
+            exit(1)
+        if job.scantype not in validators:
+            validators[job.scantype] = ConfigValidator(job.scantype, **accuknox_config, softfail=args.softfail)
+        try:
+            job_args = build_job_args(job, args)
+            scanners[job.name] = build_scanner(job.scantype, job_args, validators[job.scantype]) + (job_args,)
+        except ValueError as e:
+            Logger.get_logger().error(str(e))
+            exit(1)
+        except SystemExit:
+            Logger.get_logger().error(f"Job {job.name}: invalid configuration.")
+            raise
+
+    # Pull each image once before the workers start
+    images = {value for scanner, _, _ in scanners.values() if getattr(scanner, "skip_sonar_scan", False) is not True
+              for name, value in vars(type(scanner)).items() if name.endswith("_image")}
+    for image, error in prefetch_images(sorted(images)).items():
+        if error:
+            Logger.get_logger().warning(f"{image}: {error}")
+
+    concurrency = max(1, args.concurrency or manifest_concurrency or os.cpu_count() or 1)
+    Logger.get_logger().info(f"Running {len(jobs)} batch job(s) with up to {concurrency} worker(s)")
+    outcomes = {}
+    with ProcessPoolExecutor(max_workers=min(concurrency, len(jobs))) as executor:
+        futures = {
+            executor.submit(_run_batch_job, job, scanner, data_type, accuknox_config, output_dir, job_args): job
+            for job in jobs
+            for scanner, data_type, job_args in [scanners[job.name]]
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            outcome = {"name": job.name, "path": job.path, "scantype": job.scantype, "result_files": [], "seconds": None}
+            try:
+                outcome = future.result()
+            except CancelledError:
+                outcome.update(status="cancelled", exit_code=None)
+            except Exception as e:
+                outcome.update(status="error", exit_code=1, error=str(e))
+            outcomes[job.name] = outcome
+            Logger.get_logger().info(f"{job.name}: {outcome['status']} (exit code {outcome['exit_code']}) in {outcome['seconds']}s")
+            if outcome["status"] in ("failed", "error") and not args.softfail and not RunController.get().cancelled.is_set():
+                RunController.get().fail(job.name, outcome.get("error") or f"exit code {outcome['exit_code']}")
+                if RunController.get().fail_fast:
+                    for pending in futures:
+                        pending.cancel()
+
+    report = write_report(args.report or os.path.join(output_dir, "batch-report.json"),
+                          [outcomes[job.name] for job in jobs], started)
+    summary = report["summary"]
+    Logger.get_logger().info(f"{summary['passed']} passed, {summary['failed']} failed, {summary['errors']} error(s), "
+                             f"{summary['cancelled']} cancelled in {summary['seconds']:.1f}s")
+    if RunController.get().report():
+        exit(1)
+    exit_code = next((outcome["exit_code"] for outcome in report["jobs"] if outcome["exit_code"]), 0)
+    handle_failure(exit_code, args.softfail)
+
+def warmup(args):
+    """Pre-pull every scanner image in parallel."""
+    images = [load_scanner("iac").checkov_image, load_scanner("sast").opengrep_image, load_scanner("sq-sast").sast_image]
+    spinner = Spinner(message="Pulling scanner images...", color=Fore.GREEN)
+    spinner.start()
+    errors = prefetch_images(images, force=args.force)
+    spinner.stop()
+
+    for image, error in errors.items():
+        if error:
+            Logger.get_logger().error(f"{image}: {error}")
+        else:
+            Logger.get_logger().info(f"{image}: ready ({backend_for(image).name})")
+    if any(errors.values()):
+        exit(1)
+
+def upload_artifacts(args):
+    """Upload existing result files to AccuKnox in one invocation."""
+    from .utils import get_uploader
+    accuknox_config = get_accuknox_config()
+    missing = [key.upper() for key, value in accuknox_config.items() if not value]
+    if missing:
+        Logger.get_logger().error(f"Missing configuration: {', '.join(missing)}")
+        exit(1)
+
+    jobs = []
+    for artifact in args.artifact:
+        parts = artifact.split(":")
+        if len(parts) not in (2, 3) or not parts[0] or not parts[1]:
+            Logger.get_logger().error(f"Invalid artifact '{artifact}'. Expected FILE:DATA_TYPE[:LABEL].")
+            exit(1)
+        jobs.append((parts[0], parts[1], parts[2] if len(parts) == 3 else None))
+
+    uploader = get_uploader(accuknox_config["accuknox_endpoint"], accuknox_config["accuknox_tenant"], accuknox_config["accuknox_token"], accuknox_config["accuknox_label"])
+    results = uploader.upload_many(jobs, max_workers=args.concurrency)
+
+    for stats in results:
+        if "error" in stats:
+            Logger.get_logger().error(f"{stats['file']}: failed")
+        else:
+            Logger.get_logger().info(f"{stats['file']}: uploaded {stats['raw_bytes']} bytes in {stats['seconds']:.2f}s (status {stats['status_code']}, {stats['retries']} retries)")
+    if any("error" in stats for stats in results):
+        exit(1)
+
+def flush_spool(args):
+    """Upload the results waiting in the upload spool, oldest first."""
+    from .utils.spool import UploadSpool
+    spool = UploadSpool(args.spool_dir)
+    if args.list:
+        entries = spool.entries()
+        for entry in entries:
+            error = f", last error: {entry['last_error']}" if entry.get("last_error") else ""
+            Logger.get_logger().info(f"{entry['id']}: {entry['file']} ({entry['data_type']}, {entry['size']} bytes) for tenant {entry['tenant_id']} "
+                                     f"at {entry['endpoint']}, {entry['attempts']} failed attempt(s){error}")
+        Logger.get_logger().info(f"{len(entries)} result(s) spooled, {sum(entry['size'] for entry in entries)} bytes.")
+        return
+
+    # The spool never stores tokens
+    token = get_accuknox_config()["accuknox_token"]
+    if not token:
+        Logger.get_logger().error("Missing configuration: ACCUKNOX_TOKEN")
+        exit(1)
+
+    from .utils.upload import UploadSettings
+    settings = UploadSettings()
+    deadline = time.monotonic() + args.wait
+    attempt = 0
+    while True:
+        uploaded, failed = spool.flush(token)
+        for entry in uploaded:
+            stats = entry["stats"]
+            Logger.get_logger().info(f"{entry['file']} ({entry['id']}): uploaded {stats['raw_bytes']} bytes in {stats['seconds']:.2f}s "
+                                     f"(status {stats['status_code']}, {stats['retries']} retries)")
+        delay = settings.backoff_delay(attempt)
+        if not failed or time.monotonic() + delay >= deadline:
+            break
+        attempt += 1
+        Logger.get_logger().warning(f"{len(failed)} spooled upload(s) failed, retrying in {delay:.1f}s...")
+        time.sleep(delay)
+
+    for entry in failed:
+        Logger.get_logger().error(f"{entry['file']} ({entry['id']}): {entry['error']}")
+    Logger.get_logger().info(f"{len(spool.entries())} result(s) left in the upload spool.")
+    if failed:
+        exit(1)
+
+def add_result_cache_args(parser):
+    parser.add_argument("--no-cache", action="store_true", help="Do not use or populate the local scan result cache")
+
+def prune_cache(args):
+    """Evict scan results from the local result cache."""
+    cache = ResultCache()
+    evicted = cache.prune(0 if args.all else (args.max_mb * 1024 * 1024 if args.max_mb is not None else None))
+    remaining = cache.entries()
+    Logger.get_logger().info(f"Evicted {evicted} cached result(s); {len(remaining)} remaining ({sum(size for _, size, _ in remaining)} bytes).")
+
+def ingest_findings(args):
+    """Add existing result files to the local findings index."""
+    from .utils.findings_index import FindingsIndex
+    index = FindingsIndex(args.db)
+    failed = False
+    for result_file in args.result_file:
+        try:
+            index.ingest(result_file, args.repo_url, args.branch, args.commit_sha)
+        except (OSError, ValueError) as e:
+            Logger.get_logger().error(f"Unable to index {result_file}: {e}")
+            failed = True
+    if failed:
+        exit(1)
+
+def _print_findings(rows, as_json):
+    import json
+    if as_json:
+        print(json.dumps(rows, indent=2))
+        return
+    for row in rows:
+        location = f"{row['file']}:{row['line']}" if row["line"] is not None else row["file"]
+        print(f"{row['scanner']:<10} {row['severity'] or '-':<8} {row['check_id'] or '-':<24} {location or '-'}"
+              f"{' ' + row['resource'] if row['resource'] else ''}")
+
+def query_findings(args):
+    """Filter, count or diff findings in the local findings index."""
+    from .utils.findings_index import FindingsIndex
+    index = FindingsIndex(args.db)
+    filters = {
+        "scanner": args.scanner,
+        "status": None if args.status == "all" else args.status,
+        "severity": args.severity,
+        "check_id": args.check_id,
+        "file": args.file,
+        "resource": args.resource,
+        "repo": args.repo_url,
+        "commit_sha": args.commit_sha,
+    }
+    started = time.perf_counter()
+    if args.diff:
+        result = index.diff(args.diff[0], args.diff[1], filters, None if args.count else args.limit)
+        if args.count:
+            print(f"added: {len(result['added'])}, removed: {len(result['removed'])}")
+        elif args.json:
+            _print_findings(result, True)
+        else:
+            for key in ("added", "removed"):
+                print(f"{key} ({len(result[key])}):")
+                _print_findings(result[key], False)
+    elif args.count or args.group_by:
+        result = index.count(filters, args.group_by)
+        if args.json:
+            _print_findings(result if args.group_by is None else [{"value": value, "count": count} for value, count in result], True)
+        elif args.group_by:
+            for value, count in result:
+                print(f"{count:>8}  {value if value is not None else '-'}")
+        else:
+            print(result)
+    else:
+        _print_findings(index.query(filters, args.limit), args.json)
+    Logger.get_logger().debug(f"Findings query took {(time.perf_counter() - started) * 1000:.1f}ms")
+
+def serve(args):
+    """Run or control the warm scanner daemon."""
+    from .utils.scanner_daemon import ScannerDaemon, DaemonClient
+    client = DaemonClient(args.socket)
+    if args.stop:
+        if client.available():
+            client.request({"op": "shutdown"})
+            Logger.get_logger().info("Scanner daemon stopped.")
+        else:
+            Logger.get_logger().info("No scanner daemon is running.")
+        return
+    if args.status:
+        if client.available():
+            status = client.request({"op": "ping"})
+            Logger.get_logger().info(f"Scanner daemon is running on {client.path}: {len(status['containers'])} warm container(s), {status['active_jobs']} active job(s).")
+        else:
+            Logger.get_logger().info("No scanner daemon is running.")
+            exit(1)
+        return
+    try:
+        ScannerDaemon(args.socket, idle_timeout=args.idle_timeout).serve_forever()
+    except KeyboardInterrupt:
+        pass
+
 def add_iac_scan_args(parser):
     """Add arguments specific to IAC scan."""
+    add_result_cache_args(parser)
     parser.add_argument("--file", default="", help="Specify a file for scanning; cannot be used with directory input")
     parser.add_argument("--directory", default="./", help="Directory with infrastructure code and/or package manager files to scan")
     parser.add_argument("--compact", action="store_true", help="Do not display code blocks in output")
     parser.add_argument("--quiet", action="store_true", help="Display only failed checks")
     parser.add_argument("--framework", default="all", help="Filter scans by specific frameworks, e.g., --framework terraform,sca_package. For all frameworks, use --framework all")
-    parser.add_argument("--repo-url", default=GitInfo.get_repo_url(), help="Git repository URL")
-    parser.add_argument("--repo-branch", default=GitInfo.get_branch_name(), help="Git repository branch")
+    parser.add_argument("--base-ref", help="Only scan files changed since this Git ref and reuse cached findings for the rest")
+    parser.add_argument("--shard-by", choices=SHARD_MODES, help="Split the scan into parallel Checkov containers by top-level subdirectory, framework, or both")
+    parser.add_argument("--workers", type=int, help="Maximum number of parallel Checkov shards (default: number of CPUs)")
+    parser.add_argument("--repo-url", help="Git repository URL (default: detected from CI environment or Git metadata)")
+    parser.add_argument("--repo-branch", help="Git repository branch (default: detected from CI environment or Git metadata)")
 
 def add_sast_scan_args(parser):
     """Add arguments specific to SAST scan."""
-    parser.add_argument("--repo-url", default=GitInfo.get_repo_url(), help="Git repository URL")
-    parser.add_argument("--commit-ref", default=GitInfo.get_commit_ref(), help="Commit reference for scanning")
-    parser.add_argument("--commit-sha", default=GitInfo.get_commit_sha(), help="Commit SHA for scanning")
+    add_result_cache_args(parser)
+    parser.add_argument("--repo-url", help="Git repository URL (default: detected from CI environment or Git metadata)")
+    parser.add_argument("--commit-ref", help="Commit reference for scanning (default: detected from CI environment or Git metadata)")
+    parser.add_argument("--commit-sha", help="Commit SHA for scanning (default: detected from CI environment or Git metadata)")
     parser.add_argument("--pipeline-id", help="Pipeline ID for scanning")
     parser.add_argument("--job-url", help="Job URL for scanning")
+    parser.add_argument("--base-ref", help="Only scan files changed since this Git ref and reuse cached findings for the rest")
 
 def add_sq_sast_scan_args(parser):
     """Add arguments specific to SQ SAST scan."""
     # TODO: update description
     parser.add_argument('--skip-sonar-scan', action='store_true', help="Skip the SonarQube scan")
-    parser.add_argument("--sonar-project-key", help="")
+    parser.add_argument("--sonar-project-key", help="SonarQube project key; a comma separated list fetches several projects concurrently (requires --skip-sonar-scan)")
+    parser.add_argument("--sonar-max-in-flight", type=int, help="Maximum number of SonarQube projects fetched at once (default: ASPM_SQ_MAX_IN_FLIGHT or 4)")
+    parser.add_argument("--sonar-delta", action="store_true", help="Only include findings updated since the last successful fetch of each project")
     parser.add_argument("--sonar-token", help="")
     parser.add_argument("--sonar-host-url", help="")
     parser.add_argument("--sonar-org-id", help="")
 
-    parser.add_argument("--repo-url", default=GitInfo.get_repo_url(), help="Git repository URL")
-    parser.add_argument("--branch", default=GitInfo.get_branch_name(), help="Git repository branch")
-    parser.add_argument("--commit-sha", default=GitInfo.get_commit_sha(), help="Commit SHA for scanning")
+    parser.add_argument("--repo-url", help="Git repository URL (default: detected from CI environment or Git metadata)")
+    parser.add_argument("--branch", help="Git repository branch (default: detected from CI environment or Git metadata)")
+    parser.add_argument("--commit-sha", help="Commit SHA for scanning (default: detected from CI environment or Git metadata)")
     parser.add_argument("--pipeline-url", help="Pipeline URL for scanning")
 
+def add_all_scan_args(parser):
+    """Add arguments for running several scan types together."""
+    add_result_cache_args(parser)
+    parser.add_argument("--scantypes", default="iac,sast", help=f"Comma separated scan types to run in parallel (e.g. {','.join(BUILTIN_SCANNERS)})")
+
+    # IAC
+    parser.add_argument("--file", default="", help="Specify a file for scanning; cannot be used with directory input")
+    parser.add_argument("--directory", default="./", help="Directory with infrastructure code and/or package manager files to scan")
+    parser.add_argument("--compact", action="store_true", help="Do not display code blocks in output")
+    parser.add_argument("--quiet", action="store_true", help="Display only failed checks")
+    parser.add_argument("--framework", default="all", help="Filter scans by specific frameworks, e.g., --framework terraform,sca_package. For all frameworks, use --framework all")
+    parser.add_argument("--base-ref", help="Only scan files changed since this Git ref and reuse cached findings for the rest")
+    parser.add_argument("--shard-by", choices=SHARD_MODES, help="Split the scan into parallel Checkov containers by top-level subdirectory, framework, or both")
+    parser.add_argument("--workers", type=int, help="Maximum number of parallel Checkov shards (default: number of CPUs)")
+
+    # SAST
+    parser.add_argument("--commit-ref", help="Commit reference for scanning (default: detected from CI environment or Git metadata)")
+    parser.add_argument("--pipeline-id", help="Pipeline ID for scanning")
+    parser.add_argument("--job-url", help="Job URL for scanning")
+
+    # SQ SAST
+    parser.add_argument('--skip-sonar-scan', action='store_true', help="Skip the SonarQube scan")
+    parser.add_argument("--sonar-project-key", help="SonarQube project key; a comma separated list fetches several projects concurrently (requires --skip-sonar-scan)")
+    parser.add_argument("--sonar-max-in-flight", type=int, help="Maximum number of SonarQube projects fetched at once (default: ASPM_SQ_MAX_IN_FLIGHT or 4)")
+    parser.add_argument("--sonar-delta", action="store_true", help="Only include findings updated since the last successful fetch of each project")
+    parser.add_argument("--sonar-token", help="")
+    parser.add_argument("--sonar-host-url", help="")
+    parser.add_argument("--sonar-org-id", help="")
+    parser.add_argument("--pipeline-url", help="Pipeline URL for scanning")
+
+    # Shared
+    parser.add_argument("--repo-url", help="Git repository URL (default: detected from CI environment or Git metadata)")
+    parser.add_argument("--repo-branch", help="Git repository branch (default: detected from CI environment or Git metadata)")
+    parser.add_argument("--commit-sha", help="Commit SHA for scanning (default: detected from CI environment or Git metadata)")
+
+def add_batch_scan_args(parser):
+    """Add arguments for running the scans listed in a manifest."""
+    parser.add_argument("--manifest", required=True, help="YAML (requires PyYAML) or JSON file listing the jobs: path, scan type and option overrides")
+    parser.add_argument("--concurrency", type=int, help="Maximum number of jobs running at once (default: the manifest's concurrency or the number of CPUs)")
+    parser.add_argument("--output-dir", default="aspm-batch", help="Directory receiving each job's result files, one subdirectory per job")
+    parser.add_argument("--report", help="Path of the aggregated JSON report (default: <output-dir>/batch-report.json)")
+
+# Option definitions per scan type, reused for batch manifest overrides
+SCAN_ARGUMENTS = {
+    "iac": add_iac_scan_args,
+    "sast": add_sast_scan_args,
+    "sq-sast": add_sq_sast_scan_args,
+}
 
 def main():
     clean_env_vars()
@@ -120,13 +672,88 @@ def main():
     subparsers = parser.add_subparsers(dest="command")
 
     parser.add_argument('--softfail', action='store_true', help='Enable soft fail mode for scanning')
+    parser.add_argument('--delta-upload', action='store_true', default=os.getenv("ACCUKNOX_UPLOAD_DELTA", "FALSE").upper() == "TRUE",
+                        help='Upload only findings added, changed or removed since the last upload for this repository and branch (default: ACCUKNOX_UPLOAD_DELTA)')
+    parser.add_argument('--index-findings', action='store_true', default=os.getenv("ASPM_FINDINGS_INDEX", "FALSE").upper() == "TRUE",
+                        help='Add scan results to the local findings index queried with `findings query` (default: ASPM_FINDINGS_INDEX)')
+    parser.add_argument('--fail-fast', action='store_true', help='Stop the other scans and pending uploads as soon as one scan fails')
+    parser.add_argument('--spool', action='store_true', default=os.getenv("ACCUKNOX_UPLOAD_SPOOL", "FALSE").upper() == "TRUE",
+                        help='Write results to the on-disk upload spool and upload them in the background; whatever is not uploaded by the end of the run is kept for `aspm-cli flush` (default: ACCUKNOX_UPLOAD_SPOOL)')
+    parser.add_argument('--spool-wait', type=float, default=float(os.getenv("ACCUKNOX_UPLOAD_SPOOL_WAIT", "300")),
+                        help='With --spool, seconds to wait at the end of the run for spooled uploads; 0 exits as soon as results are spooled (default: ACCUKNOX_UPLOAD_SPOOL_WAIT or 300)')
+    parser.add_argument('--backend', choices=BACKEND_CHOICES, default=selected_backend(),
+                        help='Run scanners with local binaries (native), Podman or Docker; auto picks a matching local binary, then Docker, then Podman (default: ASPM_BACKEND or auto)')
+    parser.add_argument('--profile', action='store_true', help='Time each phase and write a summary, profile.json and a Chrome trace')
+    parser.add_argument('--profile-dir', default='aspm-profile', help='Output directory for --profile (default: aspm-profile)')
+    parser.add_argument('--profile-python', action='store_true', help='With --profile, also run cProfile around the Python-side phases')
 
     # Environment validation
     env_parser = subparsers.add_parser("env", help="Validate and print config from environment")
     env_parser.set_defaults(func=print_env)
 
+    # Image warmup
+    warmup_parser = subparsers.add_parser("warmup", help="Pre-pull all scanner images in parallel")
+    warmup_parser.add_argument("--force", action="store_true", help="Pull even if the image is already present locally")
+    warmup_parser.set_defaults(func=warmup)
+
+    # Upload existing results
+    upload_parser = subparsers.add_parser("upload", help="Upload existing result files to AccuKnox")
+    upload_parser.add_argument("--artifact", action="append", required=True, help="Result file to upload as FILE:DATA_TYPE[:LABEL], e.g. results.json:SQ. Can be repeated")
+    upload_parser.add_argument("--concurrency", type=int, help="Maximum number of parallel uploads (default: ACCUKNOX_UPLOAD_CONCURRENCY or 4)")
+    upload_parser.set_defaults(func=upload_artifacts)
+
+    # Upload spool
+    flush_parser = subparsers.add_parser("flush", help="Upload the results waiting in the upload spool")
+    flush_parser.add_argument("--wait", type=float, default=0, help="Keep retrying failed uploads for up to this many seconds (default: 0, one pass)")
+    flush_parser.add_argument("--list", action="store_true", help="List the spooled results instead of uploading them")
+    flush_parser.add_argument("--spool-dir", help="Spool directory (default: ASPM_SPOOL_DIR or the cache directory)")
+    flush_parser.set_defaults(func=flush_spool)
+
+    # Result cache
+    cache_parser = subparsers.add_parser("cache", help="Manage the local scan result cache")
+    cache_subparsers = cache_parser.add_subparsers(dest="cache_command")
+    prune_parser = cache_subparsers.add_parser("prune", help="Evict least recently used results")
+    prune_parser.add_argument("--all", action="store_true", help="Remove every cached result")
+    prune_parser.add_argument("--max-mb", type=float, help="Shrink the cache to this size (default: ASPM_RESULT_CACHE_MB or 512)")
+    prune_parser.set_defaults(func=prune_cache)
+
+    # Local findings index
+    findings_parser = subparsers.add_parser("findings", help="Query scan findings in the local SQLite index")
+    findings_subparsers = findings_parser.add_subparsers(dest="findings_command")
+    ingest_parser = findings_subparsers.add_parser("ingest", help="Add existing result files to the index")
+    ingest_parser.add_argument("result_file", nargs="+", help="Checkov, OpenGrep or SonarQube result file")
+    ingest_parser.add_argument("--repo-url", help="Repository the results belong to (default: read from the result file)")
+    ingest_parser.add_argument("--branch", help="Branch the results belong to (default: read from the result file)")
+    ingest_parser.add_argument("--commit-sha", help="Commit the results belong to (default: read from the result file)")
+    ingest_parser.add_argument("--db", help="Index database (default: ASPM_FINDINGS_DB or the aspm-cli cache)")
+    ingest_parser.set_defaults(func=ingest_findings)
+    query_parser = findings_subparsers.add_parser("query", help="Filter, count or diff indexed findings")
+    query_parser.add_argument("--scanner", choices=["checkov", "opengrep", "sonarqube"], help="Only findings of this scanner")
+    query_parser.add_argument("--status", default="failed", choices=["failed", "passed", "skipped", "all"], help="Checkov check status; other scanners only report failures (default: failed)")
+    query_parser.add_argument("--severity", help="Only findings of this severity, e.g. HIGH")
+    query_parser.add_argument("--check-id", help="Only findings of this check or rule id")
+    query_parser.add_argument("--file", help="Only findings in this file, or under this directory when it ends with /")
+    query_parser.add_argument("--resource", help="Only findings on this resource")
+    query_parser.add_argument("--repo-url", help="Only findings of this repository")
+    query_parser.add_argument("--commit-sha", help="Only findings of this commit")
+    query_parser.add_argument("--count", action="store_true", help="Print the number of matching findings")
+    query_parser.add_argument("--group-by", choices=["scanner", "status", "severity", "check_id", "file", "resource", "repo", "commit_sha"], help="Count matching findings per value of this column")
+    query_parser.add_argument("--diff", nargs=2, metavar=("BASE_SHA", "HEAD_SHA"), help="Findings added and removed between two indexed commits")
+    query_parser.add_argument("--limit", type=int, default=100, help="Maximum number of findings to list (default: 100, 0 for all)")
+    query_parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    query_parser.add_argument("--db", help="Index database (default: ASPM_FINDINGS_DB or the aspm-cli cache)")
+    query_parser.set_defaults(func=query_findings)
+
+    # Scanner daemon
+    serve_parser = subparsers.add_parser("serve", help="Keep scanner containers warm and run scans in them via docker exec")
+    serve_parser.add_argument("--socket", help="Unix socket path (default: ASPM_SERVE_SOCKET or the aspm-cli cache directory)")
+    serve_parser.add_argument("--idle-timeout", type=int, default=900, help="Stop after this many seconds without scan jobs")
+    serve_parser.add_argument("--status", action="store_true", help="Report whether a daemon is running")
+    serve_parser.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    serve_parser.set_defaults(func=serve)
+
     # Scan options
-    scan_parser = subparsers.add_parser("scan", help=f"Run a scan (e.g. {', '.join(ALLOWED_SCAN_TYPES)})")
+    scan_parser = subparsers.add_parser("scan", help=f"Run a scan (e.g. {', '.join(BUILTIN_SCANNERS)})")
     scan_subparsers = scan_parser.add_subparsers(dest="scantype")
 
     # IAC Scan
@@ -144,9 +771,40 @@ def main():
     add_sq_sast_scan_args(sq_sast_parser) 
     sq_sast_parser.set_defaults(func=run_scan)
 
+    # Scanners from other packages; entry points are only looked up for scan commands
+    if "scan" in sys.argv[1:]:
+        for name in plugin_scanners():
+            scanner_class = load_scanner(name)
+            plugin_parser = scan_subparsers.add_parser(name, help=f"Run {name} scan")
+            if hasattr(scanner_class, "add_arguments"):
+                scanner_class.add_arguments(plugin_parser)
+            plugin_parser.set_defaults(func=run_scan)
+
+    # Several scans in parallel
+    all_parser = scan_subparsers.add_parser("all", help="Run several scan types in parallel")
+    add_all_scan_args(all_parser)
+    all_parser.set_defaults(func=run_all_scans)
+
+    # Many directories or repositories from a manifest
+    batch_parser = scan_subparsers.add_parser("batch", help="Run the scans listed in a manifest on a worker pool")
+    add_batch_scan_args(batch_parser)
+    batch_parser.set_defaults(func=run_batch)
+
     # Parse arguments and execute respective function
     args = parser.parse_args()
     if hasattr(args, 'func'):
-        args.func(args)
+        # Through the environment so batch workers and the backend lookups see it
+        os.environ["ASPM_BACKEND"] = args.backend
+        if args.profile:
+            Profiler.enable(args.profile_dir, args.profile_python)
+        if args.fail_fast:
+            RunController.enable()
+        try:
+            args.func(args)
+        finally:
+            if args.spool:
+                from .utils.spool import SpoolFlusher
+                SpoolFlusher.get().finish(args.spool_wait)
+            Profiler.get().report()
     else:
         parser.print_help()
\ No newline at end of file
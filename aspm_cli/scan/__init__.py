@@ -1 +1,11 @@
-from .iac import IaCScanner
\ No newline at end of file
+import importlib
+
+# Loaded on first access, so that importing the registry does not import every scanner
+_LAZY_EXPORTS = {
+    "IaCScanner": ".iac",
+}
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
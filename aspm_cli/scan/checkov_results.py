@@ -0,0 +1,122 @@
+import json
+import os
+
+CHECK_LISTS = ("passed_checks", "failed_checks", "skipped_checks")
+CONTAINER_WORKDIR = "/workdir"
+
+def load_reports(path):
+    """Load a Checkov JSON output as a list of reports, dropping summary-only output."""
+    with open(path, 'r') as file:
+        data = json.load(file)
+    if isinstance(data, dict):
+        data = [data]
+    return [report for report in data if isinstance(report, dict) and "check_type" in report]
+
+def checkov_version(reports, default=None):
+    for report in reports:
+        version = report.get("summary", {}).get("checkov_version")
+        if version:
+            return version
+    return default
+
+def record_path(record, base_dir="."):
+    """Path of the file a check belongs to, relative to the working directory."""
+    abs_path = record.get("file_abs_path") or ""
+    if abs_path.startswith(CONTAINER_WORKDIR + "/"):
+        return os.path.normpath(abs_path[len(CONTAINER_WORKDIR) + 1:])
+    # A local (native) Checkov reports host paths
+    cwd = os.getcwd()
+    if os.path.isabs(abs_path) and os.path.commonpath([cwd, abs_path]) == cwd:
+        return os.path.relpath(abs_path, cwd)
+    return os.path.normpath(os.path.join(base_dir, (record.get("file_path") or "").lstrip("/")))
+
+def split_by_file(reports, base_dir="."):
+    """Group check records by file: {path: {check_type: {passed_checks: [...], ...}}}."""
+    per_file = {}
+    for report in reports:
+        check_type = report.get("check_type")
+        for check_list in CHECK_LISTS:
+            for record in report.get("results", {}).get(check_list, []):
+                entry = per_file.setdefault(record_path(record, base_dir), {})
+                entry.setdefault(check_type, {name: [] for name in CHECK_LISTS})[check_list].append(record)
+    return per_file
+
+def _record_identity(record):
+    return json.dumps([
+        record.get("check_id"),
+        record.get("resource"),
+        record.get("file_abs_path") or record.get("file_path"),
+        record.get("file_line_range"),
+    ])
+
+def combine_per_file(per_file_list):
+    """Combine several split_by_file() results, dropping checks reported more than once."""
+    combined = {}
+    seen = set()
+    for per_file in per_file_list:
+        for path, entry in per_file.items():
+            target = combined.setdefault(path, {})
+            for check_type, results in entry.items():
+                target_results = target.setdefault(check_type, {name: [] for name in CHECK_LISTS})
+                for check_list in CHECK_LISTS:
+                    for record in results.get(check_list, []):
+                        key = (path, check_type, check_list, _record_identity(record))
+                        if key not in seen:
+                            seen.add(key)
+                            target_results[check_list].append(record)
+    return combined
+
+def _record_sort_key(record):
+    return (
+        record.get("file_path") or "",
+        record.get("check_id") or "",
+        record.get("resource") or "",
+        tuple(record.get("file_line_range") or ()),
+    )
+
+def merge_reports(per_file, directory=".", version=None):
+    """Build one Checkov output from per-file records, as a scan of `directory` would produce.
+
+    File paths are rebased onto `directory`, checks are ordered deterministically
+    and the summaries are recomputed. Returns a dict for a single check type, a
+    list for several, and Checkov's summary-only output when nothing was found.
+    """
+    merged = {}
+    for path in sorted(per_file):
+        rel_path = "/" + os.path.relpath(path, directory).replace(os.sep, "/")
+        repo_path = "/" + path.replace(os.sep, "/")
+        for check_type, results in per_file[path].items():
+            report = merged.setdefault(check_type, {name: [] for name in CHECK_LISTS})
+            for check_list in CHECK_LISTS:
+                for record in results.get(check_list, []):
+                    report[check_list].append(dict(record, file_path=rel_path, repo_file_path=repo_path))
+
+    reports = []
+    for check_type in sorted(merged):
+        results = merged[check_type]
+        for check_list in CHECK_LISTS:
+            results[check_list].sort(key=_record_sort_key)
+        resources = {
+            (record.get("file_path"), record.get("resource"))
+            for check_list in CHECK_LISTS for record in results[check_list]
+        }
+        reports.append({
+            "check_type": check_type,
+            "results": {**results, "parsing_errors": []},
+            "summary": {
+                "passed": len(results["passed_checks"]),
+                "failed": len(results["failed_checks"]),
+                "skipped": len(results["skipped_checks"]),
+                "parsing_errors": 0,
+                "resource_count": len(resources),
+                "checkov_version": version
+            }
+        })
+
+    if not reports:
+        return {"passed": 0, "failed": 0, "skipped": 0, "parsing_errors": 0, "resource_count": 0, "checkov_version": version}
+    return reports[0] if len(reports) == 1 else reports
+
+def has_failed_checks(output):
+    reports = output if isinstance(output, list) else [output]
+    return any(report.get("results", {}).get("failed_checks") for report in reports)
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import re
+
+CHECKOV_CHECK_LISTS = ("passed_checks", "failed_checks", "skipped_checks")
+
+def _normalize_path(path):
+    path = (path or "").replace("\\", "/")
+    while path.startswith("./") or path.startswith("/"):
+        path = path[2:] if path.startswith("./") else path[1:]
+    return re.sub(r"/+", "/", path)
+
+def _normalize_code(code):
+    return re.sub(r"\s+", " ", code or "").strip()
+
+def _hash(parts):
+    return hashlib.sha256(json.dumps(parts, separators=(',', ':')).encode()).hexdigest()
+
+def record_digest(record, group=None):
+    """Digest of a finding's full content, used to tell changed findings from unchanged ones.
+
+    The group from iter_findings() is part of it: a Checkov check moving from
+    passed_checks to failed_checks keeps its fingerprint but is a change.
+    """
+    content = record if group is None else {"group": group, "record": record}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+def detect_tool(data):
+    """Which scanner produced a result: checkov, opengrep, sonarqube, or None."""
+    items = data if isinstance(data, list) else [data]
+    if any(isinstance(item, dict) and "check_type" in item for item in items):
+        return "checkov"
+    if isinstance(data, dict):
+        if isinstance(data.get("results"), list) and ("paths" in data or "version" in data):
+            return "opengrep"
+        if any(_sonar_list(value) for value in data.values()):
+            return "sonarqube"
+    return None
+
+def _sonar_list(value):
+    return isinstance(value, list) and any(isinstance(item, dict) and "rule" in item and "component" in item for item in value)
+
+def _checkov_findings(data):
+    for report in (data if isinstance(data, list) else [data]):
+        if not isinstance(report, dict) or "check_type" not in report:
+            continue
+        for check_list in CHECKOV_CHECK_LISTS:
+            for record in report.get("results", {}).get(check_list, []):
+                # The resource is the stable location; line numbers only when there is none
+                location = record.get("resource") or (record.get("file_line_range") or [None])[0]
+                parts = ["checkov", report["check_type"], record.get("check_id"), location,
+                         _normalize_path(record.get("repo_file_path") or record.get("file_path"))]
+                yield parts, {"check_type": report["check_type"], "check_list": check_list}, record
+
+def _opengrep_findings(data):
+    for record in data.get("results", []):
+        extra = record.get("extra", {})
+        parts = ["opengrep", record.get("check_id"), _normalize_path(record.get("path")), _normalize_code(extra.get("lines"))]
+        yield parts, {"list": "results"}, record
+
+def _sonarqube_findings(data):
+    for key, value in data.items():
+        if not _sonar_list(value):
+            continue
+        for record in value:
+            # Sonar's line hash survives unrelated edits above the issue; the line number does not
+            location = record.get("hash") or record.get("line")
+            parts = ["sonarqube", record.get("rule"), record.get("component"), location]
+            yield parts, {"list": key}, record
+
+_FINDINGS = {
+    "checkov": _checkov_findings,
+    "opengrep": _opengrep_findings,
+    "sonarqube": _sonarqube_findings,
+}
+
+def iter_findings(data, tool=None):
+    """Yield (fingerprint, group, record) for every finding of a scanner result.
+
+    Fingerprints are built from the check id, resource, file path and a normalized
+    code location, so they stay stable across runs while the finding persists.
+    Identical findings reported more than once are told apart by occurrence.
+    """
+    tool = tool or detect_tool(data)
+    if tool not in _FINDINGS:
+        raise ValueError("Unrecognized scanner result format")
+    seen = {}
+    for parts, group, record in _FINDINGS[tool](data):
+        base = _hash(parts)
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        yield (_hash([base, occurrence]) if occurrence else base), group, record
@@ -1,17 +1,47 @@
-import subprocess
-import json
 import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from aspm_cli.utils import docker_pull
+from aspm_cli.utils.container import ContainerJob, host_user, run_container
+from aspm_cli.utils.cache import FindingsCache, ResultCache, hash_file
+from aspm_cli.utils.backends import image_identity
+from aspm_cli.utils.git import GitInfo
+from aspm_cli.utils.process import progress_handler
+from aspm_cli.utils.result_writer import JsonArrayWriter, append_to_json_array, write_json_array
+from aspm_cli.scan.checkov_results import load_reports, split_by_file, combine_per_file, merge_reports, has_failed_checks, checkov_version
+from aspm_cli.scan.registry import scanner_outputs
 
-from aspm_cli.utils.logger import Logger
+from aspm_cli.utils.logger import Lazy, Logger
+from aspm_cli.utils.profiler import Profiler
+
+class _RawWriter:
+    """Stores streamed Checkov output unchanged."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, data):
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+        if os.path.getsize(self.path) == 0:
+            os.remove(self.path)
+            return None
+        return {"bytes": os.path.getsize(self.path)}
 
 class IaCScanner:
     checkov_image = "ghcr.io/bridgecrewio/checkov:3.2.21"
     output_format = 'json'
-    output_file_path = '.'
-    result_file = f'{output_file_path}/results_json.json'
+    result_file = './results_json.json'
+    # Fall back to a full scan when more than this share of the files has to be rescanned
+    incremental_full_scan_ratio = 0.5
+    data_type = "IAC"
 
-    def __init__(self, repo_url=None, repo_branch=None, file=None, directory=None, compact=False, quiet=False, framework=None):
+    def __init__(self, repo_url=None, repo_branch=None, file=None, directory=None, compact=False, quiet=False, framework=None, base_ref=None, use_cache=True, shard_by=None, workers=None):
         self.file = file
         self.directory = directory
         self.compact = compact
@@ -19,74 +49,268 @@ class IaCScanner:
         self.framework = framework
         self.repo_url = repo_url
         self.repo_branch = repo_branch
+        self.base_ref = base_ref
+        self.use_cache = use_cache
+        self.shard_by = shard_by
+        self.workers = workers or os.cpu_count() or 1
+        # Optional callback receiving short progress messages, e.g. Spinner.update
+        self.on_status = None
+
+    @classmethod
+    def from_args(cls, args, validator):
+        validator.validate_iac_scan(args.repo_url, args.repo_branch, args.file, args.directory, args.compact, args.quiet, args.framework)
+        return cls(args.repo_url, args.repo_branch, args.file, args.directory, args.compact, args.quiet, args.framework, args.base_ref, not args.no_cache, args.shard_by, args.workers)
+
+    def _details(self):
+        return {
+            "details": {
+                "repo":   self.repo_url,
+                "branch":  self.repo_branch
+            }
+        }
+
+    def _checkov_job(self, targets, framework=None):
+        args = list(targets)
+        if self.compact is True:
+            args.append("--compact")
+        if self.quiet is True:
+            args.append("--quiet")
+        # The JSON report goes to stdout; progress and logs go to stderr
+        args.extend(["-o", self.output_format])
+        framework = framework or self.framework
+        if framework:
+            args.extend(["--framework", framework])
+        # Run as the invoking user so nothing root-owned is left in the workspace;
+        # HOME points somewhere writable for that user
+        return ContainerJob(self.checkov_image, args, mount_target="/workdir", workdir="/workdir",
+                            env={"HOME": "/tmp"}, user=host_user())
+
+    def _targets(self):
+        targets = []
+        if self.file:
+            targets.extend(["-f", self.file])
+        if self.directory:
+            targets.extend(["-d", self.directory])
+        return targets
+
+    def _run_checkov(self, targets, result_file=None, framework=None, details=False):
+        """Run Checkov on the given targets, streaming its JSON report into result_file. Returns the exit code.
+
+        With details, the report is written as the final artifact with the repository
+        details appended on the fly; otherwise Checkov's output is stored as is.
+        """
+        result_file = result_file or self.result_file
+        if os.path.exists(result_file):
+            os.remove(result_file)
+        job = self._checkov_job(targets, framework)
+        Logger.get_logger().debug("Executing command: %s", Lazy(lambda: " ".join(job.docker_run_cmd())))
+        with Profiler.phase("checkov", targets=" ".join(targets), framework=framework or self.framework) as phase:
+            writer = JsonArrayWriter(result_file, self._details()) if details else _RawWriter(result_file)
+            try:
+                result = run_container(job, self._progress(), stdout_sink=writer)
+            finally:
+                stats = writer.close()
+            if stats:
+                phase["bytes_written"] = stats["bytes"]
+
+        # Checkov exits with 1 when checks failed; anything else is an error
+        if result.returncode not in (0, 1) and result.stderr:
+            Logger.get_logger().error(result.stderr)
+        return result.returncode
+
+    def _progress(self, prefix=""):
+        return progress_handler("checkov", self.on_status, prefix) if self.on_status else None
+
+    def _run_full(self, details=True):
+        """Scan the configured targets, sharded across parallel containers when requested."""
+        if self.shard_by and self.directory and not self.file:
+            shards = self._plan_shards()
+            if len(shards) > 1:
+                return self._run_sharded(shards, details)
+        return self._run_checkov(self._targets(), details=details)
+
+    def _plan_shards(self):
+        """Split the scan into (targets, framework) shards by top-level subdirectory and/or framework."""
+        directory_targets = [["-d", self.directory]]
+        if self.shard_by in ("directory", "both"):
+            directory_targets = []
+            root_files = []
+            outputs = scanner_outputs()
+            for entry in sorted(os.listdir(self.directory)):
+                path = os.path.join(self.directory, entry)
+                if entry.startswith(".") or os.path.abspath(path) in outputs:
+                    continue
+                if os.path.isdir(path):
+                    directory_targets.append(["-d", path])
+                elif os.path.isfile(path):
+                    root_files.extend(["-f", path])
+            if root_files:
+                directory_targets.append(root_files)
+
+        frameworks = [self.framework]
+        if self.shard_by in ("framework", "both"):
+            if not self.framework or self.framework == "all":
+                Logger.get_logger().warning("Sharding by framework needs an explicit --framework list; not splitting by framework.")
+            else:
+                frameworks = [framework.strip() for framework in self.framework.split(",") if framework.strip()]
+
+        return [(targets, framework) for targets in directory_targets for framework in frameworks]
+
+    def _run_shard(self, output_dir, index, targets, framework):
+        started = time.perf_counter()
+        result_file = os.path.join(output_dir, f"{index}.json")
+        returncode = self._run_checkov(targets, result_file, framework)
+        reports = load_reports(result_file) if os.path.exists(result_file) else []
+        elapsed = time.perf_counter() - started
+        Logger.get_logger().info(f"Shard {index} ({' '.join(targets)}{f' --framework {framework}' if framework else ''}) "
+                                 f"finished in {elapsed:.1f}s with exit code {returncode}")
+        return returncode, reports
+
+    def _run_sharded(self, shards, details=True):
+        """Run shards in parallel containers and merge their output into one result file."""
+        Logger.get_logger().info(f"Running {len(shards)} Checkov shards with up to {self.workers} workers")
+        output_dir = tempfile.mkdtemp(prefix="aspm-shards-")
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(shards))) as executor:
+                outcomes = list(executor.map(lambda shard: self._run_shard(output_dir, shard[0], *shard[1]), enumerate(shards)))
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+        all_reports = [reports for _, reports in outcomes]
+        merged = merge_reports(
+            combine_per_file([split_by_file(reports) for reports in all_reports]),
+            os.path.normpath(self.directory),
+            checkov_version([report for reports in all_reports for report in reports], self.checkov_image.rsplit(":", 1)[-1])
+        )
+        write_json_array(self.result_file, merged, self._details() if details else None)
+
+        # Checkov exits with 1 when checks failed; any other non-zero code is an error and wins
+        errors = [returncode for returncode, _ in outcomes if returncode not in (0, 1)]
+        if errors:
+            return errors[0]
+        return 1 if has_failed_checks(merged) else 0
+
+    def _result_cache_key(self):
+        """Key for the whole-scan result cache, or None when the working tree has local changes."""
+        tree_hash = GitInfo.get_tree_hash(ignore=[self.result_file])
+        if not tree_hash:
+            return None
+        return ResultCache.make_key({
+            "scanner": "iac",
+            "tree": tree_hash,
+            "image": self.checkov_image,
+            "image_id": image_identity(self.checkov_image),
+            "file": self.file,
+            "directory": self.directory,
+            "framework": self.framework,
+            "compact": self.compact,
+            "quiet": self.quiet
+        })
 
     def run(self):
         try:
             """Run the IaC scan using Checkov."""
+            cache_key = self._result_cache_key() if self.use_cache else None
+            if cache_key:
+                returncode = ResultCache().get(cache_key, self.result_file)
+                if returncode is not None:
+                    Logger.get_logger().info("Using cached IaC scan result for this tree.")
+                    self.process_result_file()
+                    return returncode, self.result_file
+
             docker_pull(self.checkov_image)
-            checkov_cmd = [
-                "docker", "run", "--rm", "-v", f"{os.getcwd()}:/workdir", "--workdir", f"/workdir"
-            ]
-            checkov_cmd_init = list(checkov_cmd)
-            checkov_cmd_init.extend(["--entrypoint", "bash"])
-
-            checkov_cmd.append(self.checkov_image)
-            checkov_cmd_init.append(self.checkov_image)
-
-            if self.file:
-                checkov_cmd.extend(["-f", self.file])
-            if self.directory:
-                checkov_cmd.extend(["-d", self.directory])
-            if self.compact is True:
-                checkov_cmd.append("--compact")
-            if self.quiet is True:
-                checkov_cmd.append("--quiet")
-            checkov_cmd.extend(["-o", self.output_format, "--output-file-path", self.output_file_path])
-            if self.framework:
-                checkov_cmd.extend(["--framework", self.framework])
-
-            Logger.get_logger().debug(f"Executing command: {' '.join(checkov_cmd)}")
-            result = subprocess.run(checkov_cmd, capture_output=True, text=True)
-
-            if(result.stdout):
-                Logger.get_logger().debug(result.stdout)
-            if(result.stderr):
-                Logger.get_logger().error(result.stderr)
-
-            checkov_cmd_init.extend(["-c", f"chmod 777 {self.result_file}"])
-            subprocess.run(checkov_cmd_init, capture_output=True, text=True)
+
+            # A cached result holds Checkov's output only: the repository details
+            # are applied per run, so the same tree scanned on another branch is a hit
+            details = cache_key is None
+            if self.base_ref and self.directory and not self.file:
+                returncode = self._run_incremental(details)
+            else:
+                returncode = self._run_full(details)
 
             if not os.path.exists(self.result_file):
                 Logger.get_logger().info("No results found. Skipping API upload.")
-                return result.returncode, None
+                return returncode, None
 
-            self.process_result_file()
-            return result.returncode, self.result_file
+            # Checkov exits with 1 when checks failed; anything else is an error and not cached
+            if cache_key and returncode in (0, 1):
+                ResultCache().put(cache_key, self.result_file, returncode)
+            if not details:
+                self.process_result_file()
+            return returncode, self.result_file
         except Exception as e:
             Logger.get_logger().error(f"Error during IAC scan: {e}")
             raise
 
-    def process_result_file(self):
-        """Process the result JSON file to ensure it is an array and append additional metadata."""
-        try:
-            with open(self.result_file, 'r') as file:
-                data = json.load(file)
+    def _run_incremental(self, details=True):
+        """Scan only files changed since base_ref and reuse cached findings for the others."""
+        directory = os.path.normpath(self.directory)
+        outputs = scanner_outputs()
+        files = [path for path in GitInfo.list_files(directory) if os.path.abspath(path) not in outputs]
+        changed = {path for path in GitInfo.get_changed_files(self.base_ref, directory) if os.path.abspath(path) not in outputs}
+        cache = FindingsCache("iac", {
+            "image": self.checkov_image,
+            "image_id": image_identity(self.checkov_image),
+            "framework": self.framework,
+            "compact": self.compact,
+            "quiet": self.quiet
+        })
+        hashes = {path: hash_file(path) for path in files}
+
+        per_file = {}
+        to_scan = []
+        for path in files:
+            entry = None if path in changed else cache.get(hashes[path])
+            if entry is None:
+                to_scan.append(path)
+            else:
+                per_file[path] = entry
+        Logger.get_logger().info(f"Incremental IaC scan against {self.base_ref}: {len(changed)} changed file(s), "
+                                 f"{len(to_scan)} to scan, {len(per_file)} from cache")
+
+        if to_scan and len(to_scan) > len(files) * self.incremental_full_scan_ratio:
+            Logger.get_logger().info("Too many files to rescan, running a full scan to refresh the cache.")
+            returncode = self._run_full(details)
+            if returncode in (0, 1) and os.path.exists(self.result_file):
+                scanned = split_by_file(load_reports(self.result_file), directory)
+                for path in files:
+                    cache.put(hashes[path], scanned.get(path, {}))
+            return returncode
+
+        returncode = 0
+        if to_scan:
+            targets = []
+            for path in to_scan:
+                targets.extend(["-f", path])
+            returncode = self._run_checkov(targets)
+            scanned = split_by_file(load_reports(self.result_file), directory) if os.path.exists(self.result_file) else {}
+            for path in to_scan:
+                per_file[path] = scanned.get(path, {})
+                # Do not cache "no findings" for files Checkov failed to scan
+                if returncode in (0, 1):
+                    cache.put(hashes[path], per_file[path])
 
-            if isinstance(data, dict):
-                data = [data]
+        merged = merge_reports(per_file, directory, self.checkov_image.rsplit(":", 1)[-1])
+        write_json_array(self.result_file, merged, self._details() if details else None)
 
-            data.append({
-                "details": {
-                    "repo":   self.repo_url,
-                    "branch":  self.repo_branch
-                }
-            })
+        # Checkov exits with 1 when checks failed; keep other exit codes (errors) as they are
+        if returncode in (0, 1):
+            returncode = 1 if has_failed_checks(merged) else 0
+        return returncode
 
-            with open(self.result_file, 'w') as file:
-                json.dump(data, file, indent=2)
+    def process_result_file(self):
+        """Process the result JSON file to ensure it is an array and append additional metadata.
+
+        Uncached scans add the metadata while writing their result; this is for
+        cached results and Checkov output produced some other way.
+        """
+        try:
+            with Profiler.phase("process_result_file", python=True) as phase:
+                stats = append_to_json_array(self.result_file, self._details())
+                phase["bytes_written"] = stats["bytes"]
 
             Logger.get_logger().debug("Result file processed successfully.")
         except Exception as e:
             Logger.get_logger().debug(f"Error processing result file: {e}")
             Logger.get_logger().error(f"Error during IAC scan: {e}")
-            raise
\ No newline at end of file
+            raise
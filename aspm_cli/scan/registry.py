@@ -0,0 +1,66 @@
+import importlib
+import os
+
+ENTRY_POINT_GROUP = "aspm_cli.scanners"
+
+# Built-in scan types; a scanner module is imported only when its scan type runs
+BUILTIN_SCANNERS = {
+    "iac": "aspm_cli.scan.iac:IaCScanner",
+    "sast": "aspm_cli.scan.sast:SASTScanner",
+    "sq-sast": "aspm_cli.scan.sq_sast:SQSASTScanner",
+}
+
+# Files derived from a result file: the delta upload (baseline.py) and the upload resume state (upload.py)
+DERIVED_OUTPUT_SUFFIXES = (".delta.json", ".upload")
+
+_plugins = None
+
+def _resolve(target):
+    module_name, _, attr = target.partition(":")
+    obj = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+def plugin_scanners():
+    """Scan types registered by other packages under the aspm_cli.scanners entry point group.
+
+    A plugin scanner class provides data_type, from_args(args, validator) and
+    run() -> (exit_code, result_file), and optionally add_arguments(parser).
+    Entry points are only looked up on first call, as scanning the installed
+    distributions is comparatively slow.
+    """
+    global _plugins
+    if _plugins is None:
+        from importlib.metadata import entry_points
+        found = entry_points()
+        group = found.select(group=ENTRY_POINT_GROUP) if hasattr(found, "select") else found.get(ENTRY_POINT_GROUP, [])
+        _plugins = {ep.name: ep for ep in group if ep.name not in BUILTIN_SCANNERS}
+    return _plugins
+
+def scanner_names(include_plugins=True):
+    names = list(BUILTIN_SCANNERS)
+    if include_plugins:
+        names.extend(sorted(plugin_scanners()))
+    return names
+
+def is_registered(name):
+    return name in BUILTIN_SCANNERS or name in plugin_scanners()
+
+def scanner_outputs():
+    """Absolute paths of the result files built-in scanners write to the working directory,
+    and the files derived from them, which no scan should pick up as input."""
+    outputs = set()
+    for name in BUILTIN_SCANNERS:
+        result_file = getattr(load_scanner(name), "result_file", None)
+        if result_file:
+            result_file = os.path.abspath(result_file)
+            outputs.update([result_file] + [result_file + suffix for suffix in DERIVED_OUTPUT_SUFFIXES])
+    return outputs
+
+def load_scanner(name):
+    """Import and return the scanner class for a scan type, or None if it is unknown."""
+    if name in BUILTIN_SCANNERS:
+        return _resolve(BUILTIN_SCANNERS[name])
+    entry_point = plugin_scanners().get(name)
+    return entry_point.load() if entry_point else None
@@ -1,44 +1,214 @@
 import subprocess
 import json
 import os
+import shutil
+import tempfile
 from aspm_cli.utils import docker_pull
+from aspm_cli.utils.cache import FindingsCache, ResultCache, hash_file
+from aspm_cli.utils.container import ContainerJob, run_container
+from aspm_cli.utils.backends import image_identity
+from aspm_cli.utils.git import GitInfo
+from aspm_cli.utils.process import progress_handler
+from aspm_cli.scan.registry import scanner_outputs
 
-from aspm_cli.utils.logger import Logger
+from aspm_cli.utils.logger import Lazy, Logger
+from aspm_cli.utils.profiler import Profiler
 
 class SASTScanner:
     opengrep_image = "accuknox/opengrepjob:1.0.1"
     result_file = f'results.json'
+    data_type = "SQ"
+    mount_target = "/app"
+    # With --base-ref, rescan everything once more than this share of the files needs scanning
+    incremental_full_scan_ratio = 0.5
+    # OpenGrep reads these from the scanned directory, so they go along with the changed files
+    ignore_files = (".semgrepignore", ".opengrepignore")
 
-    def __init__(self, repo_url=None, commit_ref=None, commit_sha=None, pipeline_id=None, job_url=False):
+    def __init__(self, repo_url=None, commit_ref=None, commit_sha=None, pipeline_id=None, job_url=False, use_cache=True, base_ref=None):
         self.repo_url = repo_url
         self.commit_ref = commit_ref
         self.commit_sha = commit_sha
         self.pipeline_id = pipeline_id
         self.job_url = job_url
+        self.use_cache = use_cache
+        self.base_ref = base_ref
+        # Optional callback receiving short progress messages, e.g. Spinner.update
+        self.on_status = None
+
+    @classmethod
+    def from_args(cls, args, validator):
+        validator.validate_sast_scan(args.repo_url, args.commit_ref, args.commit_sha, args.pipeline_id, args.job_url)
+        return cls(args.repo_url, args.commit_ref, args.commit_sha, args.pipeline_id, args.job_url, not args.no_cache, args.base_ref)
+
+    def _env(self):
+        return {
+            "REPOSITORY_URL": self.repo_url,
+            "COMMIT_SHA": self.commit_sha,
+            "COMMIT_REF": self.commit_ref,
+            "PIPELINE_ID": self.pipeline_id,
+            "JOB_URL": self.job_url
+        }
+
+    def _result_cache_key(self):
+        """Key for the whole-scan result cache, or None when the working tree has local changes."""
+        tree_hash = GitInfo.get_tree_hash(ignore=[self.result_file])
+        if not tree_hash:
+            return None
+        return ResultCache.make_key({
+            "scanner": "sast",
+            "tree": tree_hash,
+            "image": self.opengrep_image,
+            "image_id": image_identity(self.opengrep_image),
+            "env": self._env()
+        })
 
     def run(self):
         try:
+            cache_key = self._result_cache_key() if self.use_cache else None
+            if cache_key:
+                exit_code = ResultCache().get(cache_key, self.result_file)
+                if exit_code is not None:
+                    Logger.get_logger().info("Using cached SAST scan result for this tree.")
+                    return exit_code, self.result_file
+
             docker_pull(self.opengrep_image)
             Logger.get_logger().debug("Starting OpenGrep scan...")
 
-            cmd = [
-                "docker", "run", "--rm",
-                "-v", f"{os.getcwd()}:/app",
-                "-e", f"REPOSITORY_URL={self.repo_url}",
-                "-e", f"COMMIT_SHA={self.commit_sha}",
-                "-e", f"COMMIT_REF={self.commit_ref}",
-                "-e", f"PIPELINE_ID={self.pipeline_id}",
-                "-e", f"JOB_URL={self.job_url}",
-                f"{self.opengrep_image}"
-            ]
-
-            Logger.get_logger().debug(f"Running OpenGrep scan: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            Logger.get_logger().debug(result.stdout)
-            Logger.get_logger().error(result.stderr)
-
-            exit_code = result.returncode
+            if self.base_ref:
+                exit_code = self._run_incremental()
+            else:
+                exit_code = self._run_opengrep()
+            # OpenGrep exits with 1 when there are findings; anything else is an error and not cached
+            if cache_key and exit_code in (0, 1) and os.path.exists(self.result_file):
+                ResultCache().put(cache_key, self.result_file, exit_code)
             return exit_code, self.result_file
         except subprocess.CalledProcessError as e:
             Logger.get_logger().error(f"Error during SAST scan: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _run_opengrep(self, workspace=None):
+        """Run the OpenGrep job on a directory (default: the working directory). Returns the exit code.
+
+        The job scans everything mounted at /app and writes results.json there.
+        """
+        job = ContainerJob(self.opengrep_image, mount_target=self.mount_target, mount_source=workspace, env=self._env(),
+                           temporary_mount=workspace is not None)
+        result_file = os.path.join(workspace or ".", self.result_file)
+        # A result left by an earlier run must not pass for this run's
+        if os.path.exists(result_file):
+            os.remove(result_file)
+        Logger.get_logger().debug("Running OpenGrep scan: %s", Lazy(lambda: " ".join(job.docker_run_cmd())))
+        with Profiler.phase("opengrep", workspace=workspace or ".") as phase:
+            result = run_container(job, progress_handler("opengrep", self.on_status) if self.on_status else None)
+            if os.path.exists(result_file):
+                phase["bytes_written"] = os.path.getsize(result_file)
+        if result.returncode != 0 and result.stderr:
+            Logger.get_logger().error(result.stderr)
+        return result.returncode
+
+    @classmethod
+    def _relative_path(cls, path):
+        """A path from OpenGrep's output relative to the scanned directory."""
+        if path.startswith(cls.mount_target + "/"):
+            path = path[len(cls.mount_target) + 1:]
+        return os.path.normpath(path)
+
+    @classmethod
+    def _split_by_file(cls, output):
+        """Per-file cache entries from an OpenGrep output: the file's results and how it was listed as scanned."""
+        per_file = {}
+        for record in output.get("results", []):
+            entry = per_file.setdefault(cls._relative_path(record.get("path", "")), {"results": [], "scanned": None})
+            entry["results"].append(record)
+        for path in (output.get("paths") or {}).get("scanned", []):
+            per_file.setdefault(cls._relative_path(path), {"results": [], "scanned": None})["scanned"] = path
+        return per_file
+
+    def _header(self, output):
+        return {key: value for key, value in output.items() if key not in ("results", "errors")}
+
+    def _run_incremental(self):
+        """Scan only files changed since base_ref and reuse cached findings for the others.
+
+        OpenGrep only sees the files to scan, copied to a temporary directory, and the
+        per-file results are merged into a results.json with the schema of a full scan.
+        Its rules look at one file at a time, so findings of unchanged files stay valid.
+        """
+        # Results of this and the other scanners are not source files
+        outputs = scanner_outputs()
+        files = [path for path in GitInfo.list_files(".") if os.path.abspath(path) not in outputs]
+        changed = {path for path in GitInfo.get_changed_files(self.base_ref) if os.path.abspath(path) not in outputs}
+        cache = FindingsCache("sast", {
+            "image": self.opengrep_image,
+            "image_id": image_identity(self.opengrep_image)
+        })
+        hashes = {path: hash_file(path) for path in files}
+
+        per_file = {}
+        to_scan = []
+        for path in files:
+            entry = None if path in changed else cache.get(hashes[path])
+            if entry is None:
+                to_scan.append(path)
+            else:
+                per_file[path] = entry
+        Logger.get_logger().info(f"Incremental SAST scan against {self.base_ref}: {len(changed)} changed file(s), "
+                                 f"{len(to_scan)} to scan, {len(per_file)} from cache")
+
+        if to_scan and len(to_scan) > len(files) * self.incremental_full_scan_ratio:
+            Logger.get_logger().info("Too many files to rescan, running a full scan to refresh the cache.")
+            exit_code = self._run_opengrep()
+            if exit_code in (0, 1) and os.path.exists(self.result_file):
+                with open(self.result_file, 'r') as file:
+                    output = json.load(file)
+                scanned = self._split_by_file(output)
+                for path in files:
+                    cache.put(hashes[path], scanned.get(path, {"results": [], "scanned": None}))
+            return exit_code
+
+        exit_code = 0
+        # Top-level fields come from this run's output, never from an earlier one
+        header = {"version": self.opengrep_image.rsplit(":", 1)[-1]}
+        errors = []
+        if to_scan:
+            workspace = tempfile.mkdtemp(prefix="aspm-sast-")
+            try:
+                for path in to_scan + [name for name in self.ignore_files if os.path.isfile(name)]:
+                    target = os.path.join(workspace, path)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.copyfile(path, target)
+                exit_code = self._run_opengrep(workspace)
+                output_file = os.path.join(workspace, self.result_file)
+                if not os.path.exists(output_file):
+                    Logger.get_logger().error("OpenGrep did not produce a result for the changed files.")
+                    return exit_code or 1
+                with open(output_file, 'r') as file:
+                    output = json.load(file)
+            finally:
+                shutil.rmtree(workspace, ignore_errors=True)
+
+            header = self._header(output)
+            errors = output.get("errors", [])
+            scanned = self._split_by_file(output)
+            for path in to_scan:
+                per_file[path] = scanned.get(path, {"results": [], "scanned": None})
+                # Exit code 1 reports findings; do not cache "no findings" for files OpenGrep failed to scan
+                if exit_code in (0, 1):
+                    cache.put(hashes[path], per_file[path])
+
+        merged = dict(header)
+        merged["results"] = [record for path in files if path in per_file for record in per_file[path]["results"]]
+        merged["errors"] = errors
+        merged["paths"] = dict(merged.get("paths") or {}, scanned=[
+            per_file[path]["scanned"] for path in files if path in per_file and per_file[path]["scanned"]
+        ])
+        tmp_path = f"{self.result_file}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(merged, file)
+        os.replace(tmp_path, self.result_file)
+
+        # Exit with 1 when there are findings, also when every file came from the cache;
+        # keep other exit codes (errors) as they are
+        if exit_code in (0, 1):
+            exit_code = 1 if merged["results"] else 0
+        return exit_code
\ No newline at end of file
@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+from aspm_cli.utils.cache import get_cache_dir, write_json_atomic
+from aspm_cli.utils.logger import Logger
+
+SONAR_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+def parse_sonar_date(value):
+    try:
+        return datetime.strptime(value, SONAR_DATE_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+def _finding_lists(data):
+    """Top-level lists of findings (dicts carrying an updateDate) in a fetched result."""
+    values = data.values() if isinstance(data, dict) else [data]
+    for value in values:
+        if isinstance(value, list) and any(isinstance(item, dict) and "updateDate" in item for item in value):
+            yield value
+
+def latest_update(data):
+    """Most recent updateDate among the findings of a fetched result, as a string."""
+    latest = None
+    for findings in _finding_lists(data):
+        for item in findings:
+            updated = parse_sonar_date(item.get("updateDate"))
+            if updated and (latest is None or updated > latest[0]):
+                latest = (updated, item["updateDate"])
+    return latest[1] if latest else None
+
+def filter_updated_since(data, since):
+    """Drop findings last updated before `since`. Returns (data, kept, dropped).
+
+    Findings updated exactly at `since` are kept, as they may have changed again
+    within the same second after the previous fetch.
+    """
+    since = parse_sonar_date(since)
+    kept = dropped = 0
+    for findings in _finding_lists(data):
+        remaining = []
+        for item in findings:
+            updated = parse_sonar_date(item.get("updateDate"))
+            if updated is None or updated >= since:
+                remaining.append(item)
+            else:
+                dropped += 1
+        kept += len(remaining)
+        findings[:] = remaining
+    return data, kept, dropped
+
+# Guards the read-modify-write of the state file across every Watermarks instance
+_state_lock = threading.Lock()
+
+class Watermarks:
+    """Per-project timestamp of the newest finding seen by the last successful fetch.
+
+    One instance is shared by the concurrent fetches of a scan.
+    """
+    state_file = "watermarks.json"
+
+    def __init__(self, host_url, org_id=None):
+        self.scope = f"{(host_url or '').rstrip('/')}|{org_id or ''}"
+        self.path = os.path.join(get_cache_dir("sonarqube"), self.state_file)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, project_key):
+        return self._load().get(f"{self.scope}|{project_key}")
+
+    def set(self, project_key, timestamp):
+        """Advance a project's watermark. Failing to save it only makes the next fetch larger."""
+        with _state_lock:
+            state = self._load()
+            state[f"{self.scope}|{project_key}"] = timestamp
+            try:
+                write_json_atomic(self.path, state)
+            except OSError as e:
+                Logger.get_logger().warning(f"Unable to save the watermark of {project_key}: {e}")
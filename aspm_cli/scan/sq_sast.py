@@ -1,19 +1,32 @@
+import json
 import subprocess
 import os
+from concurrent.futures import ThreadPoolExecutor
 from aspm_cli.utils import docker_pull
-from aspm_cli.utils.logger import Logger
-import json
-from accuknox_sq_sast.sonarqube_fetcher import SonarQubeFetcher
-import asyncio
+from aspm_cli.scan.sq_delta import Watermarks, filter_updated_since, latest_update
+from aspm_cli.scan.sq_task import AnalysisTask, read_report_task
+from aspm_cli.utils.container import ContainerJob, run_container
+from aspm_cli.utils.logger import Lazy, Logger
+from aspm_cli.utils.profiler import Profiler
+from aspm_cli.utils.process import progress_handler
+from aspm_cli.utils.result_writer import set_json_object_key
 
 class SQSASTScanner:
     sast_image = "sonarsource/sonar-scanner-cli:11.3"
+    report_task_file = ".scannerwork/report-task.txt"
+    data_type = "SQ"
 
     def __init__(self, skip_sonar_scan= True, sonar_project_key = None, sonar_token = None, sonar_host_url = None, sonar_org_id=None,
-                 repo_url=None, branch=None, commit_sha=None, pipeline_url= None):
+                 repo_url=None, branch=None, commit_sha=None, pipeline_url= None, max_in_flight=None, delta=False):
         
         self.skip_sonar_scan = skip_sonar_scan
         self.sonar_project_key = sonar_project_key
+        # A comma separated list fetches several projects concurrently, one result file each
+        self.project_keys = [key.strip() for key in (sonar_project_key or "").split(",") if key.strip()]
+        self.max_in_flight = max(1, max_in_flight or int(os.getenv("ASPM_SQ_MAX_IN_FLIGHT", "4")))
+        self.delta = delta
+        # Shared by the concurrent project fetches
+        self.watermarks = Watermarks(sonar_host_url, sonar_org_id) if delta else None
         self.sonar_token = sonar_token
         self.sonar_host_url = sonar_host_url
         self.sonar_org_id = sonar_org_id
@@ -22,82 +35,187 @@ class SQSASTScanner:
         self.commit_sha = commit_sha
         self.branch = branch
         self.pipeline_url = pipeline_url
+        # Optional callback receiving short progress messages, e.g. Spinner.update
+        self.on_status = None
+
+    @classmethod
+    def from_args(cls, args, validator):
+        validator.validate_sq_sast_scan(args.sonar_project_key, args.sonar_token, args.sonar_host_url, args.sonar_org_id, args.repo_url, args.branch, args.commit_sha, args.pipeline_url)
+        if len([key for key in (args.sonar_project_key or "").split(",") if key.strip()]) > 1 and not args.skip_sonar_scan:
+            Logger.get_logger().error("SONAR_PROJECT_KEY: Several project keys can only be fetched with --skip-sonar-scan.")
+            exit(1)
+        return cls(args.skip_sonar_scan, args.sonar_project_key, args.sonar_token, args.sonar_host_url, args.sonar_org_id, args.repo_url, args.branch, args.commit_sha, args.pipeline_url,
+                   args.sonar_max_in_flight, args.sonar_delta)
 
     def run(self):
+        """Run the scan and fetch results.
+
+        Returns the result file for a single project key, or the list of result
+        files (one per successfully fetched project) for several.
+        """
         try:
             returncode = 0
             if(self.skip_sonar_scan is not True):
                 returncode = self._run_sq_scan()
             else:
                 Logger.get_logger().info(f"SQ SAST scan skipped")
-            result_file = self._run_ak_scan()
-            self._process_result_file(result_file)
-            return returncode, result_file
+            if len(self.project_keys) <= 1:
+                if self.skip_sonar_scan is not True and returncode == 0:
+                    return self._fetch_after_analysis()
+                result_file = self._fetch_project(self.sonar_project_key)
+                return returncode, result_file
+
+            result_files, failed = self._fetch_projects()
+            if failed:
+                Logger.get_logger().error(f"Failed to fetch {len(failed)} of {len(self.project_keys)} projects: {', '.join(failed)}")
+                returncode = returncode or 1
+            return returncode, result_files
         except subprocess.CalledProcessError as e:
             Logger.get_logger().error(f"SAST scan failed: {e}")
             raise
 
+    def _fetch_after_analysis(self):
+        """Wait for the submitted analysis, then fetch while its quality gate is checked.
+
+        Returns the exit code sonar-scanner used to return with
+        -Dsonar.qualitygate.wait=true, and the result file.
+        """
+        report = read_report_task(self.report_task_file)
+        if not report or "ceTaskId" not in report:
+            Logger.get_logger().warning(f"No analysis task found in {self.report_task_file}; skipping the quality gate check.")
+            return 0, self._fetch_project(self.sonar_project_key)
+
+        tracker = AnalysisTask(self.sonar_host_url, self.sonar_token, report["ceTaskId"])
+        try:
+            with Profiler.phase("sonarqube_analysis", task=tracker.task_id):
+                task = tracker.wait(self.on_status)
+        except Exception as e:
+            Logger.get_logger().error(f"Unable to track SonarQube analysis {tracker.task_id}: {e}")
+            return 1, self._fetch_project(self.sonar_project_key)
+
+        def _gate():
+            try:
+                return tracker.returncode(task)
+            except Exception as e:
+                Logger.get_logger().error(f"Unable to read the quality gate of analysis {tracker.task_id}: {e}")
+                return 1
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            gate = executor.submit(_gate)
+            result_file = self._fetch_project(self.sonar_project_key)
+            return gate.result(), result_file
+
     def _run_sq_scan(self):
         try:
             docker_pull(self.sast_image)
+            # A report left by an earlier run would point at the wrong analysis
+            if os.path.exists(self.report_task_file):
+                os.remove(self.report_task_file)
             Logger.get_logger().debug("Starting SonarQube-based AccuKnox SAST scan...")
 
             org_option = f"-Dsonar.organization={self.sonar_org_id}" if self.sonar_org_id and self.sonar_org_id.strip() else ""
 
-            cmd = [
-                "docker", "run", "--rm",
-                "-e", f"SONAR_HOST_URL={self.sonar_host_url}",
-                "-e", f"SONAR_TOKEN={self.sonar_token}",
-                "-e", f"SONAR_SCANNER_OPTS=-Dsonar.projectKey={self.sonar_project_key} {org_option} -Dsonar.qualitygate.wait=true",
-                "-v", f"{os.getcwd()}:/usr/src/",
-                self.sast_image
-            ]
-
-            Logger.get_logger().debug(f"Running scan: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            Logger.get_logger().debug(result.stdout)
-            Logger.get_logger().error(result.stderr)
+            job = ContainerJob(self.sast_image, mount_target="/usr/src", env={
+                "SONAR_HOST_URL": self.sonar_host_url,
+                "SONAR_TOKEN": self.sonar_token,
+                # No -Dsonar.qualitygate.wait: the analysis is tracked from report-task.txt instead
+                "SONAR_SCANNER_OPTS": f"-Dsonar.projectKey={self.sonar_project_key} {org_option}"
+            })
+
+            Logger.get_logger().debug("Running scan: %s", Lazy(lambda: " ".join(job.docker_run_cmd())))
+            with Profiler.phase("sonar_scanner"):
+                result = run_container(job, progress_handler("sonar-scanner", self.on_status) if self.on_status else None)
+            if result.returncode != 0 and result.stderr:
+                Logger.get_logger().error(result.stderr)
             return result.returncode
         except Exception as e:
             Logger.get_logger().error(f"Error during SonarQube-based AccuKnox SAST scan...: {e}")
             raise
 
-    def _run_ak_scan(self):
+    def _fetch_projects(self):
+        """Fetch every project key with at most max_in_flight fetches running. Returns (result files, failed keys)."""
+        Logger.get_logger().info(f"Fetching {len(self.project_keys)} SonarQube projects, {self.max_in_flight} at a time"
+                                 f"{' (delta)' if self.delta else ''}")
+
+        def _fetch(project_key):
+            try:
+                return self._fetch_project(project_key)
+            except Exception as e:
+                Logger.get_logger().error(f"Fetching SonarQube project {project_key} failed: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(self.project_keys))) as executor:
+            outcomes = list(executor.map(_fetch, self.project_keys))
+        result_files = [result_file for result_file in outcomes if result_file]
+        failed = [key for key, result_file in zip(self.project_keys, outcomes) if not result_file]
+        return result_files, failed
+
+    def _fetch_project(self, project_key):
+        """Fetch one project's results, apply delta mode and add the repository details."""
+        watermarks = self.watermarks
+        since = watermarks.get(project_key) if watermarks else None
+        result_file = self._run_ak_scan(project_key)
+        newest = None
+        if watermarks:
+            newest = self._apply_delta(result_file, since)
+        self._process_result_file(result_file)
+        # Only advance the watermark once the result file is complete
+        if newest:
+            watermarks.set(project_key, newest)
+        return result_file
+
+    def _apply_delta(self, result_file, since):
+        """Keep only findings updated since the previous fetch. Returns the newest update time seen."""
+        with open(result_file, 'r') as file:
+            data = json.load(file)
+        newest = latest_update(data)
+        if since:
+            data, kept, dropped = filter_updated_since(data, since)
+            if isinstance(data, dict):
+                data["delta"] = {"updated_since": since}
+            with open(result_file, 'w') as file:
+                json.dump(data, file, separators=(',', ':'))
+            Logger.get_logger().info(f"{result_file}: {kept} finding(s) updated since {since}, {dropped} unchanged skipped")
+        return newest
+
+    def _run_ak_scan(self, project_key=None):
+        # Imported here so the fetcher and asyncio only load when an sq-sast scan runs
+        import asyncio
+        from accuknox_sq_sast.sonarqube_fetcher import SonarQubeFetcher
+        project_key = project_key or self.sonar_project_key
         try:
-            Logger.get_logger().debug("Starting AccuKnox SQ Fetcher...")
+            Logger.get_logger().debug(f"Starting AccuKnox SQ Fetcher for {project_key}...")
             fetcher = SonarQubeFetcher(
                 sq_url=self.sonar_host_url,
                 auth_token=self.sonar_token,
-                sq_projects=self.sonar_project_key,
+                sq_projects=project_key,
                 sq_org=self.sonar_org_id,
                 report_path=""
             )
-            results = asyncio.run(fetcher.fetch_all())
+            with Profiler.phase("sonarqube_fetch", python=True, project=project_key) as phase:
+                results = asyncio.run(fetcher.fetch_all())
+                if results and os.path.exists(results[0]):
+                    phase["bytes_written"] = os.path.getsize(results[0])
             return results[0]
         except Exception as e:
-            Logger.get_logger().error(f"Error during AccuKnox SQ Fetcher...: {e}")
+            Logger.get_logger().error(f"Error during AccuKnox SQ Fetcher for {project_key}: {e}")
             raise
 
     def _process_result_file(self, file_path):
-        """Process the result JSON file to ensure it is an array and append additional metadata."""
+        """Add the repository details to a fetched SonarQube result file."""
         try:
-            with open(file_path, 'r') as file:
-                data = json.load(file)
-
             repo_details = {
                 "repository_url": self.repo_url,
                 "commit": self.commit_sha,
                 "branch": self.branch,
                 "pipeline_url": self.pipeline_url
             }
-            
-            data["repo_details"] = repo_details
-
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            with Profiler.phase("process_result_file", python=True) as phase:
+                stats = set_json_object_key(file_path, "repo_details", repo_details)
+                phase["bytes_written"] = stats["bytes"]
 
             Logger.get_logger().debug("Result file processed successfully.")
         except Exception as e:
             Logger.get_logger().debug(f"Error processing result file: {e}")
-            Logger.get_logger().error(f"Error during IAC scan: {e}")
+            Logger.get_logger().error(f"Error adding repository details to SonarQube result {file_path}: {e}")
             raise
\ No newline at end of file
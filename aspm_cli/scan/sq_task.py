@@ -0,0 +1,69 @@
+import os
+import time
+
+from aspm_cli.utils.logger import Logger
+
+# sonar-scanner exits with 2 (user error) when the analysis or its quality gate fails
+QUALITY_GATE_FAILED = 2
+PENDING_STATUSES = ("PENDING", "IN_PROGRESS")
+
+def read_report_task(path=".scannerwork/report-task.txt"):
+    """Read the key=value file sonar-scanner writes after submitting an analysis, or None."""
+    try:
+        with open(path, 'r') as file:
+            lines = file.read().splitlines()
+    except OSError:
+        return None
+    return dict(line.split("=", 1) for line in lines if "=" in line)
+
+class AnalysisTask:
+    """Tracks a submitted analysis on the SonarQube compute engine and its quality gate.
+
+    This replaces sonar-scanner's -Dsonar.qualitygate.wait=true, so the CLI can
+    start fetching as soon as the task completes. Polling starts fast and backs
+    off; ASPM_SQ_TASK_TIMEOUT (default 300s) matches sonar.qualitygate.timeout.
+    """
+
+    def __init__(self, host_url, token, task_id, timeout=None):
+        import requests
+
+        self.host_url = host_url.rstrip("/")
+        self.task_id = task_id
+        self.timeout = timeout if timeout is not None else int(os.getenv("ASPM_SQ_TASK_TIMEOUT", "300"))
+        self.session = requests.Session()
+        # SonarQube accepts a token as the basic auth user with an empty password
+        self.session.auth = (token, "")
+
+    def _get(self, path, **params):
+        response = self.session.get(f"{self.host_url}{path}", params=params, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    def wait(self, on_status=None, interval=0.5, max_interval=5.0):
+        """Poll the compute engine until the task finishes. Returns the task, or None on timeout."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            task = self._get("/api/ce/task", id=self.task_id)["task"]
+            if task["status"] not in PENDING_STATUSES:
+                return task
+            if on_status:
+                on_status(f"analysis {task['status'].lower().replace('_', ' ')}")
+            if time.monotonic() + interval > deadline:
+                return None
+            time.sleep(interval)
+            interval = min(max_interval, interval * 1.5)
+
+    def quality_gate_status(self, analysis_id):
+        return self._get("/api/qualitygates/project_status", analysisId=analysis_id)["projectStatus"]["status"]
+
+    def returncode(self, task):
+        """Exit code sonar-scanner would have returned with -Dsonar.qualitygate.wait=true."""
+        if task is None:
+            Logger.get_logger().error(f"Timed out after {self.timeout}s waiting for SonarQube analysis {self.task_id}.")
+            return QUALITY_GATE_FAILED
+        if task["status"] != "SUCCESS":
+            Logger.get_logger().error(f"SonarQube analysis {self.task_id} ended with status {task['status']}: {task.get('errorMessage', '')}")
+            return QUALITY_GATE_FAILED
+        status = self.quality_gate_status(task["analysisId"])
+        Logger.get_logger().info(f"QUALITY GATE STATUS: {status}")
+        return QUALITY_GATE_FAILED if status == "ERROR" else 0
@@ -1,4 +1,18 @@
-from .validation import ConfigValidator, ALLOWED_SCAN_TYPES
-from .upload import upload_results
+import importlib
+
 from .handle_failure import handle_failure
-from .docker_pull import docker_pull
\ No newline at end of file
+from .docker_pull import docker_pull, prefetch_images
+
+# Loaded on first access: validation pulls in pydantic and upload pulls in requests
+_LAZY_EXPORTS = {
+    "ConfigValidator": ".validation",
+    "ALLOWED_SCAN_TYPES": ".validation",
+    "upload_results": ".upload",
+    "get_uploader": ".upload",
+    "ArtifactUploader": ".upload",
+}
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
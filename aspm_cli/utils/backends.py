@@ -0,0 +1,170 @@
+import functools
+import os
+import shutil
+import subprocess
+import threading
+
+from aspm_cli.utils.cache import get_cache_dir
+from aspm_cli.utils.docker_pull import ImageCache
+from aspm_cli.utils.logger import Logger
+
+BACKEND_CHOICES = ("auto", "docker", "podman", "native")
+
+_image_caches = {}
+_image_caches_lock = threading.Lock()
+
+def image_cache(engine):
+    """The shared ImageCache of a container engine (per cache directory)."""
+    key = (engine, get_cache_dir())
+    with _image_caches_lock:
+        if key not in _image_caches:
+            _image_caches[key] = ImageCache(engine=engine)
+        return _image_caches[key]
+
+class DockerBackend:
+    """Runs scanner jobs as `docker run --rm` containers."""
+    name = "docker"
+    binary = "docker"
+
+    def available(self):
+        return shutil.which(self.binary) is not None
+
+    def supports(self, image):
+        return True
+
+    def command(self, job):
+        return job.docker_run_cmd(self.binary)
+
+    def popen_kwargs(self, job):
+        return {}
+
+    def ensure_image(self, image, digest=None, force=False):
+        image_cache(self.binary).ensure(image, digest, force)
+
+    def image_identity(self, image):
+        """What the scanner's results depend on besides its inputs, for result cache keys."""
+        return image_cache(self.binary).cached_id(image)
+
+    def stop_labelled(self, label, timeout):
+        """Stop the running containers carrying a label. Returns their ids."""
+        result = subprocess.run([self.binary, "ps", "-q", "--filter", f"label={label}"], capture_output=True, text=True)
+        containers = result.stdout.split()
+        if containers:
+            if subprocess.run([self.binary, "stop", "-t", str(timeout), *containers], capture_output=True, text=True).returncode != 0:
+                subprocess.run([self.binary, "kill", *containers], capture_output=True, text=True)
+        return containers
+
+class PodmanBackend(DockerBackend):
+    """Runs scanner jobs with Podman, e.g. on rootless runners without a Docker daemon."""
+    name = "podman"
+    binary = "podman"
+
+class NativeBackend:
+    """Runs a scanner from a binary installed on the runner instead of its image.
+
+    Only images listed in NATIVE_TOOLS qualify. When a tool's version can be
+    read, it must match the image tag so that results are identical to the
+    container's; otherwise the container backend is used. OpenGrep runs through
+    the accuknox/opengrepjob wrapper image and always needs a container.
+    """
+    name = "native"
+    # Image repository -> (binary, arguments printing its version or None)
+    NATIVE_TOOLS = {
+        "ghcr.io/bridgecrewio/checkov": ("checkov", ["--version"]),
+        # sonar-scanner only submits the analysis; results come from the server
+        "sonarsource/sonar-scanner-cli": ("sonar-scanner", None),
+    }
+
+    @staticmethod
+    def _split(image):
+        image = image.split("@", 1)[0]
+        repository, _, tag = image.rpartition(":")
+        if not repository or "/" in tag:
+            return image, None
+        return repository, tag
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _binary_version(binary, version_args):
+        try:
+            result = subprocess.run([binary, *version_args], capture_output=True, text=True, timeout=60)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        return result.stdout.strip().splitlines()[-1].strip() if result.returncode == 0 and result.stdout.strip() else None
+
+    def _tool(self, image):
+        repository, tag = self._split(image)
+        if repository not in self.NATIVE_TOOLS:
+            return None
+        binary, version_args = self.NATIVE_TOOLS[repository]
+        path = shutil.which(binary)
+        if not path:
+            return None
+        version = self._binary_version(path, tuple(version_args)) if version_args else None
+        if version_args and version != tag:
+            Logger.get_logger().debug(f"Local {binary} {version} does not match {image}, using a container.")
+            return None
+        return path, version
+
+    def available(self):
+        return True
+
+    def supports(self, image):
+        return self._tool(image) is not None
+
+    def command(self, job):
+        path, _ = self._tool(job.image)
+        return [path, *job.args]
+
+    def popen_kwargs(self, job):
+        # The container sees the workspace at its mount point and starts there;
+        # HOME only points somewhere writable inside the container
+        env = dict(os.environ)
+        env.update({key: str(value) for key, value in job.env.items() if value is not None and key != "HOME"})
+        return {"cwd": job.mount_source, "env": env}
+
+    def ensure_image(self, image, digest=None, force=False):
+        pass
+
+    def image_identity(self, image):
+        path, version = self._tool(image)
+        return f"native:{os.path.basename(path)}:{version or ''}"
+
+BACKENDS = {
+    "docker": DockerBackend,
+    "podman": PodmanBackend,
+    "native": NativeBackend,
+}
+
+def selected_backend():
+    """The backend chosen with --backend or ASPM_BACKEND (default: auto)."""
+    choice = os.getenv("ASPM_BACKEND", "auto").lower()
+    return choice if choice in BACKEND_CHOICES else "auto"
+
+@functools.lru_cache(maxsize=None)
+def container_backend(choice=None):
+    """Docker or Podman: the requested one, otherwise whichever is installed (Docker first)."""
+    choice = choice or selected_backend()
+    if choice in ("docker", "podman"):
+        return BACKENDS[choice]()
+    for backend in (DockerBackend(), PodmanBackend()):
+        if backend.available():
+            return backend
+    return DockerBackend()
+
+@functools.lru_cache(maxsize=None)
+def _backend_for(image, choice):
+    if choice in ("auto", "native"):
+        native = NativeBackend()
+        if native.supports(image):
+            return native
+        if choice == "native":
+            Logger.get_logger().info(f"No matching local binary for {image}, running it in a container.")
+    return container_backend(choice if choice != "native" else "auto")
+
+def backend_for(image):
+    """The backend to run an image's jobs with: a matching local binary first, then a container engine."""
+    return _backend_for(image, selected_backend())
+
+def image_identity(image):
+    return backend_for(image).image_identity(image)
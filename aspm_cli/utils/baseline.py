@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import time
+
+from aspm_cli.scan.fingerprints import detect_tool, iter_findings, record_digest
+from aspm_cli.utils.cache import get_cache_dir, write_json_atomic
+from aspm_cli.utils.logger import Logger
+
+DELTA_FORMAT_VERSION = 1
+
+class BaselineStore:
+    """Fingerprints of the last uploaded result per repository, branch and result file.
+
+    Each baseline maps finding fingerprints to content digests and is identified
+    by a digest of that map, which delta uploads reference.
+    """
+
+    def __init__(self, repo_url, branch):
+        scope = hashlib.sha256(f"{repo_url}|{branch}".encode()).hexdigest()[:16]
+        self.dir = get_cache_dir("baselines", scope)
+        self.repo_url = repo_url
+        self.branch = branch
+
+    def _path(self, name):
+        return os.path.join(self.dir, f"{name}.json")
+
+    def load(self, name):
+        try:
+            with open(self._path(name), 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, name, findings):
+        baseline_id = hashlib.sha256(json.dumps(sorted(findings.items())).encode()).hexdigest()
+        write_json_atomic(self._path(name), {
+            "baseline_id": baseline_id,
+            "repo": self.repo_url,
+            "branch": self.branch,
+            "created_at": time.time(),
+            "findings": findings
+        })
+        return baseline_id
+
+def _metadata(data, tool):
+    """Everything in a result except its findings, e.g. the repository details."""
+    if tool == "checkov":
+        return [item for item in (data if isinstance(data, list) else [data]) if not (isinstance(item, dict) and "check_type" in item)]
+    finding_keys = {group["list"] for _, group, _ in iter_findings(data, tool)}
+    return {key: value for key, value in data.items() if key not in finding_keys}
+
+def prepare_delta_upload(result_file, store):
+    """Compare a result with its baseline and write the delta next to it.
+
+    Returns (file to upload, commit) where commit() records the result as the new
+    baseline and must only be called once the upload succeeded. Without a
+    baseline, or for unrecognized formats, the full result is uploaded.
+    """
+    with open(result_file, 'r') as file:
+        data = json.load(file)
+    tool = detect_tool(data)
+    if tool is None:
+        Logger.get_logger().warning(f"{result_file}: unrecognized result format, uploading the full result.")
+        return result_file, lambda: None
+
+    name = f"{tool}-{os.path.basename(result_file)}"
+    current = {}
+    entries = {}
+    for fingerprint, group, record in iter_findings(data, tool):
+        current[fingerprint] = record_digest(record, group)
+        entries[fingerprint] = dict(group, fingerprint=fingerprint, finding=record)
+
+    def commit():
+        store.save(name, current)
+
+    baseline = store.load(name)
+    if baseline is None:
+        Logger.get_logger().info(f"{result_file}: no baseline for {store.repo_url} {store.branch}, uploading the full result.")
+        return result_file, commit
+
+    previous = baseline.get("findings", {})
+    added = [entries[fp] for fp in current if fp not in previous]
+    changed = [entries[fp] for fp in current if fp in previous and previous[fp] != current[fp]]
+    removed = sorted(fp for fp in previous if fp not in current)
+    delta_file = f"{result_file}.delta.json"
+    with open(delta_file, 'w') as file:
+        json.dump({
+            "delta": {
+                "format": DELTA_FORMAT_VERSION,
+                "tool": tool,
+                "baseline_id": baseline["baseline_id"],
+                "added": added,
+                "changed": changed,
+                "removed": removed,
+                "unchanged": len(current) - len(added) - len(changed)
+            },
+            "metadata": _metadata(data, tool)
+        }, file, separators=(',', ':'))
+    Logger.get_logger().info(f"{result_file}: {len(added)} added, {len(changed)} changed, {len(removed)} removed findings "
+                             f"against baseline {baseline['baseline_id'][:12]} ({os.path.getsize(delta_file)} of {os.path.getsize(result_file)} bytes)")
+    return delta_file, commit
@@ -0,0 +1,84 @@
+import json
+import os
+import re
+import time
+
+from aspm_cli.utils.logger import Logger
+
+class BatchJob:
+    """One scan of a batch: a scan type run from a directory with option overrides."""
+
+    def __init__(self, name, path, scantype, overrides=None):
+        self.name = name
+        self.path = path
+        self.scantype = scantype
+        self.overrides = dict(overrides or {})
+
+def _read_manifest(path):
+    with open(path, 'r') as file:
+        text = file.read()
+    if path.lower().endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("Reading a YAML manifest requires PyYAML (pip install pyyaml); a .json manifest works without it.")
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+def _job_name(path, scantype):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", f"{os.path.basename(os.path.normpath(path))}-{scantype}").strip("-")
+
+def load_manifest(path):
+    """Read a batch manifest (YAML or JSON). Returns (jobs, concurrency or None).
+
+    The manifest lists jobs, each with a path (relative to the manifest), a scan
+    type and optional args: the scan's command line options without the leading
+    dashes, e.g. {"framework": "terraform", "no-cache": true}. Top-level
+    "defaults" apply to every job and "concurrency" caps the parallel jobs.
+    """
+    manifest = _read_manifest(path)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("jobs"), list) or not manifest["jobs"]:
+        raise ValueError("The manifest must contain a non-empty 'jobs' list.")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    defaults = manifest.get("defaults") or {}
+
+    jobs = []
+    for index, entry in enumerate(manifest["jobs"], 1):
+        if not isinstance(entry, dict) or not entry.get("path") or not entry.get("scan"):
+            raise ValueError(f"Job {index}: 'path' and 'scan' are required.")
+        job_path = os.path.normpath(os.path.join(base_dir, entry["path"]))
+        if not os.path.isdir(job_path):
+            raise ValueError(f"Job {index}: {job_path} is not a directory.")
+        scantype = str(entry["scan"]).lower()
+        jobs.append(BatchJob(entry.get("name") or _job_name(job_path, scantype), job_path, scantype,
+                             dict(defaults, **(entry.get("args") or {}))))
+
+    names = [job.name for job in jobs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Job names must be unique: {', '.join(duplicates)}")
+    # Scanners write their result inside the scanned directory, so these would overwrite each other
+    targets = [(job.path, job.scantype) for job in jobs]
+    clashes = sorted({f"{scantype} in {job_path}" for job_path, scantype in targets if targets.count((job_path, scantype)) > 1})
+    if clashes:
+        raise ValueError(f"Each directory can only be scanned once per scan type: {', '.join(clashes)}")
+    return jobs, manifest.get("concurrency")
+
+def write_report(path, outcomes, started):
+    """Write the aggregated batch report: per-job status (passed, failed, error or
+    cancelled), exit code, timing and result files."""
+    report = {
+        "jobs": outcomes,
+        "summary": {
+            "total": len(outcomes),
+            "passed": sum(1 for outcome in outcomes if outcome["status"] == "passed"),
+            "failed": sum(1 for outcome in outcomes if outcome["status"] == "failed"),
+            "errors": sum(1 for outcome in outcomes if outcome["status"] == "error"),
+            "cancelled": sum(1 for outcome in outcomes if outcome["status"] == "cancelled"),
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+    }
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2)
+    Logger.get_logger().info(f"Batch report written to {path}")
+    return report
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+def get_cache_dir(*parts):
+    """Return (and create) a directory under the local aspm-cli cache.
+
+    The base directory is ASPM_CACHE_DIR when set, otherwise $XDG_CACHE_HOME/aspm-cli
+    or ~/.cache/aspm-cli.
+    """
+    base = os.getenv("ASPM_CACHE_DIR") or os.path.join(
+        os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "aspm-cli"
+    )
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Write JSON to path through a uniquely named temporary file in the same directory.
+
+    Readers see the old or the new content, never a partial file, and concurrent
+    writers from any thread or process never share a temporary file.
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(data, file, **dump_kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def hash_file(path, block_size=1024 * 1024):
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class FindingsCache:
+    """Per-file scanner findings keyed by file content hash.
+
+    Entries are scoped by a key describing the scanner (image, options), so a
+    cached entry is only reused for the same scanner configuration.
+    """
+
+    def __init__(self, namespace, scope):
+        self.scope = hashlib.sha256(json.dumps(scope, sort_keys=True).encode()).hexdigest()
+        self.path = get_cache_dir("findings", namespace)
+
+    def _entry_path(self, content_hash):
+        key = hashlib.sha256(f"{self.scope}:{content_hash}".encode()).hexdigest()
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def get(self, content_hash):
+        try:
+            with open(self._entry_path(content_hash), 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, content_hash, entry):
+        path = self._entry_path(content_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(entry, file, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+class ResultCache:
+    """Whole-scan result files keyed by repository tree, scanner image and options.
+
+    The cache is bounded by ASPM_RESULT_CACHE_MB (default 512). Hits refresh an
+    entry's modification time, and pruning evicts the least recently used entries.
+    """
+    default_max_mb = 512
+
+    def __init__(self, max_bytes=None):
+        self.path = get_cache_dir("results")
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.getenv("ASPM_RESULT_CACHE_MB", self.default_max_mb)) * 1024 * 1024)
+
+    @staticmethod
+    def make_key(parts):
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def _paths(self, key):
+        return os.path.join(self.path, f"{key}.result"), os.path.join(self.path, f"{key}.meta.json")
+
+    def get(self, key, dest):
+        """Copy a cached result to dest and return its exit code, or None on a miss."""
+        result_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, 'r') as file:
+                meta = json.load(file)
+            shutil.copyfile(result_path, dest)
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        os.utime(result_path, (now, now))
+        os.utime(meta_path, (now, now))
+        return meta["exit_code"]
+
+    def put(self, key, src, exit_code):
+        result_path, meta_path = self._paths(key)
+        tmp_path = f"{result_path}.{os.getpid()}.tmp"
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, result_path)
+        with open(meta_path, 'w') as file:
+            json.dump({"exit_code": exit_code, "created": time.time()}, file)
+        self.prune()
+
+    def entries(self):
+        """Return (mtime, size, key) for every entry, least recently used first."""
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith(".result"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name[:-len(".result")]))
+        return sorted(entries)
+
+    def remove(self, key):
+        for path in self._paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def prune(self, max_bytes=None):
+        """Evict least recently used entries until the cache fits in max_bytes. Returns the number evicted."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, key in entries:
+            if total <= max_bytes:
+                break
+            self.remove(key)
+            total -= size
+            evicted += 1
+        return evicted
@@ -0,0 +1,113 @@
+import os
+
+from aspm_cli.utils.logger import Lazy, Logger
+from aspm_cli.utils.process import run_process
+from aspm_cli.utils.run_controller import RunController
+
+def host_user():
+    """UID:GID of the invoking user, so files created in the workspace are owned by it (None on Windows)."""
+    if not hasattr(os, "getuid"):
+        return None
+    return f"{os.getuid()}:{os.getgid()}"
+
+class ContainerJob:
+    """A scanner container invocation: image, arguments, workspace mount and environment.
+
+    temporary_mount marks a mount_source that is deleted after the job, such as
+    a scratch copy of the files to scan; such jobs never use a warm container.
+    """
+
+    def __init__(self, image, args=None, mount_target=None, mount_source=None, workdir=None, env=None, entrypoint=None, user=None, labels=None, temporary_mount=False):
+        self.image = image
+        self.args = list(args or [])
+        self.mount_target = mount_target
+        self.mount_source = mount_source or os.getcwd()
+        self.workdir = workdir
+        self.env = dict(env or {})
+        self.entrypoint = entrypoint
+        self.user = user
+        self.labels = dict(labels or {})
+        self.temporary_mount = temporary_mount
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def docker_run_cmd(self, engine="docker"):
+        """Equivalent one-off `docker run --rm` command (or `podman run --rm`)."""
+        cmd = [engine, "run", "--rm"]
+        for key, value in self.env.items():
+            cmd.extend(["-e", f"{key}={value}"])
+        if self.mount_target:
+            cmd.extend(["-v", f"{self.mount_source}:{self.mount_target}"])
+        if self.workdir:
+            cmd.extend(["--workdir", self.workdir])
+        if self.entrypoint:
+            cmd.extend(["--entrypoint", self.entrypoint])
+        if self.user and engine == "podman":
+            # Rootless podman maps the invoking user into the container instead
+            cmd.append("--userns=keep-id")
+        elif self.user:
+            cmd.extend(["--user", self.user])
+        for key, value in self.labels.items():
+            cmd.extend(["--label", f"{key}={value}"])
+        cmd.append(self.image)
+        cmd.extend(self.args)
+        return cmd
+
+class _TrackedSink:
+    def __init__(self, sink):
+        self.sink = sink
+        self.written = False
+
+    def write(self, data):
+        self.written = True
+        self.sink.write(data)
+
+def run_container(job, on_line=None, stdout_sink=None):
+    """Run a container job on its backend (see backends.backend_for): through the scanner
+    daemon when one is serving, the backend is Docker and the mount is not temporary,
+    otherwise with `docker run`, `podman run` or the scanner's local binary.
+
+    Output is streamed line by line to on_line(stream, line) for local runs. With
+    stdout_sink, the container's stdout is written to stdout_sink.write() as it
+    arrives. Returns a subprocess.CompletedProcess holding the tail of stdout and stderr.
+    Under --fail-fast the container carries the run's labels so it can be stopped.
+    """
+    from aspm_cli.utils.backends import backend_for
+    from aspm_cli.utils.scanner_daemon import DaemonClient
+
+    controller = RunController.get()
+    controller.check()
+    job.labels.update(controller.labels())
+
+    backend = backend_for(job.image)
+    client = DaemonClient()
+    # A warm container would outlive a temporary workspace
+    if backend.name == "docker" and not job.temporary_mount and client.available():
+        Logger.get_logger().debug("Running %s in the scanner daemon: %s", job.image, Lazy(lambda: " ".join(job.args)))
+        tracked = _TrackedSink(stdout_sink) if stdout_sink is not None else None
+        try:
+            return client.run(job, tracked)
+        except OSError as e:
+            # Output already streamed cannot be taken back, so only retry locally from a clean start
+            if tracked and tracked.written:
+                raise
+            Logger.get_logger().warning(f"Scanner daemon unavailable ({e}), falling back to docker run.")
+
+    processes = []
+
+    def _on_start(process):
+        processes.append(process)
+        controller.on_start(process)
+
+    try:
+        Logger.get_logger().debug("Running %s with the %s backend", job.image, backend.name)
+        return run_process(backend.command(job), on_line=on_line, stdout_sink=stdout_sink, on_start=_on_start,
+                           **backend.popen_kwargs(job))
+    finally:
+        for process in processes:
+            controller.finished(process)
@@ -1,17 +1,140 @@
+import json
 import subprocess
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+from aspm_cli.utils.cache import get_cache_dir, write_json_atomic
 from aspm_cli.utils.logger import Logger
+from aspm_cli.utils.profiler import Profiler
 
-def docker_pull(image: str):
-    """Pull a Docker image using subprocess."""
-    Logger.get_logger().debug(f"Pulling Docker image: {image}")
-    result = subprocess.run(["docker", "pull", image], capture_output=True, text=True)
-
-    if result.returncode != 0:
-        Logger.get_logger().error(f"Failed to pull image {image}")
-        Logger.get_logger().error(result.stderr)
-        raise RuntimeError(f"Failed to pull image: {image}")
-    else:
-        Logger.get_logger().debug(result.stdout)
-        Logger.get_logger().debug(f"Successfully pulled image: {image}")
\ No newline at end of file
+# Guards the read-modify-write of the state files; docker_pull creates a cache per call
+_state_lock = threading.Lock()
+
+class ImageCache:
+    """Avoids `docker pull` when a scanner image is already available locally.
+
+    An image is considered ready when it was verified within the TTL
+    (ASPM_IMAGE_CACHE_TTL seconds, default 24h) or when `docker image inspect`
+    finds it locally (and, if a digest is expected, with that digest).
+    With ASPM_OFFLINE=true images are never pulled. engine selects the docker
+    compatible CLI (docker or podman); each keeps its own state file.
+    """
+    state_file = "images.json"
+    default_ttl = 24 * 60 * 60
+
+    def __init__(self, ttl=None, offline=None, engine="docker"):
+        self.engine = engine
+        self.ttl = ttl if ttl is not None else int(os.getenv("ASPM_IMAGE_CACHE_TTL", self.default_ttl))
+        self.offline = offline if offline is not None else os.getenv("ASPM_OFFLINE", "FALSE").upper() == "TRUE"
+        state_file = self.state_file if engine == "docker" else f"images-{engine}.json"
+        self.state_path = os.path.join(get_cache_dir(), state_file)
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _record(self, image, image_id):
+        """Remember a verified image. The state only saves work, so failing to write it is not an error."""
+        with _state_lock:
+            state = self._load_state()
+            state[image] = {"id": image_id, "checked_at": time.time()}
+            try:
+                write_json_atomic(self.state_path, state)
+            except OSError as e:
+                Logger.get_logger().warning(f"Unable to record image {image} in {self.state_path}: {e}")
+
+    @staticmethod
+    def _expected_digest(image, digest):
+        if digest:
+            return digest
+        if "@" in image:
+            return image.split("@", 1)[1]
+        return None
+
+    def inspect(self, image):
+        """Return (image id, repo digests) for a local image, or None if it is not present."""
+        result = subprocess.run(
+            [self.engine, "image", "inspect", "--format", "{{json .Id}} {{json .RepoDigests}}", image],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return None
+        try:
+            image_id, repo_digests = result.stdout.strip().split(" ", 1)
+            return json.loads(image_id), json.loads(repo_digests) or []
+        except ValueError:
+            return None
+
+    def cached_id(self, image):
+        """Image ID recorded at the last check, without calling docker."""
+        return (self._load_state().get(image) or {}).get("id")
+
+    def is_fresh(self, image):
+        entry = self._load_state().get(image)
+        return bool(entry) and time.time() - entry.get("checked_at", 0) < self.ttl
+
+    def ensure(self, image, digest=None, force=False):
+        """Make sure the image is available locally, pulling it only when needed."""
+        expected_digest = self._expected_digest(image, digest)
+
+        if not force and not expected_digest and self.is_fresh(image):
+            Logger.get_logger().debug(f"Image {image} verified within the last {self.ttl}s, skipping pull.")
+            return
+
+        if not force:
+            local = self.inspect(image)
+            if local:
+                image_id, repo_digests = local
+                if not expected_digest or any(d.endswith(expected_digest) for d in repo_digests):
+                    Logger.get_logger().debug(f"Image {image} is present locally, skipping pull.")
+                    self._record(image, image_id)
+                    return
+                Logger.get_logger().debug(f"Image {image} is present locally but does not match digest {expected_digest}.")
+
+        if self.offline:
+            raise RuntimeError(f"Image {image} is not available locally and offline mode is enabled.")
+
+        self.pull(image)
+        local = self.inspect(image)
+        self._record(image, local[0] if local else None)
+
+    def pull(self, image):
+        Logger.get_logger().debug(f"Pulling image with {self.engine}: {image}")
+        result = subprocess.run([self.engine, "pull", image], capture_output=True, text=True)
+
+        if result.returncode != 0:
+            Logger.get_logger().error(f"Failed to pull image {image}")
+            Logger.get_logger().error(result.stderr)
+            raise RuntimeError(f"Failed to pull image: {image}")
+        else:
+            Logger.get_logger().debug(result.stdout)
+            Logger.get_logger().debug(f"Successfully pulled image: {image}")
+
+def docker_pull(image: str, digest: str = None):
+    """Ensure a scanner image is available to its backend, pulling it only when necessary."""
+    from aspm_cli.utils.backends import backend_for
+
+    with Profiler.phase("docker_pull", image=image):
+        backend_for(image).ensure_image(image, digest)
+
+def prefetch_images(images, force=False):
+    """Pull several images in parallel. Returns a dict of image -> error (None on success)."""
+    from aspm_cli.utils.backends import backend_for
+
+    def _ensure(image):
+        try:
+            backend_for(image).ensure_image(image, force=force)
+            return None
+        except Exception as e:
+            return str(e)
+
+    images = list(dict.fromkeys(images))
+    if not images:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(images)) as executor:
+        return dict(zip(images, executor.map(_ensure, images)))
@@ -0,0 +1,211 @@
+import json
+import os
+import sqlite3
+import time
+
+from aspm_cli.scan.fingerprints import detect_tool, iter_findings
+from aspm_cli.utils.cache import get_cache_dir
+from aspm_cli.utils.logger import Logger
+
+_INSERT_BATCH = 10000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    scanner TEXT NOT NULL,
+    repo TEXT,
+    branch TEXT,
+    commit_sha TEXT,
+    source TEXT NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS findings (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    scanner TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    severity TEXT,
+    check_id TEXT,
+    file TEXT,
+    resource TEXT,
+    line INTEGER,
+    repo TEXT,
+    commit_sha TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_scope ON runs(scanner, repo, commit_sha, source);
+CREATE INDEX IF NOT EXISTS findings_run ON findings(run_id);
+CREATE INDEX IF NOT EXISTS findings_scanner ON findings(scanner);
+CREATE INDEX IF NOT EXISTS findings_severity ON findings(severity);
+CREATE INDEX IF NOT EXISTS findings_check_id ON findings(check_id);
+CREATE INDEX IF NOT EXISTS findings_file ON findings(file);
+CREATE INDEX IF NOT EXISTS findings_resource ON findings(resource);
+CREATE INDEX IF NOT EXISTS findings_repo ON findings(repo);
+DROP INDEX IF EXISTS findings_commit;
+CREATE INDEX IF NOT EXISTS findings_commit_status ON findings(commit_sha, fingerprint, repo, status);
+"""
+
+# Columns that can be filtered on and grouped by
+COLUMNS = ("scanner", "status", "severity", "check_id", "file", "resource", "repo", "commit_sha")
+
+def _relative_path(path):
+    path = (path or "").replace("\\", "/")
+    while path.startswith("./") or path.startswith("/"):
+        path = path[2:] if path.startswith("./") else path[1:]
+    return path or None
+
+def _upper(value):
+    return value.upper() if isinstance(value, str) else None
+
+def _row(tool, group, record):
+    """(status, severity, check_id, file, resource, line, message) of one finding."""
+    if tool == "checkov":
+        line = (record.get("file_line_range") or [None])[0]
+        return (group["check_list"].replace("_checks", ""), _upper(record.get("severity")), record.get("check_id"),
+                _relative_path(record.get("repo_file_path") or record.get("file_path")), record.get("resource"),
+                line, record.get("check_name"))
+    if tool == "opengrep":
+        extra = record.get("extra", {})
+        return ("failed", _upper(extra.get("severity")), record.get("check_id"), _relative_path(record.get("path")),
+                None, record.get("start", {}).get("line"), extra.get("message"))
+    component = record.get("component") or ""
+    return ("failed", _upper(record.get("severity")), record.get("rule"), _relative_path(component.split(":", 1)[-1]),
+            None, record.get("line"), record.get("message"))
+
+def _metadata(data, tool):
+    """(repo, branch, commit) recorded in a result file by the scanners, when present."""
+    if tool == "checkov":
+        for item in (data if isinstance(data, list) else [data]):
+            if isinstance(item, dict) and isinstance(item.get("details"), dict):
+                return item["details"].get("repo"), item["details"].get("branch"), None
+    elif isinstance(data, dict) and isinstance(data.get("repo_details"), dict):
+        details = data["repo_details"]
+        return details.get("repository_url"), details.get("branch"), details.get("commit")
+    return None, None, None
+
+class FindingsIndex:
+    """Local SQLite index of scan findings accumulated across runs.
+
+    Stored in ASPM_FINDINGS_DB, or findings.db in the aspm-cli cache. Each result
+    file is one run; ingesting it again for the same scanner, repository and
+    commit replaces the previous run.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("ASPM_FINDINGS_DB") or os.path.join(get_cache_dir("findings"), "findings.db")
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def ingest(self, result_file, repo=None, branch=None, commit_sha=None):
+        """Add a scanner result file to the index. Returns the number of findings stored."""
+        started = time.perf_counter()
+        with open(result_file, 'r') as file:
+            data = json.load(file)
+        tool = detect_tool(data)
+        if tool is None:
+            raise ValueError(f"{result_file}: unrecognized result format")
+        meta_repo, meta_branch, meta_commit = _metadata(data, tool)
+        repo, branch, commit_sha = repo or meta_repo, branch or meta_branch, commit_sha or meta_commit
+        source = os.path.basename(result_file)
+
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM runs WHERE scanner = ? AND repo IS ? AND commit_sha IS ? AND source = ?",
+                                   (tool, repo, commit_sha, source))
+                run_id = connection.execute(
+                    "INSERT INTO runs (scanner, repo, branch, commit_sha, source, ingested_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (tool, repo, branch, commit_sha, source, time.time())
+                ).lastrowid
+                count = 0
+                batch = []
+                for fingerprint, group, record in iter_findings(data, tool):
+                    batch.append((run_id, tool, fingerprint, *_row(tool, group, record), repo, commit_sha))
+                    if len(batch) >= _INSERT_BATCH:
+                        count += self._insert(connection, batch)
+                        batch = []
+                count += self._insert(connection, batch)
+        finally:
+            connection.close()
+        Logger.get_logger().info(f"Indexed {count} {tool} finding(s) from {result_file} in {time.perf_counter() - started:.2f}s")
+        return count
+
+    @staticmethod
+    def _insert(connection, rows):
+        connection.executemany(
+            "INSERT INTO findings (run_id, scanner, fingerprint, status, severity, check_id, file, resource, line, message, repo, commit_sha) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        return len(rows)
+
+    @staticmethod
+    def _where(filters, alias="f"):
+        """SQL conditions for filters of column -> value; a file value ending in / matches the directory."""
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column not in COLUMNS:
+                raise ValueError(f"Unknown column {column}")
+            if column == "file" and value.endswith("/"):
+                # A range instead of LIKE so the index on file is used
+                clauses.append(f"{alias}.file >= ? AND {alias}.file < ?")
+                params.extend([value, value[:-1] + "0"])
+            elif column == "severity":
+                clauses.append(f"{alias}.severity = ?")
+                params.append(value.upper())
+            else:
+                clauses.append(f"{alias}.{column} = ?")
+                params.append(value)
+        return clauses, params
+
+    def query(self, filters, limit=None):
+        """Findings matching filters, as dicts."""
+        clauses, params = self._where(filters)
+        sql = (f"SELECT {', '.join('f.' + column for column in COLUMNS)}, f.line, f.message, f.fingerprint FROM findings f"
+               f"{' WHERE ' + ' AND '.join(clauses) if clauses else ''}")
+        return self._fetch(sql + (" LIMIT ?" if limit else ""), params + ([limit] if limit else []))
+
+    def count(self, filters, group_by=None):
+        """Number of findings matching filters, or a list of (value, count) per group_by column."""
+        clauses, params = self._where(filters)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        if not group_by:
+            return self._fetch(f"SELECT COUNT(*) AS count FROM findings f{where}", params)[0]["count"]
+        if group_by not in COLUMNS:
+            raise ValueError(f"Unknown column {group_by}")
+        rows = self._fetch(f"SELECT f.{group_by} AS value, COUNT(*) AS count FROM findings f{where} "
+                           f"GROUP BY f.{group_by} ORDER BY count DESC", params)
+        return [(row["value"], row["count"]) for row in rows]
+
+    def diff(self, base_commit, head_commit, filters, limit=None):
+        """Findings of head_commit not present in base_commit ("added") and the reverse ("removed").
+
+        A finding counts as present only with the same status, so a check going
+        from passed to failed is added as failed and removed as passed.
+        """
+        filters = {column: value for column, value in filters.items() if column != "commit_sha"}
+        clauses, params = self._where(filters)
+        result = {}
+        for key, commit, other in (("added", head_commit, base_commit), ("removed", base_commit, head_commit)):
+            sql = (f"SELECT {', '.join('f.' + column for column in COLUMNS)}, f.line, f.message, f.fingerprint FROM findings f "
+                   f"WHERE f.commit_sha = ? {''.join(' AND ' + clause for clause in clauses)} AND NOT EXISTS ("
+                   # Fingerprints include the scanner; this subquery is answered from findings_commit_status alone
+                   "SELECT 1 FROM findings o WHERE o.commit_sha = ? AND o.fingerprint = f.fingerprint AND o.repo IS f.repo "
+                   "AND o.status = f.status)")
+            result[key] = self._fetch(sql + (" LIMIT ?" if limit else ""), [commit] + params + [other] + ([limit] if limit else []))
+        return result
+
+    def _fetch(self, sql, params):
+        connection = self.connect()
+        connection.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in connection.execute(sql, params)]
+        finally:
+            connection.close()
@@ -1,24 +1,132 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import re
+import sys
+import threading
 from colorama import Fore, init
 
 # Initialize colorama
 init(autoreset=True)
 
+_ANSI_CODES = re.compile(r"\x1b\[[0-9;]*m")
+
+class Lazy:
+    """Defers building a log argument until the record is actually formatted.
+
+    logger.debug("Executing command: %s", Lazy(lambda: " ".join(cmd))) costs
+    nothing when DEBUG is off.
+    """
+
+    def __init__(self, build):
+        self.build = build
+
+    def __str__(self):
+        return str(self.build())
+
+def _message(record, max_chars):
+    """The record's message, truncated to max_chars."""
+    message = record.getMessage()
+    if max_chars and len(message) > max_chars:
+        message = f"{message[:max_chars]}... [truncated {len(message) - max_chars} characters]"
+    return message
+
+class _ColoredFormatter(logging.Formatter):
+    def __init__(self, max_chars):
+        super().__init__('%(asctime)s - %(levelname)s - %(message)s')
+        self.max_chars = max_chars
+
+    def format(self, record):
+        # Same as logging.Formatter.format, with the message built once and capped
+        record.message = _message(record, self.max_chars)
+        record.asctime = self.formatTime(record, self.datefmt)
+        log_message = self.formatMessage(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_message = f"{log_message}\n{record.exc_text}"
+        if record.stack_info:
+            log_message = f"{log_message}\n{self.formatStack(record.stack_info)}"
+        # Apply color formatting based on log level
+        if record.levelname == 'ERROR':
+            return Fore.RED + log_message
+        elif record.levelname == 'WARNING':
+            return Fore.YELLOW + log_message
+        elif record.levelname == 'INFO':
+            return Fore.BLUE + log_message
+        return log_message
+
+class _JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log aggregation."""
+
+    def __init__(self, max_chars):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "message": _ANSI_CODES.sub("", _message(record, self.max_chars)),
+            "thread": record.threadName,
+            "module": record.module
+        }
+        if record.exc_text or record.exc_info:
+            entry["exception"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without formatting them or ever waiting.
+
+    When the queue is full the record is dropped and counted instead of stalling
+    the scan or upload thread that logged it.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens in the writer thread; only exceptions are rendered
+        # here, while their traceback is still alive
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 class Logger:
+    """Process-wide logger writing through a queue and a background writer thread.
+
+    The level comes from DEBUG, ASPM_LOG_FORMAT=json switches to JSON lines,
+    ASPM_LOG_MAX_CHARS (default 16384) truncates longer messages, and
+    ASPM_LOG_QUEUE_SIZE (default 10000) bounds the records waiting to be written.
+    """
     _instance = None
+    _listener = None
+    _handler = None
+    _lock = threading.Lock()
     _default_colors = {
         'INFO': Fore.BLUE,
         'WARNING': Fore.YELLOW,
         'ERROR': Fore.RED
     }
-    
+
     @classmethod
     def get_logger(cls):
         if not cls._instance:
-            cls._instance = cls._initialize_logger()
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = cls._initialize_logger()
         return cls._instance
-    
+
     @classmethod
     def _initialize_logger(cls):
         logger = logging.getLogger(__name__)
@@ -27,34 +135,60 @@ class Logger:
         if not logger.hasHandlers():
             # Set log level based on environment variable
             logger.setLevel(logging.DEBUG if os.getenv('DEBUG', 'FALSE').upper() == 'TRUE' else logging.INFO)
-            
-            # Add StreamHandler with colored formatter
-            formatter = cls._get_colored_formatter()
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
+            cls._start_writer(logger)
+            atexit.register(cls.flush)
+            if hasattr(os, "register_at_fork"):
+                # The writer thread does not survive fork(); batch workers start their own
+                os.register_at_fork(after_in_child=cls._restart_in_child)
 
         return logger
 
     @classmethod
-    def _get_colored_formatter(cls):
-        # Custom formatter that adds color to the log level
-        log_format = '%(asctime)s - %(levelname)s - %(message)s'
-
-        class ColoredFormatter(logging.Formatter):
-            def format(self, record):
-                log_message = super().format(record)
-                # Apply color formatting based on log level
-                if record.levelname == 'ERROR':
-                    return Fore.RED + log_message
-                elif record.levelname == 'WARNING':
-                    return Fore.YELLOW + log_message
-                elif record.levelname == 'INFO':
-                    return Fore.BLUE + log_message
-                return log_message
-        
-        return ColoredFormatter(log_format)
-    
+    def _formatter(cls):
+        max_chars = int(os.getenv("ASPM_LOG_MAX_CHARS", "16384"))
+        if os.getenv("ASPM_LOG_FORMAT", "text").lower() == "json":
+            return _JsonFormatter(max_chars)
+        return _ColoredFormatter(max_chars)
+
+    @classmethod
+    def _start_writer(cls, logger):
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(cls._formatter())
+        cls._handler = _NonBlockingQueueHandler(queue.Queue(maxsize=int(os.getenv("ASPM_LOG_QUEUE_SIZE", "10000"))))
+        cls._listener = logging.handlers.QueueListener(cls._handler.queue, console_handler)
+        cls._listener.start()
+        logger.addHandler(cls._handler)
+
+    @classmethod
+    def _restart_in_child(cls):
+        if cls._instance is None or cls._handler is None:
+            return
+        cls._lock = threading.Lock()
+        cls._instance.removeHandler(cls._handler)
+        cls._start_writer(cls._instance)
+        if "multiprocessing" in sys.modules:
+            # Pool workers leave through os._exit(), which skips atexit but runs these
+            sys.modules["multiprocessing"].util.Finalize(None, cls.flush, exitpriority=0)
+
+    @classmethod
+    def flush(cls):
+        """Write out every queued record; called at exit."""
+        if cls._listener is None:
+            return
+        listener, handler = cls._listener, cls._handler
+        cls._listener = None
+        listener.stop()
+        if handler.dropped:
+            for target in listener.handlers:
+                target.handle(logging.makeLogRecord({
+                    "msg": f"{handler.dropped} log record(s) dropped because the log queue was full",
+                    "levelno": logging.WARNING, "levelname": "WARNING"
+                }))
+        # Anything logged after this point is written synchronously
+        cls._instance.removeHandler(handler)
+        for target in listener.handlers:
+            cls._instance.addHandler(target)
+
     @staticmethod
     def log_with_color(level, message, color=None):
         # Get the logger
@@ -73,4 +207,3 @@ class Logger:
             logger.error(message)
         else:
             logger.debug(message)  # Default to DEBUG if level is not recognized
-
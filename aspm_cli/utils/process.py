@@ -0,0 +1,96 @@
+import logging
+import os
+import re
+import subprocess
+import threading
+from collections import deque
+
+from aspm_cli.utils.logger import Logger
+
+# Longest chunk read at once; longer lines are handled in pieces
+MAX_LINE_CHARS = 64 * 1024
+
+# Scanner output lines turned into short status messages for the spinner
+PROGRESS_PATTERNS = {
+    "checkov": [
+        (re.compile(r"\[\s*(\w+)\s+framework\s*\]:\s*(\d+)%"), "{0} {1}%"),
+        (re.compile(r"^(\w+) scan results:"), "{0} results ready"),
+    ],
+    "opengrep": [
+        (re.compile(r"Scanning (\d+) files?.* with (\d+)"), "scanning {0} files with {1} rules"),
+        (re.compile(r"Ran (\d+) rules? on (\d+) files?"), "ran {0} rules on {1} files"),
+    ],
+    "sonar-scanner": [
+        (re.compile(r"Sensor (.+?) \[\w+\]$"), "sensor {0}"),
+        (re.compile(r"(ANALYSIS SUCCESSFUL|QUALITY GATE STATUS: \w+)"), "{0}"),
+        (re.compile(r"Waiting for the analysis report to be processed"), "waiting for the analysis report"),
+    ],
+}
+
+def tail_lines():
+    return int(os.getenv("ASPM_OUTPUT_TAIL_LINES", "200"))
+
+def progress_handler(kind, on_status, prefix=""):
+    """Build an on_line callback that reports scanner progress through on_status(message)."""
+    patterns = PROGRESS_PATTERNS.get(kind, [])
+
+    def _on_line(stream, line):
+        for pattern, template in patterns:
+            match = pattern.search(line)
+            if match:
+                on_status(prefix + template.format(*match.groups()))
+                return
+    return _on_line
+
+def _pump(pipe, stream, tail, on_line, log_lines, sink=None):
+    logger = Logger.get_logger()
+    log_lines = log_lines and logger.isEnabledFor(logging.DEBUG)
+    for line in iter(lambda: pipe.readline(MAX_LINE_CHARS), ""):
+        if sink:
+            # Keep draining the pipe even if the sink fails, or the process would block
+            try:
+                sink.write(line)
+            except Exception as e:
+                logger.error(f"Failed to write {stream} output: {e}")
+                sink = None
+            continue
+        tail.append(line)
+        if log_lines:
+            logger.debug(line.rstrip("\n"))
+        if on_line:
+            try:
+                on_line(stream, line)
+            except Exception as e:
+                logger.debug(f"Progress callback failed: {e}")
+    pipe.close()
+
+def run_process(cmd, on_line=None, max_lines=None, log_lines=True, on_start=None, stdout_sink=None, **popen_kwargs):
+    """Run a command, streaming stdout and stderr line by line.
+
+    Only the last max_lines lines of each stream are kept (ASPM_OUTPUT_TAIL_LINES,
+    default 200), so memory stays bounded however much the process prints. Lines
+    are logged at debug level as they arrive. on_line(stream, line) is called for
+    every line and on_start(process) once the process is started. With stdout_sink,
+    stdout is treated as data and written to stdout_sink.write() as it arrives
+    instead of being logged and kept.
+    Returns a subprocess.CompletedProcess holding the output tails.
+    """
+    max_lines = max_lines or tail_lines()
+    stdout_tail = deque(maxlen=max_lines)
+    stderr_tail = deque(maxlen=max_lines)
+
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors="replace", bufsize=1, **popen_kwargs
+    )
+    if on_start:
+        on_start(process)
+    pumps = [
+        threading.Thread(target=_pump, args=(process.stdout, "stdout", stdout_tail, on_line, log_lines, stdout_sink), daemon=True),
+        threading.Thread(target=_pump, args=(process.stderr, "stderr", stderr_tail, on_line, log_lines), daemon=True),
+    ]
+    for pump in pumps:
+        pump.start()
+    returncode = process.wait()
+    for pump in pumps:
+        pump.join()
+    return subprocess.CompletedProcess(cmd, returncode, "".join(stdout_tail), "".join(stderr_tail))
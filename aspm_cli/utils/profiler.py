@@ -0,0 +1,138 @@
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from aspm_cli.utils.logger import Logger
+
+def _peak_rss_kb(who):
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+class Profiler:
+    """Records the duration, I/O volume and peak memory of each phase of a run.
+
+    Disabled by default; phase() is then a no-op. When enabled with --profile, a
+    summary table is logged at the end and profile.json plus a Chrome trace-event
+    file (trace.json, open it in chrome://tracing or Perfetto) are written to the
+    output directory. With python_profile, Python-side phases also run under
+    cProfile and their stats are saved as <phase>.prof.
+    """
+    _instance = None
+
+    def __init__(self, enabled=False, output_dir=None, python_profile=False):
+        self.enabled = enabled
+        self.output_dir = output_dir or "aspm-profile"
+        self.python_profile = python_profile
+        self.phases = []
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.origin_wall = time.time()
+
+    @classmethod
+    def get(cls):
+        if not cls._instance:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def enable(cls, output_dir=None, python_profile=False):
+        cls._instance = cls(True, output_dir, python_profile)
+        return cls._instance
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name, python=False, **attrs):
+        """Time a phase. The yielded dict can be updated with bytes_read / bytes_written."""
+        profiler = cls.get()
+        record = dict(attrs)
+        if not profiler.enabled:
+            yield record
+            return
+
+        python_profile = cProfile.Profile() if (python and profiler.python_profile) else None
+        started = time.perf_counter()
+        if python_profile:
+            try:
+                python_profile.enable()
+            except ValueError:  # Another profiler is already active on this thread
+                python_profile = None
+        try:
+            yield record
+        finally:
+            ended = time.perf_counter()
+            if python_profile:
+                python_profile.disable()
+            record.update({
+                "name": name,
+                "start": started - profiler.origin,
+                "duration": ended - started,
+                "thread": threading.get_ident(),
+                "thread_name": threading.current_thread().name,
+                "peak_rss_kb": _peak_rss_kb(resource.RUSAGE_SELF) if resource else None,
+                "children_peak_rss_kb": _peak_rss_kb(resource.RUSAGE_CHILDREN) if resource else None,
+            })
+            with profiler.lock:
+                profiler.phases.append(record)
+                if python_profile:
+                    os.makedirs(profiler.output_dir, exist_ok=True)
+                    safe_name = re.sub(r'[^\w.-]', '_', name)
+                    python_profile.dump_stats(os.path.join(profiler.output_dir, f"{safe_name}-{len(profiler.phases)}.prof"))
+
+    def summary_lines(self):
+        lines = [f"{'phase':<28}{'seconds':>10}{'read MB':>10}{'written MB':>12}{'peak RSS MB':>13}"]
+        for record in sorted(self.phases, key=lambda r: r["start"]):
+            read_mb = record.get("bytes_read", 0) / (1024 * 1024)
+            written_mb = record.get("bytes_written", 0) / (1024 * 1024)
+            rss_mb = (record.get("peak_rss_kb") or 0) / 1024
+            lines.append(f"{record['name']:<28}{record['duration']:>10.3f}{read_mb:>10.2f}{written_mb:>12.2f}{rss_mb:>13.1f}")
+        return lines
+
+    def chrome_trace(self):
+        pid = os.getpid()
+        events = []
+        for record in self.phases:
+            args = {k: v for k, v in record.items() if k not in ("name", "start", "duration", "thread", "thread_name")}
+            events.append({
+                "name": record["name"],
+                "ph": "X",
+                "ts": int(record["start"] * 1e6),
+                "dur": int(record["duration"] * 1e6),
+                "pid": pid,
+                "tid": record["thread"],
+                "args": args
+            })
+        for thread, thread_name in {(r["thread"], r["thread_name"]) for r in self.phases}:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread, "args": {"name": thread_name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def report(self):
+        """Log the summary table and write profile.json and trace.json."""
+        if not self.enabled:
+            return
+        for line in self.summary_lines():
+            Logger.get_logger().info(line)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, "profile.json"), 'w') as file:
+            json.dump({
+                "started_at": self.origin_wall,
+                "total_seconds": time.perf_counter() - self.origin,
+                "peak_rss_kb": _peak_rss_kb(resource.RUSAGE_SELF) if resource else None,
+                "phases": sorted(self.phases, key=lambda r: r["start"])
+            }, file, indent=2)
+        with open(os.path.join(self.output_dir, "trace.json"), 'w') as file:
+            json.dump(self.chrome_trace(), file)
+        Logger.get_logger().info(f"Profile written to {self.output_dir}")
@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import time
+
+from aspm_cli.utils.logger import Logger
+
+_WHITESPACE = b" \t\r\n"
+_CHUNK_SIZE = 64 * 1024
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':')).encode()
+
+def _first_non_ws(file):
+    """Return (position, byte) of the first non-whitespace byte, skipping a UTF-8 BOM."""
+    file.seek(0)
+    offset = 0
+    while True:
+        chunk = file.read(_CHUNK_SIZE)
+        if not chunk:
+            return None, None
+        if offset == 0 and chunk.startswith(b"\xef\xbb\xbf"):
+            chunk, offset = chunk[3:], 3
+        stripped = chunk.lstrip(_WHITESPACE)
+        if stripped:
+            return offset + len(chunk) - len(stripped), stripped[:1]
+        offset += len(chunk)
+
+def _last_non_ws(file, end):
+    """Return (position, byte) of the last non-whitespace byte before `end`."""
+    while end > 0:
+        start = max(0, end - _CHUNK_SIZE)
+        file.seek(start)
+        chunk = file.read(end - start)
+        stripped = chunk.rstrip(_WHITESPACE)
+        if stripped:
+            return start + len(stripped) - 1, stripped[-1:]
+        end = start
+    return None, None
+
+def _append_before_closing(file, opening, closing, payload):
+    """Insert payload as the last member of the top-level container, in place."""
+    open_pos, first = _first_non_ws(file)
+    file.seek(0, os.SEEK_END)
+    close_pos, last = _last_non_ws(file, file.tell())
+    if first != opening or last != closing:
+        raise ValueError(f"Expected a top-level JSON {'array' if opening == b'[' else 'object'}")
+
+    prev_pos, _ = _last_non_ws(file, close_pos)
+    separator = b"" if prev_pos == open_pos else b","
+    file.seek(close_pos)
+    file.write(separator + payload + closing)
+    file.truncate()
+
+def _report(path, started):
+    size = os.path.getsize(path)
+    elapsed = time.perf_counter() - started
+    Logger.get_logger().debug(f"Result file {path} processed: {size} bytes in {elapsed:.3f}s")
+    return {"bytes": size, "seconds": elapsed}
+
+def append_to_json_array(path, element):
+    """Append an element to the top-level JSON array in path without parsing the document.
+
+    A top-level object is wrapped into an array first, streaming the original bytes
+    into a temporary file. Returns the size of the result and the time taken.
+    """
+    started = time.perf_counter()
+    payload = _dumps(element)
+    with open(path, 'r+b') as file:
+        start, first = _first_non_ws(file)
+        if first == b"[":
+            _append_before_closing(file, b"[", b"]", payload)
+            return _report(path, started)
+        if first != b"{":
+            raise ValueError("Expected a top-level JSON array or object")
+
+        tmp_path = f"{path}.tmp"
+        # Leave out a UTF-8 BOM, which is not allowed inside the array
+        file.seek(start)
+        with open(tmp_path, 'wb') as tmp:
+            tmp.write(b"[")
+            shutil.copyfileobj(file, tmp, _CHUNK_SIZE)
+            tmp.write(b"," + payload + b"]")
+    os.replace(tmp_path, path)
+    return _report(path, started)
+
+def set_json_object_key(path, key, value):
+    """Add a key to the top-level JSON object in path, in place, without parsing the document.
+
+    If the key already exists the new value is appended after it and wins when the
+    document is parsed. Returns the size of the result and the time taken.
+    """
+    started = time.perf_counter()
+    with open(path, 'r+b') as file:
+        _append_before_closing(file, b"{", b"}", _dumps(key) + b":" + _dumps(value))
+    return _report(path, started)
+
+class JsonArrayWriter:
+    """Writes a JSON document received in chunks to path as a top-level array with element appended.
+
+    Used for scanner output streamed over stdout: a top-level object is wrapped
+    into an array as it passes through, so the artifact is written exactly once.
+    close() returns the same stats as append_to_json_array, or None (and leaves no
+    file) when nothing was received.
+    """
+
+    def __init__(self, path, element):
+        self.path = path
+        self.payload = _dumps(element)
+        self.started = time.perf_counter()
+        self.opening = None
+        self.file = open(path, 'w+b')
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        if self.opening is None:
+            data = data.lstrip(_WHITESPACE)
+            if not data:
+                return
+            self.opening = data[:1]
+            if self.opening == b"{":
+                self.file.write(b"[")
+        self.file.write(data)
+
+    def close(self):
+        with self.file:
+            if self.opening == b"[":
+                _append_before_closing(self.file, b"[", b"]", self.payload)
+            elif self.opening == b"{":
+                self.file.seek(0, os.SEEK_END)
+                self.file.write(b"," + self.payload + b"]")
+        if self.opening is None:
+            os.remove(self.path)
+            return None
+        if self.opening not in (b"[", b"{"):
+            raise ValueError("Expected a top-level JSON array or object")
+        return _report(self.path, self.started)
+
+def write_json_array(path, document, element=None):
+    """Write document as a top-level array (wrapping an object) with element appended, unless it is None."""
+    started = time.perf_counter()
+    items = document if isinstance(document, list) else [document]
+    if element is not None:
+        items = items + [element]
+    with open(path, 'w') as file:
+        json.dump(items, file, separators=(',', ':'))
+    return _report(path, started)
@@ -0,0 +1,132 @@
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+from aspm_cli.utils.logger import Logger
+
+# Exit codes of `docker run` when its container was stopped (SIGTERM) or killed (SIGKILL),
+# and of a natively run scanner terminated by the same signals
+STOPPED_EXIT_CODES = (137, 143, -15, -9)
+
+class RunCancelled(Exception):
+    """Raised by work that was cancelled because another part of the run failed."""
+
+class RunController:
+    """Coordinates the scanner containers and uploads of one run under a fail-fast policy.
+
+    Disabled by default. With --fail-fast every scanner container is labelled with
+    the run id (ASPM_RUN_ID, inherited by batch workers) and tracked while it runs.
+    The first hard failure stops the other containers (docker stop, then docker
+    kill after ASPM_STOP_TIMEOUT seconds, default 10), makes pending and retrying
+    uploads raise RunCancelled, and is reported in the run summary. Work done on
+    behalf of the failed scan itself (acting_for) is not cancelled, so its result
+    is still uploaded.
+    """
+    _instance = None
+
+    def __init__(self, fail_fast=False):
+        self.fail_fast = fail_fast
+        self.run_id = os.getenv("ASPM_RUN_ID")
+        self.stop_timeout = int(os.getenv("ASPM_STOP_TIMEOUT", "10"))
+        self.cancelled = threading.Event()
+        self.failure = None
+        self.stopped = []
+        self.cancelled_uploads = 0
+        self.processes = set()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @classmethod
+    def get(cls):
+        if not cls._instance:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def enable(cls):
+        os.environ.setdefault("ASPM_RUN_ID", uuid.uuid4().hex[:12])
+        cls._instance = cls(True)
+        return cls._instance
+
+    def labels(self):
+        """Docker labels identifying this run's containers."""
+        return {"aspm-run": self.run_id} if self.run_id else {}
+
+    def on_start(self, process):
+        """run_process callback tracking a `docker run` client until it exits."""
+        with self.lock:
+            self.processes.add(process)
+        if self.cancelled.is_set():
+            process.terminate()
+
+    def finished(self, process):
+        with self.lock:
+            self.processes.discard(process)
+
+    @contextmanager
+    def acting_for(self, source):
+        """Attribute work on this thread to a scan, e.g. the upload of its result."""
+        previous = getattr(self.local, "source", None)
+        self.local.source = source
+        try:
+            yield
+        finally:
+            self.local.source = previous
+
+    def current_source(self):
+        return getattr(self.local, "source", None)
+
+    def check(self, what=None):
+        """Raise RunCancelled once the run has been cancelled, unless acting for the failed scan."""
+        if self.cancelled.is_set() and self.current_source() != self.failure[0]:
+            if what == "upload":
+                with self.lock:
+                    self.cancelled_uploads += 1
+            raise RunCancelled(f"cancelled after {self.failure[0]} failed")
+
+    def wait(self, seconds):
+        """Sleep for a retry delay, waking up early if the run is cancelled. Returns True if cancelled."""
+        return self.cancelled.wait(seconds)
+
+    def fail(self, source, reason):
+        """Record a hard failure; with fail-fast, the first one stops everything else."""
+        if not self.fail_fast:
+            return
+        with self.lock:
+            if self.failure:
+                return
+            self.failure = (source, reason)
+        Logger.get_logger().error(f"Fail-fast: {source} failed ({reason}), stopping the remaining scans and uploads.")
+        self.cancelled.set()
+        self._stop_containers()
+
+    def _stop_containers(self):
+        from aspm_cli.utils.backends import container_backend
+        from aspm_cli.utils.scanner_daemon import DaemonClient
+
+        if self.run_id:
+            Logger.get_logger().info("Stopping this run's containers...")
+            self.stopped.extend(container_backend().stop_labelled(f"aspm-run={self.run_id}", self.stop_timeout))
+            client = DaemonClient()
+            if client.available():
+                try:
+                    self.stopped.extend(client.request({"op": "cancel", "run_id": self.run_id}).get("stopped", []))
+                except (OSError, ValueError) as e:
+                    Logger.get_logger().warning(f"Unable to cancel scanner daemon jobs: {e}")
+
+        # Clients whose container was not created yet, e.g. still pulling, and native scanners
+        with self.lock:
+            processes = list(self.processes)
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+
+    def report(self):
+        """Log what fail-fast stopped. Returns True when the run was cancelled."""
+        if not self.failure:
+            return False
+        source, reason = self.failure
+        Logger.get_logger().error(f"Run stopped early: {source} failed ({reason}); "
+                                  f"{len(self.stopped)} container(s) stopped, {self.cancelled_uploads} upload(s) cancelled.")
+        return True
@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import threading
+import time
+
+from aspm_cli.utils.cache import get_cache_dir
+from aspm_cli.utils.container import ContainerJob
+from aspm_cli.utils.logger import Lazy, Logger
+from aspm_cli.utils.process import run_process
+
+def socket_path():
+    return os.getenv("ASPM_SERVE_SOCKET") or os.path.join(get_cache_dir("serve"), "aspm.sock")
+
+class WarmContainer:
+    """A long-lived scanner container that runs jobs with `docker exec`."""
+
+    def __init__(self, image, mount_source, mount_target):
+        self.image = image
+        self.mount_source = mount_source
+        self.mount_target = mount_target
+        key = hashlib.sha256(f"{image}|{mount_source}|{mount_target}".encode()).hexdigest()[:12]
+        self.name = f"aspm-serve-{key}"
+        self.entrypoint, self.cmd = self._image_command(image)
+
+    @staticmethod
+    def _image_command(image):
+        result = subprocess.run(
+            ["docker", "image", "inspect", "--format", "{{json .Config.Entrypoint}} {{json .Config.Cmd}}", image],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Unable to inspect image {image}: {result.stderr.strip()}")
+        entrypoint, cmd = result.stdout.strip().split(" ", 1)
+        return json.loads(entrypoint) or [], json.loads(cmd) or []
+
+    def start(self):
+        subprocess.run(["docker", "rm", "-f", self.name], capture_output=True, text=True)
+        cmd = ["docker", "run", "-d", "--rm", "--name", self.name, "--entrypoint", "sleep"]
+        if self.mount_target:
+            cmd.extend(["-v", f"{self.mount_source}:{self.mount_target}"])
+        cmd.extend([self.image, "infinity"])
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Unable to start warm container for {self.image}: {result.stderr.strip()}")
+        Logger.get_logger().info(f"Started warm container {self.name} for {self.image}")
+
+    def is_running(self):
+        result = subprocess.run(["docker", "inspect", "--format", "{{.State.Running}}", self.name], capture_output=True, text=True)
+        return result.returncode == 0 and result.stdout.strip() == "true"
+
+    def stop(self):
+        subprocess.run(["docker", "rm", "-f", self.name], capture_output=True, text=True)
+        Logger.get_logger().info(f"Stopped warm container {self.name}")
+
+    def exec_cmd(self, job):
+        cmd = ["docker", "exec"]
+        for key, value in job.env.items():
+            cmd.extend(["-e", f"{key}={value}"])
+        if job.workdir:
+            cmd.extend(["--workdir", job.workdir])
+        if job.user:
+            cmd.extend(["--user", job.user])
+        cmd.append(self.name)
+        # Same semantics as `docker run`: arguments replace the image CMD
+        cmd.extend([job.entrypoint] if job.entrypoint else self.entrypoint)
+        cmd.extend(job.args if (job.args or job.entrypoint) else self.cmd)
+        return cmd
+
+class ScannerDaemon:
+    """Keeps scanner containers warm and runs scan jobs received over a Unix socket.
+
+    Containers are started on the first job for an (image, workspace) pair,
+    health-checked periodically, and everything shuts down after idle_timeout
+    seconds without jobs.
+    """
+
+    def __init__(self, path=None, idle_timeout=900, health_interval=30):
+        self.path = path or socket_path()
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.containers = {}
+        self.lock = threading.Lock()
+        self.last_activity = time.time()
+        self.active_jobs = 0
+        # Running jobs per fail-fast run id: (warm container, docker exec process)
+        self.runs = {}
+        self.server = None
+
+    def _container_for(self, job):
+        key = (job.image, job.mount_source, job.mount_target)
+        with self.lock:
+            container = self.containers.get(key)
+            if container is None:
+                container = WarmContainer(*key)
+                container.start()
+                self.containers[key] = container
+            return container
+
+    def run_job(self, job, stdout_sink=None):
+        container = self._container_for(job)
+        cmd = container.exec_cmd(job)
+        Logger.get_logger().debug("Executing command: %s", Lazy(lambda: " ".join(cmd)))
+        run_id = job.labels.get("aspm-run")
+        jobs = []
+
+        def _on_start(process):
+            if run_id:
+                with self.lock:
+                    self.runs.setdefault(run_id, []).append((container, process))
+                jobs.append((container, process))
+
+        try:
+            result = run_process(cmd, stdout_sink=stdout_sink, on_start=_on_start)
+        finally:
+            with self.lock:
+                running = self.runs.get(run_id, [])
+                for entry in jobs:
+                    if entry in running:
+                        running.remove(entry)
+                if run_id in self.runs and not running:
+                    del self.runs[run_id]
+            if job.temporary_mount:
+                self._discard(container)
+        return {
+            "returncode": result.returncode,
+            "stdout": result.stdout,
+            "stderr": result.stderr
+        }
+
+    def _discard(self, container):
+        """Stop a warm container whose workspace is going away."""
+        with self.lock:
+            for key, warm in list(self.containers.items()):
+                if warm is container:
+                    del self.containers[key]
+        container.stop()
+
+    def cancel(self, run_id):
+        """Stop the running jobs of a fail-fast run. Returns the stopped container names.
+
+        Killing `docker exec` leaves the process running in the container, so the
+        warm containers are removed instead; the next job starts them again.
+        """
+        with self.lock:
+            containers = {container.name: container for container, _ in self.runs.pop(run_id, [])}
+            for key, container in list(self.containers.items()):
+                if container.name in containers:
+                    del self.containers[key]
+        for container in containers.values():
+            container.stop()
+        return list(containers)
+
+    def handle(self, request, emit=None):
+        """Handle one request; emit(message) sends intermediate messages such as streamed stdout."""
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "containers": [c.name for c in self.containers.values()], "active_jobs": self.active_jobs}
+        if op == "cancel":
+            return {"ok": True, "stopped": self.cancel(request.get("run_id"))}
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        if op == "run":
+            with self.lock:
+                self.active_jobs += 1
+            try:
+                sink = _EmitSink(emit) if request.get("stream_stdout") and emit else None
+                return self.run_job(ContainerJob.from_dict(request["job"]), sink)
+            finally:
+                with self.lock:
+                    self.active_jobs -= 1
+                    self.last_activity = time.time()
+        return {"error": f"Unknown operation: {op}"}
+
+    def _monitor(self):
+        last_health_check = time.time()
+        while self.server:
+            time.sleep(min(self.health_interval, 5))
+            with self.lock:
+                idle = self.active_jobs == 0 and time.time() - self.last_activity > self.idle_timeout
+                if time.time() - last_health_check < self.health_interval:
+                    containers = []
+                else:
+                    containers = list(self.containers.items())
+                    last_health_check = time.time()
+                for key, container in containers:
+                    if not container.is_running():
+                        Logger.get_logger().warning(f"Warm container {container.name} is not running; it will be restarted on the next job.")
+                        del self.containers[key]
+            if idle:
+                Logger.get_logger().info(f"No scan jobs for {self.idle_timeout}s, shutting down.")
+                self.shutdown()
+                return
+
+    def serve_forever(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                lock = threading.Lock()
+
+                def emit(message):
+                    with lock:
+                        self.wfile.write(json.dumps(message).encode() + b"\n")
+
+                try:
+                    response = daemon.handle(json.loads(self.rfile.readline()), emit)
+                except Exception as e:
+                    response = {"error": str(e)}
+                emit(response)
+
+        if os.path.exists(self.path):
+            if DaemonClient(self.path).available():
+                raise RuntimeError(f"A scanner daemon is already serving on {self.path}")
+            os.remove(self.path)
+        self.server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        os.chmod(self.path, 0o600)
+        threading.Thread(target=self._monitor, daemon=True).start()
+        Logger.get_logger().info(f"Scanner daemon listening on {self.path}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self._cleanup()
+
+    def shutdown(self):
+        if self.server:
+            server, self.server = self.server, None
+            server.shutdown()
+
+    def _cleanup(self):
+        with self.lock:
+            for container in self.containers.values():
+                container.stop()
+            self.containers.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class _EmitSink:
+    """Forwards streamed stdout to the client as {"stdout_chunk": ...} messages."""
+
+    def __init__(self, emit):
+        self.emit = emit
+
+    def write(self, data):
+        self.emit({"stdout_chunk": data})
+
+class DaemonClient:
+    """Sends scan jobs to a running ScannerDaemon."""
+
+    def __init__(self, path=None, timeout=None):
+        self.path = path or socket_path()
+        self.timeout = timeout
+
+    def request(self, payload, timeout=None):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout if timeout is not None else self.timeout)
+            sock.connect(self.path)
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            with sock.makefile('rb') as response:
+                return json.loads(response.readline())
+
+    def available(self):
+        if os.getenv("ASPM_NO_DAEMON", "FALSE").upper() == "TRUE" or not os.path.exists(self.path):
+            return False
+        try:
+            return self.request({"op": "ping"}, timeout=2).get("ok", False)
+        except (OSError, ValueError):
+            return False
+
+    def run(self, job, stdout_sink=None):
+        payload = {"op": "run", "job": job.to_dict(), "stream_stdout": stdout_sink is not None}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            with sock.makefile('rb') as messages:
+                for line in messages:
+                    response = json.loads(line)
+                    if "stdout_chunk" in response:
+                        if stdout_sink is not None:
+                            stdout_sink.write(response["stdout_chunk"])
+                        continue
+                    break
+                else:
+                    raise OSError("Scanner daemon closed the connection")
+        if "error" in response:
+            raise OSError(response["error"])
+        return subprocess.CompletedProcess(job.docker_run_cmd(), response["returncode"], response["stdout"], response["stderr"])
@@ -25,12 +25,15 @@ class Spinner:
             self._use_spinner()
 
     def _use_spinner(self):
+        width = 0
         while not self.stop_running:
-            sys.stdout.write(f"\r{self.color}{self.message} {next(self.spinner)}")
+            line = f"{self.message} {next(self.spinner)}"
+            sys.stdout.write(f"\r{self.color}{line.ljust(width)}")
             sys.stdout.flush()
+            width = len(line)
             time.sleep(0.1)  
 
-        sys.stdout.write("\r" + " " * (len(self.message) + 2) + "\r")
+        sys.stdout.write("\r" + " " * (width + 2) + "\r")
 
     def _log_status(self):
         Logger.get_logger().info(f"{self.message}")
@@ -38,19 +41,25 @@ class Spinner:
 
         # Log status update every 10 seconds in GitHub Actions
         last_update = time.time()
+        initial_message = self.message
         while not self.stop_running:
             if time.time() - last_update >= 10:
-                Logger.get_logger().info(f"{self.message} - still processing...")
+                status = "still processing" if self.message == initial_message else self.message
+                Logger.get_logger().info(f"{initial_message} - {status}...")
                 sys.stdout.flush()  
                 last_update = time.time()
 
             if self.stop_running:
-                Logger.get_logger().info(f"{self.message} - finished processing.")
+                Logger.get_logger().info(f"{initial_message} - finished processing.")
                 sys.stdout.flush()
                 break
 
             time.sleep(1)  # Check for completion every second
 
+    def update(self, message):
+        """Replace the status message while the spinner is running."""
+        self.message = message
+
     def start(self):
         self.stop_running = False
         self.thread.start()
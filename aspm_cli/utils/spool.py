@@ -0,0 +1,325 @@
+import hashlib
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+
+from aspm_cli.utils.cache import get_cache_dir, hash_file, write_json_atomic
+from aspm_cli.utils.logger import Logger
+from aspm_cli.utils.run_controller import RunCancelled, RunController
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".lock"
+COPY_BLOCK_SIZE = 1024 * 1024
+
+def _copy_and_hash(src, dest):
+    """Copy a file and return (SHA-256, size) of what was copied, reading it once."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(src, 'rb') as source, open(dest, 'wb') as target:
+        for block in iter(lambda: source.read(COPY_BLOCK_SIZE), b""):
+            digest.update(block)
+            target.write(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        # os.kill would terminate the process; assume it is alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def upload_error(error):
+    """Short description of an upload failure."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        return f"Status code: {response.status_code}, Response: {response.text}"
+    return str(error)
+
+class UploadSpool:
+    """Result files waiting to be uploaded, kept on disk until AccuKnox accepts them.
+
+    Each entry is a directory holding a copy of the artifact and manifest.json
+    (endpoint, tenant, label, data type, size and SHA-256). The token is never
+    written to disk; flushing uses the current ACCUKNOX_TOKEN. The spool lives
+    in ASPM_SPOOL_DIR (default: <cache>/spool) and is bounded by
+    ASPM_SPOOL_MAX_MB (default 1024): the oldest entries are evicted first.
+    An entry being uploaded is locked by the uploading process.
+    """
+    default_max_mb = 1024
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or os.getenv("ASPM_SPOOL_DIR") or get_cache_dir("spool")
+        os.makedirs(self.path, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.getenv("ASPM_SPOOL_MAX_MB", self.default_max_mb)) * 1024 * 1024)
+
+    def _entry_dir(self, entry_id):
+        return os.path.join(self.path, entry_id)
+
+    def add(self, result_file, endpoint, tenant_id, label, data_type):
+        """Copy a result file into the spool. Returns the entry id."""
+        # Time-ordered ids: listing the spool sorted by name gives the oldest first
+        entry_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        tmp_dir = os.path.join(self.path, f".{entry_id}.tmp")
+        os.makedirs(tmp_dir)
+        try:
+            name = os.path.basename(result_file)
+            sha256, size = _copy_and_hash(result_file, os.path.join(tmp_dir, name))
+            self._write_manifest(tmp_dir, {
+                "endpoint": endpoint,
+                "tenant_id": tenant_id,
+                "label": label,
+                "data_type": data_type,
+                "file": name,
+                "size": size,
+                "sha256": sha256,
+                "created_at": time.time(),
+                "attempts": 0,
+                "last_error": None
+            })
+            # Only complete entries ever appear under their final name
+            os.rename(tmp_dir, self._entry_dir(entry_id))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self.prune(keep=entry_id)
+        return entry_id
+
+    @staticmethod
+    def _write_manifest(entry_dir, manifest):
+        write_json_atomic(os.path.join(entry_dir, MANIFEST_FILE), manifest)
+
+    def get(self, entry_id):
+        """The manifest of an entry plus its id, or None if it is gone."""
+        try:
+            with open(os.path.join(self._entry_dir(entry_id), MANIFEST_FILE), 'r') as file:
+                return dict(json.load(file), id=entry_id)
+        except (OSError, ValueError):
+            return None
+
+    def entries(self):
+        """Every spooled entry, oldest first."""
+        entries = []
+        for name in sorted(os.listdir(self.path)):
+            if name.startswith("."):
+                continue
+            entry = self.get(name)
+            if entry:
+                entries.append(entry)
+        return entries
+
+    def remove(self, entry_id):
+        shutil.rmtree(self._entry_dir(entry_id), ignore_errors=True)
+
+    def claim(self, entry_id):
+        """Lock an entry for uploading. Returns False if another live process holds it."""
+        lock_path = os.path.join(self._entry_dir(entry_id), LOCK_FILE)
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self._locked_by_live_process(lock_path):
+                    return False
+                # Left behind by a process that exited mid-upload
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+                continue
+            except OSError:
+                # The entry was removed meanwhile
+                return False
+            with os.fdopen(fd, 'w') as file:
+                file.write(str(os.getpid()))
+            return True
+        return False
+
+    @staticmethod
+    def _locked_by_live_process(lock_path):
+        try:
+            with open(lock_path, 'r') as file:
+                pid = int(file.read().strip() or 0)
+        except (OSError, ValueError):
+            return False
+        return pid == os.getpid() or _pid_alive(pid)
+
+    def release(self, entry_id):
+        try:
+            os.remove(os.path.join(self._entry_dir(entry_id), LOCK_FILE))
+        except OSError:
+            pass
+
+    def prune(self, keep=None):
+        """Evict the oldest unlocked entries until the spool fits in max_bytes. Returns the evicted entries."""
+        entries = self.entries()
+        total = sum(entry["size"] for entry in entries)
+        evicted = []
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry["id"] == keep or not self.claim(entry["id"]):
+                continue
+            self.remove(entry["id"])
+            total -= entry["size"]
+            evicted.append(entry)
+            Logger.get_logger().warning(f"Upload spool is full: dropped {entry['data_type']} result {entry['file']} "
+                                        f"spooled at {time.ctime(entry['created_at'])} without uploading it.")
+        return evicted
+
+    def upload(self, entry, token):
+        """Upload a claimed entry and remove it from the spool. Returns the upload stats.
+
+        Raises on failure, leaving the entry spooled with its attempt recorded.
+        A corrupt artifact is dropped.
+        """
+        from aspm_cli.utils.upload import get_uploader
+
+        entry_dir = self._entry_dir(entry["id"])
+        artifact = os.path.join(entry_dir, entry["file"])
+        if not os.path.exists(artifact) or hash_file(artifact) != entry["sha256"]:
+            self.remove(entry["id"])
+            raise ValueError(f"spooled {entry['file']} ({entry['id']}) does not match its checksum and was dropped")
+        try:
+            stats = get_uploader(entry["endpoint"], entry["tenant_id"], token, entry["label"]).upload(artifact, entry["data_type"])
+        except RunCancelled:
+            raise
+        except Exception as e:
+            entry.update(attempts=entry.get("attempts", 0) + 1, last_error=upload_error(e))
+            self._write_manifest(entry_dir, {key: value for key, value in entry.items() if key != "id"})
+            raise
+        self.remove(entry["id"])
+        return stats
+
+    def flush(self, token):
+        """Upload every entry not locked by another process, oldest first. Returns (uploaded, failed) entries."""
+        uploaded, failed = [], []
+        for entry in self.entries():
+            if not self.claim(entry["id"]):
+                continue
+            try:
+                stats = self.upload(entry, token)
+                uploaded.append(dict(entry, stats=stats))
+            except Exception as e:
+                failed.append(dict(entry, error=upload_error(e)))
+            finally:
+                self.release(entry["id"])
+        return uploaded, failed
+
+class SpoolFlusher:
+    """Uploads the results spooled by this process in background threads.
+
+    The pipeline continues as soon as a result is spooled. Each entry gets up to
+    ASPM_SPOOL_ATTEMPTS (default 3) uploads with exponential backoff in this
+    process, each with the uploader's own request retries; entries still spooled
+    when the run ends are left for `aspm-cli flush`. Uploads use
+    ACCUKNOX_UPLOAD_CONCURRENCY threads.
+    """
+    _instance = None
+
+    def __init__(self):
+        from aspm_cli.utils.upload import UploadSettings
+
+        self.settings = UploadSettings()
+        self.attempts = max(1, int(os.getenv("ASPM_SPOOL_ATTEMPTS", "3")))
+        self.queue = queue.Queue()
+        self.pending = set()
+        self.failed = set()
+        self.condition = threading.Condition()
+        self.workers = []
+
+    @classmethod
+    def get(cls):
+        if not cls._instance:
+            cls._instance = cls()
+        return cls._instance
+
+    def submit(self, spool, entry_id, token, on_uploaded=None):
+        """Queue a spooled entry for upload; on_uploaded() runs once it is accepted."""
+        with self.condition:
+            self.pending.add(entry_id)
+            if not self.workers:
+                # Daemon threads: a run that stops waiting leaves its uploads in the spool
+                self.workers = [threading.Thread(target=self._work, name=f"spool-upload-{i}", daemon=True)
+                                for i in range(self.settings.concurrency)]
+                for worker in self.workers:
+                    worker.start()
+        self.queue.put((spool, entry_id, token, on_uploaded, RunController.get().current_source()))
+
+    def _work(self):
+        while True:
+            spool, entry_id, token, on_uploaded, source = self.queue.get()
+            try:
+                with RunController.get().acting_for(source):
+                    uploaded = self._upload(spool, entry_id, token)
+                if uploaded and on_uploaded:
+                    on_uploaded()
+            except Exception as e:
+                Logger.get_logger().error(f"Spooled upload {entry_id} failed: {e}")
+                uploaded = False
+            with self.condition:
+                self.pending.discard(entry_id)
+                if not uploaded:
+                    self.failed.add(entry_id)
+                self.condition.notify_all()
+
+    def _upload(self, spool, entry_id, token):
+        for attempt in range(self.attempts):
+            entry = spool.get(entry_id)
+            if entry is None:
+                Logger.get_logger().warning(f"Spooled upload {entry_id} is no longer in the spool.")
+                return False
+            if not spool.claim(entry_id):
+                # Being uploaded by `aspm-cli flush`
+                Logger.get_logger().info(f"Spooled {entry['file']} is being uploaded by another process.")
+                return False
+            try:
+                stats = spool.upload(entry, token)
+                Logger.get_logger().info(f"Upload successful. Response: {stats['status_code'] or 'resumed'}")
+                return True
+            except RunCancelled as cancelled:
+                Logger.get_logger().warning(f"Upload of {entry['file']} {cancelled}; it stays in the spool.")
+                return False
+            except ValueError as e:
+                Logger.get_logger().error(str(e))
+                return False
+            except Exception as e:
+                Logger.get_logger().warning(f"Upload of spooled {entry['file']} failed (attempt {attempt + 1} of {self.attempts}): {upload_error(e)}")
+            finally:
+                spool.release(entry_id)
+            if attempt + 1 < self.attempts and RunController.get().wait(self.settings.backoff_delay(attempt + 1)):
+                return False
+        return False
+
+    def wait(self, entry_ids=None, timeout=None):
+        """Wait for spooled uploads of this process to finish, at most timeout seconds.
+
+        Returns the ids among entry_ids (default: all submitted) that were not uploaded.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            ids = set(entry_ids) if entry_ids is not None else self.pending | self.failed
+            while ids & self.pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            return ids & (self.pending | self.failed)
+
+    def finish(self, timeout):
+        """Wait for this run's spooled uploads and report what is left in the spool."""
+        if not self.workers:
+            return
+        if timeout and self.pending:
+            Logger.get_logger().info(f"Waiting up to {timeout:g}s for {len(self.pending)} spooled upload(s)...")
+        left = self.wait(timeout=timeout)
+        if left:
+            Logger.get_logger().warning(f"{len(left)} result(s) remain in the upload spool; run `aspm-cli flush` to upload them.")
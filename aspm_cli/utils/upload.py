@@ -1,14 +1,319 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 import urllib3
-import os
+from urllib3.fields import RequestField
 from aspm_cli.utils.spinner import Spinner
 from colorama import Fore
 from aspm_cli.utils.logger import Logger
+from aspm_cli.utils.profiler import Profiler
+from aspm_cli.utils.run_controller import RunCancelled, RunController
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 
 # Suppress SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+READ_BLOCK_SIZE = 1024 * 1024
+
+class UploadSettings:
+    """Upload tuning read from the environment.
+
+    ACCUKNOX_UPLOAD_COMPRESS      gzip the artifact while reading it (default: false)
+    ACCUKNOX_UPLOAD_CHUNK_SIZE_MB split artifacts into chunks of this size, 0 sends one request (default: 0)
+    ACCUKNOX_UPLOAD_RETRIES       retries per request on connection errors, 429 and 5xx (default: 3)
+    ACCUKNOX_UPLOAD_BACKOFF       base backoff in seconds, doubled on every retry (default: 1)
+    ACCUKNOX_UPLOAD_CONCURRENCY   artifacts uploaded in parallel and pooled connections (default: 4)
+    """
+
+    def __init__(self):
+        self.compress = os.getenv("ACCUKNOX_UPLOAD_COMPRESS", "FALSE").upper() == "TRUE"
+        self.chunk_size = int(float(os.getenv("ACCUKNOX_UPLOAD_CHUNK_SIZE_MB", "0")) * 1024 * 1024)
+        self.retries = int(os.getenv("ACCUKNOX_UPLOAD_RETRIES", "3"))
+        self.backoff = float(os.getenv("ACCUKNOX_UPLOAD_BACKOFF", "1"))
+        self.max_backoff = 30.0
+        self.concurrency = max(1, int(os.getenv("ACCUKNOX_UPLOAD_CONCURRENCY", "4")))
+
+    def backoff_delay(self, attempt):
+        """Seconds to wait before retry number attempt + 1: exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+def _split_blocks(result_file, compress, chunk_size):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = bytearray()
+    with open(result_file, 'rb') as file:
+        while True:
+            block = file.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            buffer += compressor.compress(block) if compressor else block
+            while chunk_size and len(buffer) >= chunk_size:
+                yield bytes(buffer[:chunk_size])
+                del buffer[:chunk_size]
+    if compressor:
+        buffer += compressor.flush()
+    while chunk_size and len(buffer) > chunk_size:
+        yield bytes(buffer[:chunk_size])
+        del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+def iter_chunks(result_file, compress=False, chunk_size=0):
+    """Yield (index, data, is_last) for the artifact, gzip-compressing on the fly.
+
+    Only one chunk is held in memory at a time (the whole artifact when chunk_size
+    is 0, which is why uploads without chunks stream an _ArtifactBody instead).
+    Compression is deterministic (fixed level, no timestamp) so a resumed upload
+    reproduces identical chunks.
+    """
+    index, previous = 0, None
+    for chunk in _split_blocks(result_file, compress, chunk_size):
+        if previous is not None:
+            yield index, previous, False
+            index += 1
+        previous = chunk
+    yield index, previous or b"", True
+
+class _ArtifactBody:
+    """multipart/form-data request body streaming an artifact, gzip-compressed on the fly when requested.
+
+    Only one block is held in memory. Without compression the length is known
+    and sent as Content-Length; compressed bodies use chunked transfer encoding.
+    Every iteration starts over, so a retried request sends the same bytes.
+    """
+
+    def __init__(self, result_file, filename, content_type, compress):
+        self.result_file = result_file
+        self.compress = compress
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        field = RequestField(name="file", data=b"", filename=filename)
+        field.make_multipart(content_type=content_type)
+        self.head = f"--{boundary}\r\n".encode() + field.render_headers().encode()
+        self.tail = f"\r\n--{boundary}--\r\n".encode()
+        # Artifact bytes sent by the last iteration
+        self.sent_bytes = 0
+        if not compress:
+            # requests sends a body's len attribute as Content-Length
+            self.len = len(self.head) + os.path.getsize(result_file) + len(self.tail)
+
+    def __iter__(self):
+        self.sent_bytes = 0
+        yield self.head
+        for block in _split_blocks(self.result_file, self.compress, READ_BLOCK_SIZE):
+            self.sent_bytes += len(block)
+            yield block
+        yield self.tail
+
+def artifact_url(endpoint):
+    """Artifact API URL; endpoints without a scheme use HTTPS."""
+    if not endpoint.startswith(("http://", "https://")):
+        endpoint = f"https://{endpoint}"
+    return f"{endpoint.rstrip('/')}/api/v1/artifact/"
+
+class _ResumeState:
+    """Tracks uploaded chunks next to the artifact so an interrupted upload can resume."""
+
+    def __init__(self, result_file, settings):
+        self.path = f"{result_file}.upload"
+        stat = os.stat(result_file)
+        self.fingerprint = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "compress": settings.compress,
+            "chunk_size": settings.chunk_size
+        }
+        self.upload_id = uuid.uuid4().hex
+        self.done = {}
+        try:
+            with open(self.path, 'r') as file:
+                state = json.load(file)
+            if state.get("fingerprint") == self.fingerprint:
+                self.upload_id = state["upload_id"]
+                self.done = state.get("done", {})
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def is_done(self, index, digest):
+        return self.done.get(str(index)) == digest
+
+    def mark_done(self, index, digest):
+        self.done[str(index)] = digest
+        with open(self.path, 'w') as file:
+            json.dump({"upload_id": self.upload_id, "fingerprint": self.fingerprint, "done": self.done}, file)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class ArtifactUploader:
+    """Uploads artifacts to AccuKnox over a pooled keep-alive session.
+
+    One uploader is meant to be shared by every upload of an invocation so that
+    connections are reused. upload_many() uploads a batch of artifacts with a
+    bounded number of requests in flight.
+    """
+
+    def __init__(self, endpoint, tenant_id, token, label=None, pool_size=None, settings=None):
+        self.url = artifact_url(endpoint)
+        self.tenant_id = tenant_id
+        self.token = token
+        self.label = label
+        self.settings = settings or UploadSettings()
+        self.pool_size = pool_size or self.settings.concurrency
+
+        self.session = requests.Session()
+        self.session.verify = False  # Bypass SSL verification
+        self.session.headers.update({
+            "Tenant-Id": str(tenant_id),
+            "Authorization": f"Bearer {token}",
+            "Connection": "keep-alive"
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def _post_with_retry(self, stats, **kwargs):
+        """POST with retries on connection errors and retryable status codes."""
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(self.url, **kwargs)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.settings.retries:
+                    response.raise_for_status()
+                    return response
+                reason = f"status code {response.status_code}"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.settings.retries:
+                    raise
+                reason = str(e)
+
+            delay = self.settings.backoff_delay(attempt)
+            attempt += 1
+            stats["retries"] += 1
+            Logger.get_logger().warning(f"Upload attempt {attempt} failed ({reason}), retrying in {delay:.1f}s...")
+            if RunController.get().wait(delay):
+                RunController.get().check("upload")
+
+    def upload(self, result_file, data_type, label=None):
+        """Upload one artifact and return its stats. Raises on failure."""
+        with Profiler.phase("upload", python=True, file=result_file, data_type=data_type) as phase:
+            stats = self._upload(result_file, data_type, label)
+            phase.update(bytes_read=stats["raw_bytes"], bytes_written=stats["sent_bytes"], retries=stats["retries"])
+        return stats
+
+    def _upload(self, result_file, data_type, label=None):
+        settings = self.settings
+        stats = {"file": result_file, "raw_bytes": os.path.getsize(result_file), "sent_bytes": 0, "chunks": 0, "retries": 0}
+        started = time.perf_counter()
+
+        params = {
+            "tenant_id": self.tenant_id,
+            "data_type": data_type,
+            "label_id": label or self.label,
+            "save_to_s3": "true"
+        }
+        filename = os.path.basename(result_file) + (".gz" if settings.compress else "")
+        content_type = "application/gzip" if settings.compress else "application/json"
+
+        response = None
+        if not settings.chunk_size:
+            RunController.get().check("upload")
+            body = _ArtifactBody(result_file, filename, content_type, settings.compress)
+            response = self._post_with_retry(stats, params=params, data=body, headers={"Content-Type": body.content_type})
+            stats["sent_bytes"] = body.sent_bytes
+            stats["chunks"] = 1
+        else:
+            state = _ResumeState(result_file, settings)
+            for index, data, is_last in iter_chunks(result_file, settings.compress, settings.chunk_size):
+                RunController.get().check("upload")
+                chunk_params = dict(params)
+                if not (index == 0 and is_last):
+                    digest = hashlib.sha256(data).hexdigest()
+                    if state.is_done(index, digest):
+                        Logger.get_logger().debug("Chunk %d already uploaded, skipping.", index)
+                        continue
+                    chunk_params.update({
+                        "upload_id": state.upload_id,
+                        "chunk_index": index,
+                        "last_chunk": str(is_last).lower(),
+                        "chunk_sha256": digest
+                    })
+
+                response = self._post_with_retry(
+                    stats,
+                    params=chunk_params,
+                    files={"file": (filename, data, content_type)}
+                )
+                stats["sent_bytes"] += len(data)
+                stats["chunks"] += 1
+                if "chunk_index" in chunk_params:
+                    state.mark_done(index, chunk_params["chunk_sha256"])
+            state.clear()
+
+        elapsed = time.perf_counter() - started
+        stats["status_code"] = response.status_code if response is not None else None
+        stats["seconds"] = elapsed
+        stats["throughput_mbps"] = stats["raw_bytes"] / (1024 * 1024) / elapsed if elapsed else 0.0
+        stats["compression_ratio"] = stats["raw_bytes"] / stats["sent_bytes"] if stats["sent_bytes"] else 1.0
+        Logger.get_logger().debug(
+            "Uploaded %s: %d bytes as %d bytes in %d request(s), %.2fs (%.2f MB/s), compression ratio %.2f, %d retries",
+            result_file, stats['raw_bytes'], stats['sent_bytes'], stats['chunks'], elapsed,
+            stats['throughput_mbps'], stats['compression_ratio'], stats['retries']
+        )
+        return stats
+
+    def upload_many(self, jobs, max_workers=None):
+        """Upload (result_file, data_type, label) jobs concurrently.
+
+        Returns one stats dict per job, in job order; failed jobs carry an "error".
+        """
+        source = RunController.get().current_source()
+
+        def _upload(job):
+            result_file, data_type, label = job
+            try:
+                with RunController.get().acting_for(source):
+                    return self.upload(result_file, data_type, label)
+            except HTTPError as http_err:
+                error = f"Status code: {http_err.response.status_code}, Response: {http_err.response.text}"
+            except RunCancelled as cancelled:
+                Logger.get_logger().warning(f"Upload of {result_file} {cancelled}.")
+                return {"file": result_file, "error": str(cancelled)}
+            except Exception as err:
+                error = str(err)
+            Logger.get_logger().error(f"Upload of {result_file} failed: {error}")
+            return {"file": result_file, "error": error}
+
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers or self.pool_size, len(jobs))) as executor:
+            return list(executor.map(_upload, jobs))
+
+_uploaders = {}
+_uploaders_lock = threading.Lock()
+
+def get_uploader(endpoint, tenant_id, token, label=None):
+    """Return the shared uploader for an endpoint, creating it on first use."""
+    key = (endpoint, tenant_id, token, label)
+    with _uploaders_lock:
+        if key not in _uploaders:
+            _uploaders[key] = ArtifactUploader(endpoint, tenant_id, token, label)
+        return _uploaders[key]
+
 def upload_results(result_file, endpoint, tenant_id, label, token, data_type):
 
     spinner = Spinner(message=f"Uploading the result to AccuKnox...",  color=Fore.GREEN)
@@ -17,29 +322,16 @@ def upload_results(result_file, endpoint, tenant_id, label, token, data_type):
     """Upload the result JSON to the specified endpoint."""
     Logger.get_logger().debug("Uploading results...")
     try:
-        with open(result_file, 'rb') as file:
-            response = requests.post(
-                f"https://{endpoint}/api/v1/artifact/",
-                headers={
-                    "Tenant-Id": tenant_id,
-                    "Authorization": f"Bearer {token}"
-                },
-                params={
-                    "tenant_id": tenant_id,
-                    "data_type": data_type,
-                    "label_id": label,
-                    "save_to_s3": "true"
-                },
-                files={"file": file},
-                verify=False  # Bypass SSL verification
-            )
-        response.raise_for_status()
-        Logger.get_logger().info(f"Upload successful. Response: {response.status_code}")
+        stats = get_uploader(endpoint, tenant_id, token, label).upload(result_file, data_type)
+        Logger.get_logger().info(f"Upload successful. Response: {stats['status_code'] or 'resumed'}")
+        return stats
     except HTTPError as http_err:
-        Logger.get_logger().error(f"Status code: {response.status_code}, Response: {response.text}")
+        Logger.get_logger().error(f"Status code: {http_err.response.status_code}, Response: {http_err.response.text}")
+    except RunCancelled as cancelled:
+        Logger.get_logger().warning(f"Upload of {result_file} {cancelled}.")
     except requests.exceptions.RequestException as req_err:
         Logger.get_logger().error(f"403 Request exception occurred: {req_err}")
     except Exception as err:
         Logger.get_logger().error(f"Unexpected error occurred: {err}")
     finally:
-        spinner.stop()
\ No newline at end of file
+        spinner.stop()
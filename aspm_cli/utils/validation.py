@@ -2,9 +2,10 @@ from pydantic import BaseModel, ValidationError, Field, field_validator, root_va
 import os
 from typing import Optional
 from aspm_cli.utils.logger import Logger
+from aspm_cli.scan.registry import BUILTIN_SCANNERS, is_registered, scanner_names
 
 
-ALLOWED_SCAN_TYPES = {"iac", "sast", "sq-sast"}
+ALLOWED_SCAN_TYPES = set(BUILTIN_SCANNERS)
 
 class Config(BaseModel):
     SCAN_TYPE: str
@@ -17,8 +18,8 @@ class Config(BaseModel):
     @field_validator("SCAN_TYPE")
     @classmethod
     def validate_scan_type(cls, v):
-        if v not in ALLOWED_SCAN_TYPES:
-            raise ValueError(f"Invalid SCAN_TYPE. Allowed values: {', '.join(ALLOWED_SCAN_TYPES)}.")
+        if not is_registered(v):
+            raise ValueError(f"Invalid SCAN_TYPE. Allowed values: {', '.join(scanner_names())}.")
         return v
 
 class IaCScannerConfig(BaseModel):
@@ -125,6 +126,22 @@ class ConfigValidator:
                 Logger.get_logger().error(f"{error['loc'][0]}: {error['msg']}")
             exit(1)
 
+    def validate_iac_scan(self, repo_url, repo_branch, file, directory, compact, quiet, framework):
+        try:
+            self.config = IaCScannerConfig(
+                REPOSITORY_URL=repo_url,
+                REPOSITORY_BRANCH=repo_branch,
+                FILE=file,
+                DIRECTORY=directory,
+                COMPACT=compact,
+                QUIET=quiet,
+                FRAMEWORK=framework
+            )
+        except ValidationError as e:
+            for error in e.errors():
+                Logger.get_logger().error(f"{error['loc'][0]}: {error['msg']}")
+            exit(1)
+
     def validate_sast_scan(self, repo_url, commit_ref, commit_sha, pipeline_id, job_url):
         try:
             self.config = SASTScannerConfig(
@@ -0,0 +1,87 @@
+"""Local stand-in for the AccuKnox /api/v1/artifact/ endpoint.
+
+Request bodies are read and discarded; only counters are kept. Run it on its
+own with `python benchmarks/artifact_server.py [port]` or start it in-process
+with ArtifactServer().start().
+"""
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ARTIFACT_PATH = "/api/v1/artifact/"
+READ_BLOCK_SIZE = 1024 * 1024
+
+class ArtifactServer:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.requests = 0
+        self.bytes_received = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                if not self.path.startswith(ARTIFACT_PATH):
+                    self.send_error(404)
+                    return
+                received = 0
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    while True:
+                        length = int(self.rfile.readline().split(b";")[0], 16)
+                        if length == 0:
+                            self.rfile.readline()
+                            break
+                        received += len(self.rfile.read(length))
+                        self.rfile.readline()
+                else:
+                    remaining = int(self.headers.get("Content-Length", 0))
+                    while remaining:
+                        block = self.rfile.read(min(remaining, READ_BLOCK_SIZE))
+                        if not block:
+                            break
+                        received += len(block)
+                        remaining -= len(block)
+                with server.lock:
+                    server.requests += 1
+                    server.bytes_received += received
+
+                body = json.dumps({"status": "ok", "bytes": received}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+if __name__ == "__main__":
+    server = ArtifactServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8080)
+    print(f"Artifact server listening on {server.endpoint}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,317 @@
+"""Benchmark scenarios for the CLI, run offline against a fake docker and a local artifact server.
+
+Each scenario runs in a fresh Python process so wall time and peak memory are
+measured in isolation, and is compared with the numbers stored in
+benchmarks/baselines.json:
+
+    python benchmarks/run.py                          # default scenarios and sizes
+    python benchmarks/run.py --sizes 1MB,1GB --scenarios upload_results
+    python benchmarks/run.py --check                  # exit 1 on regressions
+    python benchmarks/run.py --update-baseline        # store these results as the baseline
+
+backend_overhead compares the execution backends on the same `scan iac` run.
+Against the shims it measures what each backend adds on the CLI side; with
+--real-tools the installed docker, podman and checkov are used instead, which
+needs network access for the images and produces no stable baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+FAKEBIN = os.path.join(BENCH_DIR, "fakebin")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baselines.json")
+
+sys.path.insert(0, BENCH_DIR)
+from synthetic import copy_result, format_size, parse_size
+
+REPO_URL = "https://example.com/bench/repo.git"
+COMMIT_SHA = "0" * 40
+# Dependencies that should only be imported by the commands that need them
+HEAVY_MODULES = ("requests", "urllib3", "pydantic", "asyncio", "accuknox_sq_sast", "socketserver")
+CLI_COMMANDS = {
+    "help": ["--help"],
+    "env": ["env"],
+    "warmup": ["warmup", "--help"],
+    "upload": ["upload", "--help"],
+    "cache": ["cache", "prune", "--help"],
+    "serve": ["serve", "--help"],
+    "scan-iac": ["scan", "iac", "--help"],
+    "scan-sast": ["scan", "sast", "--help"],
+    "scan-sq-sast": ["scan", "sq-sast", "--help"],
+    "scan-all": ["scan", "all", "--help"],
+}
+
+def _cli(argv):
+    from aspm_cli.cli import main
+    sys.argv = ["accuknox-aspm-scanner"] + argv
+    main()
+
+def scenario_cli_startup(ctx):
+    """CLI import and argument parsing for one subcommand, and which heavy modules it loaded."""
+    started = time.perf_counter()
+    try:
+        _cli(CLI_COMMANDS[ctx["variant"]])
+    except SystemExit:
+        pass
+    return {
+        "seconds": time.perf_counter() - started,
+        "modules": len(sys.modules),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules]
+    }
+
+def scenario_process_result_file(ctx):
+    """IaCScanner.process_result_file on a Checkov result."""
+    from aspm_cli.scan import IaCScanner
+    copy_result("checkov", ctx["size"], ctx["data_dir"], "results_json.json")
+    scanner = IaCScanner(REPO_URL, "main")
+    started = time.perf_counter()
+    scanner.process_result_file()
+    return {"seconds": time.perf_counter() - started, "bytes": ctx["size"]}
+
+def scenario_sq_process_result_file(ctx):
+    """SQSASTScanner._process_result_file on a SonarQube result."""
+    try:
+        from aspm_cli.scan.sq_sast import SQSASTScanner
+    except ImportError as e:
+        return {"skipped": str(e)}
+    copy_result("sonarqube", ctx["size"], ctx["data_dir"], "sq-results.json")
+    scanner = SQSASTScanner(repo_url=REPO_URL, branch="main", commit_sha=COMMIT_SHA)
+    started = time.perf_counter()
+    scanner._process_result_file("sq-results.json")
+    return {"seconds": time.perf_counter() - started, "bytes": ctx["size"]}
+
+def scenario_upload_results(ctx):
+    """upload_results of a Checkov result to the local artifact server."""
+    from aspm_cli.utils import upload_results
+    copy_result("checkov", ctx["size"], ctx["data_dir"], "results_json.json")
+    started = time.perf_counter()
+    stats = upload_results("results_json.json", ctx["endpoint"], 1, "bench", "bench-token", "IAC")
+    if not stats:
+        raise RuntimeError("upload failed, see the scenario log")
+    return {"seconds": time.perf_counter() - started, "bytes": ctx["size"]}
+
+def scenario_run_scan_iac(ctx):
+    """`scan iac` end to end: fake Checkov, result processing and upload."""
+    with open("main.tf", 'w') as file:
+        file.write('resource "aws_s3_bucket" "bench" {}\n')
+    started = time.perf_counter()
+    _cli(["--softfail", "scan", "iac", "--repo-url", REPO_URL, "--repo-branch", "main", "--directory", ".", "--no-cache"])
+    return {"seconds": time.perf_counter() - started, "bytes": ctx["size"]}
+
+def scenario_run_scan_sast(ctx):
+    """`scan sast` end to end: fake OpenGrep and upload."""
+    started = time.perf_counter()
+    _cli(["--softfail", "scan", "sast", "--repo-url", REPO_URL, "--commit-ref", "main", "--commit-sha", COMMIT_SHA, "--no-cache"])
+    return {"seconds": time.perf_counter() - started, "bytes": ctx["size"]}
+
+def scenario_backend_overhead(ctx):
+    """`scan iac` with a small result on one execution backend, to compare their overhead."""
+    from aspm_cli.scan import IaCScanner
+    from aspm_cli.utils.backends import backend_for
+
+    os.environ["ASPM_BACKEND"] = ctx["variant"]
+    os.environ["ASPM_BENCH_RESULT_SIZE"] = "64KB"
+    if ctx["variant"] != "native" and not shutil.which(ctx["variant"]):
+        return {"skipped": f"{ctx['variant']} is not installed"}
+    backend = backend_for(IaCScanner.checkov_image).name
+    if backend != ctx["variant"]:
+        return {"skipped": f"no usable {ctx['variant']} backend, would run on {backend}"}
+    with open("main.tf", 'w') as file:
+        file.write('resource "aws_s3_bucket" "bench" {}\n')
+    started = time.perf_counter()
+    _cli(["--backend", ctx["variant"], "--softfail", "scan", "iac", "--repo-url", REPO_URL, "--repo-branch", "main",
+          "--directory", ".", "--no-cache"])
+    return {"seconds": time.perf_counter() - started}
+
+# name -> (function, parameter): "size" runs once per --sizes entry, a list once per variant
+SCENARIOS = {
+    "cli_startup": (scenario_cli_startup, list(CLI_COMMANDS)),
+    "process_result_file": (scenario_process_result_file, "size"),
+    "sq_process_result_file": (scenario_sq_process_result_file, "size"),
+    "upload_results": (scenario_upload_results, "size"),
+    "run_scan_iac": (scenario_run_scan_iac, "size"),
+    "run_scan_sast": (scenario_run_scan_sast, "size"),
+    "backend_overhead": (scenario_backend_overhead, ["docker", "podman", "native"]),
+}
+
+def run_child(args):
+    """Entry point of the scenario process: run one scenario and write its measurements."""
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(args.workdir)
+    ctx = {"size": args.size, "variant": args.variant, "data_dir": args.data_dir, "endpoint": args.endpoint}
+    try:
+        result = SCENARIOS[args.child][0](ctx)
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    with open(args.result_file, 'w') as file:
+        json.dump(result, file)
+
+def run_scenario(name, size, variant, bench_root, data_dir, server, real_tools=False):
+    """Run one scenario in a fresh process; returns its measurements including peak RSS."""
+    workdir = tempfile.mkdtemp(prefix=f"{name}-", dir=bench_root)
+    result_file = os.path.join(workdir, ".bench-result.json")
+    log_file = os.path.join(bench_root, f"{name}-{variant or format_size(size)}.log")
+    env = dict(
+        os.environ,
+        PATH=os.environ.get("PATH", "") if real_tools else FAKEBIN + os.pathsep + os.environ.get("PATH", ""),
+        PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        ASPM_BENCH_DATA=data_dir,
+        ASPM_BENCH_RESULT_SIZE=str(size or 0),
+        ASPM_CACHE_DIR=os.path.join(workdir, ".cache"),
+        ASPM_NO_DAEMON="TRUE",
+        # The shims include a native checkov; only backend_overhead chooses another backend
+        ASPM_BACKEND="docker",
+        ACCUKNOX_ENDPOINT=server.endpoint,
+        ACCUKNOX_TENANT="1",
+        ACCUKNOX_LABEL="bench",
+        ACCUKNOX_TOKEN="bench-token",
+        ACCUKNOX_UPLOAD_RETRIES="0",
+    )
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--child", name, "--size", str(size or 0), "--variant", variant or "",
+        "--workdir", workdir, "--data-dir", data_dir, "--endpoint", server.endpoint, "--result-file", result_file
+    ]
+    received = server.bytes_received
+    started = time.perf_counter()
+    with open(log_file, 'w') as log:
+        process = subprocess.Popen(cmd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, status, rusage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    try:
+        with open(result_file, 'r') as file:
+            result = json.load(file)
+    except (OSError, ValueError):
+        result = {"error": f"scenario exited with code {process.returncode}, see {log_file}"}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result["wall_seconds"] = wall
+    result["peak_rss_mb"] = rusage.ru_maxrss / 1024
+    result["uploaded_bytes"] = server.bytes_received - received
+    if result.get("bytes") and result.get("seconds"):
+        result["throughput_mbps"] = result["bytes"] / (1024 * 1024) / result["seconds"]
+    if "error" in result:
+        result["log"] = log_file
+    return result
+
+def load_baselines():
+    try:
+        with open(BASELINE_FILE, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {"results": {}}
+
+# Differences below these are treated as noise whatever the relative change
+NOISE_FLOOR = {"seconds": 0.005, "peak_rss_mb": 1.0}
+
+def compare(result, baseline, tolerance):
+    """Return a list of regressions of result against baseline."""
+    regressions = []
+    for metric in ("seconds", "peak_rss_mb"):
+        if not (baseline.get(metric) and result.get(metric)):
+            continue
+        if result[metric] > baseline[metric] * (1 + tolerance) and result[metric] - baseline[metric] > NOISE_FLOOR[metric]:
+            regressions.append(f"{metric} {result[metric]:.3f} vs {baseline[metric]:.3f}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the AccuKnox ASPM CLI")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma separated scenarios to run")
+    parser.add_argument("--sizes", default="1MB,16MB", help="Comma separated result sizes, 1MB to 1GB (default: 1MB,16MB)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the fastest is reported (default: 3)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown over the baseline before reporting a regression (default: 0.25)")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 when a scenario regressed or failed")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results in benchmarks/baselines.json")
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+    parser.add_argument("--real-tools", action="store_true", help="Run against the installed docker, podman and checkov instead of the shims")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the generated data and scenario logs")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--endpoint", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return 0
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+
+    # Imported here so scenario processes do not load http.server themselves
+    from artifact_server import ArtifactServer
+
+    bench_root = tempfile.mkdtemp(prefix="aspm-bench-")
+    data_dir = os.path.join(bench_root, "data")
+    baselines = load_baselines()
+    server = ArtifactServer().start()
+    results, failed = {}, False
+    print(f"{'scenario':<36}{'seconds':>10}{'peak MB':>10}{'MB/s':>10}  baseline")
+    try:
+        for name in scenarios:
+            parameter = SCENARIOS[name][1]
+            cases = [(size, None) for size in sizes] if parameter == "size" else [(None, variant) for variant in parameter]
+            for size, variant in cases:
+                key = f"{name}:{variant or format_size(size)}"
+                runs = [run_scenario(name, size, variant, bench_root, data_dir, server, args.real_tools) for _ in range(max(1, args.repeat))]
+                errors = [r for r in runs if "error" in r or "skipped" in r]
+                if errors:
+                    result = errors[0]
+                else:
+                    result = min(runs, key=lambda r: r["seconds"])
+                    result["peak_rss_mb"] = max(r["peak_rss_mb"] for r in runs)
+                results[key] = result
+
+                if "skipped" in result:
+                    print(f"{key:<36}  skipped: {result['skipped']}")
+                    continue
+                if "error" in result:
+                    failed = True
+                    print(f"{key:<36}  error: {result['error']} ({result.get('log')})")
+                    continue
+                baseline = baselines["results"].get(key)
+                regressions = compare(result, baseline, args.tolerance) if baseline else []
+                failed = failed or bool(regressions)
+                status = "none" if not baseline else ("REGRESSION " + "; ".join(regressions) if regressions else f"ok ({result['seconds'] / baseline['seconds']:.2f}x)")
+                throughput = f"{result['throughput_mbps']:.1f}" if "throughput_mbps" in result else "-"
+                if result.get("heavy_modules"):
+                    status += f", loaded {', '.join(result['heavy_modules'])}"
+                print(f"{key:<36}{result['seconds']:>10.3f}{result['peak_rss_mb']:>10.1f}{throughput:>10}  {status}")
+    finally:
+        server.stop()
+        if not args.keep_data:
+            shutil.rmtree(bench_root, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.update_baseline:
+        baselines["machine"] = {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()}
+        baselines["results"].update({
+            key: {metric: round(result[metric], 4) for metric in ("seconds", "peak_rss_mb", "throughput_mbps") if metric in result}
+            for key, result in results.items() if "error" not in result and "skipped" not in result
+        })
+        with open(BASELINE_FILE, 'w') as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Baselines written to {BASELINE_FILE}")
+    return 1 if (args.check and failed) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
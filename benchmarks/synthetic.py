@@ -0,0 +1,128 @@
+"""Synthetic scanner results of a given size, written as a stream so 1 GB outputs stay cheap on memory."""
+import json
+import os
+import random
+import shutil
+
+KINDS = ("checkov", "opengrep", "sonarqube")
+
+SEVERITIES = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+def parse_size(value):
+    """Parse sizes such as 512KB, 16MB or 1GB into bytes."""
+    value = value.strip().upper()
+    for suffix, factor in (("GB", 1024 ** 3), ("MB", 1024 ** 2), ("KB", 1024), ("B", 1)):
+        if value.endswith(suffix):
+            return int(float(value[:-len(suffix)]) * factor)
+    return int(value)
+
+def format_size(size):
+    for suffix, factor in (("GB", 1024 ** 3), ("MB", 1024 ** 2), ("KB", 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{suffix}"
+    return f"{size}B"
+
+def _checkov_record(rng, i):
+    path = f"/modules/m{i % 97}/main.tf"
+    return {
+        "check_id": f"CKV_AWS_{rng.randint(1, 300)}",
+        "bc_check_id": f"BC_AWS_GENERAL_{rng.randint(1, 200)}",
+        "check_name": "Ensure the resource follows the synthetic benchmark policy",
+        "check_result": {"result": "FAILED", "evaluated_keys": ["encrypted", "kms_key_id"]},
+        "code_block": [[n, f"  attribute_{n} = \"value-{i}\"\n"] for n in range(1, 6)],
+        "file_path": path,
+        "file_abs_path": f"/workdir{path}",
+        "repo_file_path": path,
+        "file_line_range": [1, 5],
+        "resource": f"aws_s3_bucket.bucket_{i}",
+        "evaluations": None,
+        "check_class": "checkov.terraform.checks.resource.aws.S3Encryption",
+        "severity": rng.choice(SEVERITIES),
+        "guideline": "https://docs.example.com/policy"
+    }
+
+def _opengrep_record(rng, i):
+    line = rng.randint(1, 500)
+    return {
+        "check_id": f"python.lang.security.rule-{rng.randint(1, 400)}",
+        "path": f"src/pkg{i % 53}/module_{i % 211}.py",
+        "start": {"line": line, "col": 5, "offset": line * 40},
+        "end": {"line": line + 2, "col": 30, "offset": line * 40 + 90},
+        "extra": {
+            "message": "Synthetic finding emitted by the benchmark docker shim",
+            "metadata": {"cwe": ["CWE-78: OS Command Injection"], "confidence": "MEDIUM", "category": "security"},
+            "severity": rng.choice(("INFO", "WARNING", "ERROR")),
+            "fingerprint": f"{rng.getrandbits(128):032x}",
+            "lines": "    subprocess.call(command, shell=True)",
+            "engine_kind": "OSS"
+        }
+    }
+
+def _sonarqube_record(rng, i):
+    return {
+        "key": f"AY{rng.getrandbits(64):016x}",
+        "rule": f"python:S{rng.randint(1000, 6000)}",
+        "severity": rng.choice(("INFO", "MINOR", "MAJOR", "CRITICAL", "BLOCKER")),
+        "component": f"bench:src/pkg{i % 53}/module_{i % 211}.py",
+        "project": "bench",
+        "line": rng.randint(1, 500),
+        "hash": f"{rng.getrandbits(128):032x}",
+        "status": "OPEN",
+        "message": "Synthetic issue emitted by the benchmark generator",
+        "effort": "5min",
+        "type": rng.choice(("BUG", "VULNERABILITY", "CODE_SMELL")),
+        "creationDate": "2024-01-01T00:00:00+0000",
+        "updateDate": "2024-01-01T00:00:00+0000"
+    }
+
+# (opening text, record factory, closing text) for each kind
+_LAYOUTS = {
+    "checkov": (
+        '{"check_type": "terraform", "results": {"passed_checks": [], "failed_checks": [',
+        _checkov_record,
+        '], "skipped_checks": [], "parsing_errors": []}, "summary": {"passed": 0, "failed": %(count)d, '
+        '"skipped": 0, "parsing_errors": 0, "resource_count": %(count)d, "checkov_version": "3.2.21"}}'
+    ),
+    "opengrep": (
+        '{"version": "1.0.1", "results": [',
+        _opengrep_record,
+        '], "errors": [], "paths": {"scanned": []}}'
+    ),
+    "sonarqube": (
+        '{"project": "bench", "issues": [',
+        _sonarqube_record,
+        '], "total": %(count)d}'
+    ),
+}
+
+def write_result(kind, path, size, seed=0):
+    """Write a synthetic `kind` result of roughly `size` bytes to path. Returns the record count."""
+    opening, factory, closing = _LAYOUTS[kind]
+    rng = random.Random(seed)
+    count = 0
+    written = len(opening) + len(closing)
+    with open(path, 'w') as file:
+        file.write(opening)
+        while written < size or count == 0:
+            record = json.dumps(factory(rng, count))
+            if count:
+                file.write(", ")
+                written += 2
+            file.write(record)
+            written += len(record)
+            count += 1
+        file.write(closing % {"count": count} if "%(" in closing else closing)
+    return count
+
+def ensure_template(kind, size, data_dir):
+    """Path of a cached synthetic result, generating it on first use."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"{kind}-{size}.json")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        write_result(kind, tmp_path, size)
+        os.replace(tmp_path, path)
+    return path
+
+def copy_result(kind, size, data_dir, dest):
+    shutil.copyfile(ensure_template(kind, size, data_dir), dest)
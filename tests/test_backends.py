@@ -0,0 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aspm_cli.utils.backends import DockerBackend, PodmanBackend, image_cache
+from aspm_cli.utils.docker_pull import ImageCache
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASPM_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+def test_one_image_cache_per_engine():
+    assert image_cache("docker") is image_cache("docker")
+    assert image_cache("docker") is not image_cache("podman")
+    assert image_cache("podman").state_path.endswith("images-podman.json")
+
+def test_parallel_prefetch_records_every_image(monkeypatch):
+    monkeypatch.setattr(ImageCache, "inspect", lambda self, image: (f"sha256:{image}", []))
+    images = [f"example.com/scanner-{i}:1.0" for i in range(100)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda image: DockerBackend().ensure_image(image, force=False), images))
+    assert all(DockerBackend().image_identity(image) == f"sha256:{image}" for image in images)
+    assert PodmanBackend().image_identity(images[0]) is None
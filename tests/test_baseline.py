@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from aspm_cli.utils.baseline import BaselineStore, prepare_delta_upload
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASPM_CACHE_DIR", str(tmp_path / "cache"))
+    return BaselineStore("https://example.com/repo", "main")
+
+def _write(path, check_list):
+    report = {"check_type": "terraform", "results": {"passed_checks": [], "failed_checks": [], "skipped_checks": []}}
+    report["results"][check_list].append({"check_id": "CKV_1", "resource": "aws_s3_bucket.b", "file_path": "/main.tf"})
+    path.write_text(json.dumps([report, {"details": {"repo": "https://example.com/repo", "branch": "main"}}]))
+
+def _upload(path, store):
+    upload_file, commit = prepare_delta_upload(str(path), store)
+    commit()
+    if upload_file == str(path):
+        return None
+    with open(upload_file) as file:
+        return json.load(file)
+
+def test_first_upload_sends_the_full_result(tmp_path, store):
+    result = tmp_path / "results_json.json"
+    _write(result, "failed_checks")
+    assert _upload(result, store) is None
+    delta = _upload(result, store)["delta"]
+    assert (delta["added"], delta["changed"], delta["removed"], delta["unchanged"]) == ([], [], [], 1)
+
+@pytest.mark.parametrize("before, after", [("passed_checks", "failed_checks"), ("failed_checks", "passed_checks")])
+def test_status_change_is_a_changed_finding(tmp_path, store, before, after):
+    result = tmp_path / "results_json.json"
+    _write(result, before)
+    _upload(result, store)
+    _write(result, after)
+    upload = _upload(result, store)
+    delta = upload["delta"]
+    assert delta["added"] == [] and delta["removed"] == [] and delta["unchanged"] == 0
+    assert [entry["check_list"] for entry in delta["changed"]] == [after]
+    assert upload["metadata"] == [{"details": {"repo": "https://example.com/repo", "branch": "main"}}]
+
+def test_removed_findings_are_listed_by_fingerprint(tmp_path, store):
+    result = tmp_path / "results_json.json"
+    _write(result, "failed_checks")
+    _upload(result, store)
+    fingerprint = next(iter(store.load("checkov-results_json.json")["findings"]))
+    result.write_text(json.dumps([{"check_type": "terraform", "results": {"passed_checks": [], "failed_checks": [], "skipped_checks": []}}]))
+    assert _upload(result, store)["delta"]["removed"] == [fingerprint]
+
+def test_uncommitted_upload_keeps_the_previous_baseline(tmp_path, store):
+    result = tmp_path / "results_json.json"
+    _write(result, "passed_checks")
+    _upload(result, store)
+    _write(result, "failed_checks")
+    prepare_delta_upload(str(result), store)
+    assert len(_upload(result, store)["delta"]["changed"]) == 1
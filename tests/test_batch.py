@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+import aspm_cli.utils
+from aspm_cli import cli
+from aspm_cli.utils.batch import BatchJob
+from aspm_cli.utils.git import GitInfo
+from aspm_cli.utils.run_controller import RunController
+
+class FakeScanner:
+    """Writes where it ran and the repository it saw, and exits with a fixed code."""
+    result_file = "results.json"
+
+    def __init__(self, exit_code):
+        self.exit_code = exit_code
+
+    def run(self):
+        with open(self.result_file, "w") as file:
+            json.dump({"cwd": os.getcwd(), "repo": GitInfo.get_repo_url()}, file)
+        return self.exit_code, self.result_file
+
+def _repo(path, url):
+    path.mkdir()
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    subprocess.run(["git", "-C", str(path), "remote", "add", "origin", url], check=True)
+    return str(path)
+
+@pytest.fixture
+def batch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("GITHUB_ACTIONS", "GITLAB_CI", "JENKINS_URL"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(GitInfo, "_snapshot", None)
+    monkeypatch.setattr(RunController, "_instance", None)
+    uploads = []
+    monkeypatch.setattr(cli, "upload_result_files", lambda path, *args: uploads.append(path) or {"file": path})
+    return SimpleNamespace(
+        good=_repo(tmp_path / "good", "https://example.com/good.git"),
+        bad=_repo(tmp_path / "bad", "https://example.com/bad.git"),
+        output=str(tmp_path / "out"),
+        uploads=uploads
+    )
+
+def _job_args():
+    return SimpleNamespace(index_findings=False, delta_upload=False, spool=False, spool_wait=None)
+
+def _result(outcome):
+    with open(outcome["result_files"][0]) as file:
+        return json.load(file)
+
+def test_jobs_run_from_their_directory_with_its_git_metadata(batch):
+    first = cli._run_batch_job(BatchJob("good", batch.good, "iac"), FakeScanner(0), "IAC", {}, batch.output, _job_args())
+    second = cli._run_batch_job(BatchJob("bad", batch.bad, "iac"), FakeScanner(1), "IAC", {}, batch.output, _job_args())
+
+    assert _result(first) == {"cwd": batch.good, "repo": "https://example.com/good.git"}
+    # The worker moved on to another repository; its metadata is not the first job's
+    assert _result(second) == {"cwd": batch.bad, "repo": "https://example.com/bad.git"}
+    assert (first["status"], first["exit_code"]) == ("passed", 0)
+    assert (second["status"], second["exit_code"]) == ("failed", 1)
+    assert batch.uploads == [os.path.join(batch.output, name, "results.json") for name in ("good", "bad")]
+
+def test_scanner_errors_fail_only_their_job(batch):
+    class Broken(FakeScanner):
+        def run(self):
+            raise RuntimeError("boom")
+
+    outcome = cli._run_batch_job(BatchJob("good", batch.good, "iac"), Broken(0), "IAC", {}, batch.output, _job_args())
+    assert (outcome["status"], outcome["exit_code"], outcome["error"]) == ("error", 1, "boom")
+
+def _run_batch(batch, monkeypatch, tmp_path, exit_codes):
+    manifest = tmp_path / "batch.json"
+    manifest.write_text(json.dumps({"jobs": [{"path": "good", "scan": "iac"}, {"path": "bad", "scan": "iac"}]}))
+    monkeypatch.setattr(aspm_cli.utils, "ConfigValidator", lambda *args, **kwargs: None)
+    monkeypatch.setattr(cli, "prefetch_images", lambda images, force=False: {})
+    monkeypatch.setattr(cli, "build_scanner", lambda scantype, args, validator: (FakeScanner(exit_codes[args.repo_url]), "IAC"))
+    args = argparse.Namespace(manifest=str(manifest), concurrency=2, output_dir=batch.output, report=None, softfail=False,
+                              delta_upload=False, index_findings=False, spool=False, spool_wait=None)
+    cli.run_batch(args)
+
+def _report(batch):
+    with open(os.path.join(batch.output, "batch-report.json")) as file:
+        return json.load(file)
+
+def test_batch_exits_with_failure_when_a_job_fails(batch, monkeypatch, tmp_path):
+    with pytest.raises(SystemExit) as exited:
+        _run_batch(batch, monkeypatch, tmp_path, {"https://example.com/good.git": 0, "https://example.com/bad.git": 1})
+    assert exited.value.code == 1
+    report = _report(batch)
+    assert {job["name"]: job["exit_code"] for job in report["jobs"]} == {"good-iac": 0, "bad-iac": 1}
+    assert (report["summary"]["passed"], report["summary"]["failed"]) == (1, 1)
+
+def test_batch_succeeds_when_every_job_passes(batch, monkeypatch, tmp_path):
+    _run_batch(batch, monkeypatch, tmp_path, {"https://example.com/good.git": 0, "https://example.com/bad.git": 0})
+    assert _report(batch)["summary"]["passed"] == 2
+    assert os.getcwd() == str(tmp_path)
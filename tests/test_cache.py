@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from aspm_cli.utils.cache import FindingsCache, ResultCache, hash_file
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASPM_CACHE_DIR", str(tmp_path / "cache"))
+
+def test_findings_are_keyed_by_scope_and_content(tmp_path):
+    scope = {"image": "checkov:1", "image_id": "sha256:a", "framework": None}
+    cache = FindingsCache("iac", scope)
+    cache.put("hash-1", {"terraform": {"failed_checks": [1]}})
+    assert FindingsCache("iac", dict(reversed(list(scope.items())))).get("hash-1") == {"terraform": {"failed_checks": [1]}}
+    assert cache.get("hash-2") is None
+    assert FindingsCache("iac", dict(scope, image_id="sha256:b")).get("hash-1") is None
+    assert FindingsCache("sast", scope).get("hash-1") is None
+
+def test_hash_file_depends_on_content_only(tmp_path):
+    (tmp_path / "a").write_text("same")
+    (tmp_path / "b").write_text("same")
+    assert hash_file(str(tmp_path / "a")) == hash_file(str(tmp_path / "b"))
+
+def test_result_cache_key_ignores_part_order():
+    assert ResultCache.make_key({"tree": "t", "image": "i"}) == ResultCache.make_key({"image": "i", "tree": "t"})
+    assert ResultCache.make_key({"tree": "t", "image": "i"}) != ResultCache.make_key({"tree": "t", "image": "j"})
+
+def test_result_cache_round_trip(tmp_path):
+    src = tmp_path / "results.json"
+    src.write_text("[1]")
+    cache = ResultCache()
+    assert cache.get("key", str(tmp_path / "out.json")) is None
+    cache.put("key", str(src), 1)
+    assert cache.get("key", str(tmp_path / "out.json")) == 1
+    assert (tmp_path / "out.json").read_text() == "[1]"
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    src = tmp_path / "results.json"
+    src.write_text("x" * 100)
+    cache = ResultCache(max_bytes=250)
+    for key in ("a", "b"):
+        cache.put(key, str(src), 0)
+    for key, mtime in (("a", 1), ("b", 2)):
+        for path in cache._paths(key):
+            os.utime(path, (mtime, mtime))
+    # A hit makes "a" the most recently used entry
+    cache.get("a", str(tmp_path / "out.json"))
+    cache.put("c", str(src), 0)
+    assert sorted(key for _, _, key in cache.entries()) == ["a", "c"]
@@ -0,0 +1,58 @@
+import os
+
+from aspm_cli.scan.checkov_results import checkov_version, combine_per_file, has_failed_checks, merge_reports, record_path, split_by_file
+
+def test_record_path_of_a_container_scan():
+    assert record_path({"file_abs_path": "/workdir/modules/main.tf", "file_path": "/main.tf"}, "modules") == "modules/main.tf"
+
+def test_record_path_of_a_native_scan(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    record = {"file_abs_path": str(tmp_path / "modules" / "main.tf"), "file_path": "/modules/main.tf"}
+    # The same record whether it came from a -d or a -f scan
+    assert record_path(record, "modules") == record_path(record) == os.path.join("modules", "main.tf")
+
+def _record(check_id, path, resource="aws_s3_bucket.b", lines=(1, 3)):
+    return {"check_id": check_id, "resource": resource, "file_path": f"/{path}",
+            "file_abs_path": f"/workdir/{path}", "file_line_range": list(lines)}
+
+def _report(check_type, failed=(), passed=()):
+    return {"check_type": check_type, "results": {"passed_checks": list(passed), "failed_checks": list(failed), "skipped_checks": []},
+            "summary": {"checkov_version": "3.2.21"}}
+
+def test_split_and_merge_round_trip():
+    reports = [
+        _report("terraform", failed=[_record("CKV_2", "b.tf"), _record("CKV_1", "a.tf")], passed=[_record("CKV_3", "a.tf")]),
+        _report("kubernetes", failed=[_record("CKV_K8S_1", "k8s/pod.yaml", "Pod.default.p")]),
+    ]
+    per_file = split_by_file(reports)
+    assert sorted(per_file) == ["a.tf", "b.tf", os.path.join("k8s", "pod.yaml")]
+    assert [r["check_id"] for r in per_file["a.tf"]["terraform"]["failed_checks"]] == ["CKV_1"]
+
+    merged = merge_reports(per_file, ".", checkov_version(reports))
+    assert [report["check_type"] for report in merged] == ["kubernetes", "terraform"]
+    terraform = merged[1]
+    assert [r["check_id"] for r in terraform["results"]["failed_checks"]] == ["CKV_1", "CKV_2"]
+    assert terraform["summary"] == {"passed": 1, "failed": 2, "skipped": 0, "parsing_errors": 0,
+                                    "resource_count": 2, "checkov_version": "3.2.21"}
+    assert has_failed_checks(merged)
+
+def test_merge_rebases_paths_onto_the_scanned_directory():
+    merged = merge_reports(split_by_file([_report("terraform", failed=[_record("CKV_1", "infra/main.tf")])]), "infra")
+    record = merged["results"]["failed_checks"][0]
+    assert (record["file_path"], record["repo_file_path"]) == ("/main.tf", "/infra/main.tf")
+
+def test_merge_of_nothing_is_a_summary():
+    merged = merge_reports({}, ".", "3.2.21")
+    assert merged["failed"] == 0 and "check_type" not in merged
+    assert not has_failed_checks(merged)
+
+def test_combine_drops_checks_reported_by_several_shards():
+    shared = _record("CKV_1", "main.tf")
+    combined = combine_per_file([
+        split_by_file([_report("terraform", failed=[shared])]),
+        split_by_file([_report("terraform", failed=[dict(shared), _record("CKV_2", "main.tf")])]),
+        split_by_file([_report("secrets", failed=[dict(shared)])]),
+    ])
+    assert [r["check_id"] for r in combined["main.tf"]["terraform"]["failed_checks"]] == ["CKV_1", "CKV_2"]
+    # The same check under another framework is a different finding
+    assert len(combined["main.tf"]["secrets"]["failed_checks"]) == 1
@@ -0,0 +1,56 @@
+import argparse
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import aspm_cli.utils
+from aspm_cli import cli
+from aspm_cli.utils.run_controller import RunController
+
+class FakeScanner:
+    """Waits for the other scanners to start, then returns a fixed exit code."""
+
+    def __init__(self, scantype, exit_code, started):
+        self.scantype = scantype
+        self.exit_code = exit_code
+        self.started = started
+
+    def run(self):
+        self.started.wait(timeout=5)
+        return self.exit_code, f"{self.scantype}.json"
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Run run_all_scans with fake scanners; returns a function taking {scan type: exit code}."""
+    monkeypatch.setattr(RunController, "_instance", None)
+    monkeypatch.setattr(cli.GitInfo, "snapshot", classmethod(lambda cls: SimpleNamespace(repo_url=None, branch=None, commit_sha=None, commit_ref=None)))
+    monkeypatch.setattr(aspm_cli.utils, "ConfigValidator", lambda *args, **kwargs: None)
+    uploads = []
+    monkeypatch.setattr(cli, "upload_result_files", lambda result_file, *args: uploads.append(result_file))
+
+    def run(exit_codes, softfail=False):
+        started = threading.Barrier(len(exit_codes))
+        monkeypatch.setattr(cli, "build_scanner", lambda scantype, args, validator: (FakeScanner(scantype, exit_codes[scantype], started), "IAC"))
+        args = argparse.Namespace(scantypes=",".join(exit_codes), softfail=softfail, repo_url="https://example.com/repo",
+                                  repo_branch="main", commit_sha="sha", commit_ref="refs/heads/main",
+                                  delta_upload=False, index_findings=False, spool=False)
+        cli.run_all_scans(args)
+        return uploads
+    return run
+
+def test_scanners_run_in_parallel_and_each_result_is_uploaded(scans):
+    # The fake scanners only return once all of them are running
+    assert sorted(scans({"iac": 0, "sast": 0})) == ["iac.json", "sast.json"]
+
+def test_a_failed_scanner_fails_the_run(scans):
+    with pytest.raises(SystemExit) as exited:
+        scans({"iac": 0, "sast": 1})
+    assert exited.value.code == 1
+
+def test_softfail_keeps_the_run_passing(scans):
+    assert sorted(scans({"iac": 1, "sast": 0}, softfail=True)) == ["iac.json", "sast.json"]
+
+def test_invalid_scan_types_run_nothing(scans, monkeypatch):
+    monkeypatch.setattr(cli, "build_scanner", lambda *args: pytest.fail("scanner built for an invalid scan type"))
+    cli.run_all_scans(argparse.Namespace(scantypes="iac,unknown", softfail=False, repo_branch="main"))
@@ -0,0 +1,29 @@
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aspm_cli.utils.docker_pull import ImageCache
+
+# aspm_cli.utils re-exports the docker_pull function under the module's name
+docker_pull = importlib.import_module("aspm_cli.utils.docker_pull")
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASPM_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+def test_concurrent_records_from_separate_caches_are_all_kept():
+    images = [f"example.com/scanner-{i}:1.0" for i in range(200)]
+    # Backends share one ImageCache per engine; separate instances still share its state file
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda image: ImageCache()._record(image, f"sha256:{image}"), images))
+    assert {image: ImageCache().cached_id(image) for image in images} == {image: f"sha256:{image}" for image in images}
+
+def test_failed_state_write_does_not_fail_the_pull(monkeypatch):
+    def _fail(*args, **kwargs):
+        raise OSError("read-only file system")
+    monkeypatch.setattr(docker_pull, "write_json_atomic", _fail)
+    monkeypatch.setattr(ImageCache, "inspect", lambda self, image: ("sha256:abc", []))
+    ImageCache().ensure("example.com/scanner:1.0")
+    assert ImageCache().cached_id("example.com/scanner:1.0") is None
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from aspm_cli.utils.findings_index import FindingsIndex
+
+REPO = "https://example.com/repo"
+
+@pytest.fixture
+def index(tmp_path):
+    return FindingsIndex(str(tmp_path / "findings.db"))
+
+def _checkov(path, checks):
+    """Write a Checkov result with checks given as (check_list, check_id, file, severity)."""
+    report = {"check_type": "terraform", "results": {"passed_checks": [], "failed_checks": [], "skipped_checks": []}}
+    for check_list, check_id, file, severity in checks:
+        report["results"][check_list].append({"check_id": check_id, "resource": f"{check_id}.r", "file_path": f"/{file}",
+                                              "file_line_range": [1, 2], "severity": severity, "check_name": check_id})
+    path.write_text(json.dumps([report, {"details": {"repo": REPO, "branch": "main"}}]))
+    return str(path)
+
+def test_ingest_and_query(tmp_path, index):
+    result = _checkov(tmp_path / "results_json.json", [
+        ("failed_checks", "CKV_1", "modules/a.tf", "high"),
+        ("failed_checks", "CKV_2", "main.tf", "LOW"),
+        ("passed_checks", "CKV_3", "modules/b.tf", None),
+    ])
+    assert index.ingest(result, commit_sha="aaa") == 3
+    assert [row["check_id"] for row in index.query({"status": "failed", "severity": "high"})] == ["CKV_1"]
+    assert sorted(row["check_id"] for row in index.query({"file": "modules/"})) == ["CKV_1", "CKV_3"]
+    assert index.query({"status": "failed"})[0]["repo"] == REPO
+    assert index.count({}) == 3
+    assert dict(index.count({}, group_by="status")) == {"failed": 2, "passed": 1}
+    with pytest.raises(ValueError):
+        index.query({"unknown": 1})
+
+def test_ingesting_a_commit_again_replaces_its_run(tmp_path, index):
+    result = tmp_path / "results_json.json"
+    index.ingest(_checkov(result, [("failed_checks", "CKV_1", "main.tf", None)]), commit_sha="aaa")
+    index.ingest(_checkov(result, [("failed_checks", "CKV_2", "main.tf", None)]), commit_sha="aaa")
+    index.ingest(_checkov(result, [("failed_checks", "CKV_3", "main.tf", None)]), commit_sha="bbb")
+    assert [row["check_id"] for row in index.query({"commit_sha": "aaa"})] == ["CKV_2"]
+    assert index.count({}) == 2
+
+def test_diff_between_commits(tmp_path, index):
+    result = tmp_path / "results_json.json"
+    index.ingest(_checkov(result, [("failed_checks", "CKV_1", "main.tf", None), ("failed_checks", "CKV_2", "main.tf", None)]), commit_sha="aaa")
+    index.ingest(_checkov(result, [("failed_checks", "CKV_2", "main.tf", None), ("failed_checks", "CKV_3", "main.tf", None)]), commit_sha="bbb")
+    diff = index.diff("aaa", "bbb", {})
+    assert [row["check_id"] for row in diff["added"]] == ["CKV_3"]
+    assert [row["check_id"] for row in diff["removed"]] == ["CKV_1"]
+
+@pytest.mark.parametrize("before, after, added, removed", [
+    ("passed_checks", "failed_checks", ["CKV_1"], []),
+    ("failed_checks", "passed_checks", [], ["CKV_1"]),
+])
+def test_diff_reports_status_changes(tmp_path, index, before, after, added, removed):
+    result = tmp_path / "results_json.json"
+    index.ingest(_checkov(result, [(before, "CKV_1", "main.tf", None)]), commit_sha="aaa")
+    index.ingest(_checkov(result, [(after, "CKV_1", "main.tf", None)]), commit_sha="bbb")
+    diff = index.diff("aaa", "bbb", {"status": "failed"})
+    assert [row["check_id"] for row in diff["added"]] == added
+    assert [row["check_id"] for row in diff["removed"]] == removed
@@ -0,0 +1,34 @@
+from aspm_cli.scan.fingerprints import detect_tool, iter_findings, record_digest
+
+def _checkov(check_list, line_range=(1, 3)):
+    report = {"check_type": "terraform", "results": {"passed_checks": [], "failed_checks": [], "skipped_checks": []}}
+    report["results"][check_list].append({"check_id": "CKV_1", "resource": "aws_s3_bucket.b",
+                                          "file_path": "/main.tf", "file_line_range": list(line_range)})
+    return [report, {"details": {"repo": "https://example.com/repo"}}]
+
+def test_detect_tool():
+    assert detect_tool(_checkov("failed_checks")) == "checkov"
+    assert detect_tool({"version": "1.0.1", "results": []}) == "opengrep"
+    assert detect_tool({"issues": [{"rule": "python:S1", "component": "p:a.py"}]}) == "sonarqube"
+    assert detect_tool({"something": []}) is None
+
+def test_checkov_fingerprint_survives_moved_lines():
+    (before, _, _), = iter_findings(_checkov("failed_checks", (1, 3)))
+    (after, _, _), = iter_findings(_checkov("failed_checks", (10, 12)))
+    assert before == after
+
+def test_status_change_keeps_the_fingerprint_but_changes_the_digest():
+    (passed_fp, passed_group, passed), = iter_findings(_checkov("passed_checks"))
+    (failed_fp, failed_group, failed), = iter_findings(_checkov("failed_checks"))
+    assert passed_fp == failed_fp
+    assert record_digest(passed, passed_group) != record_digest(failed, failed_group)
+
+def test_duplicate_findings_get_distinct_fingerprints():
+    record = {"check_id": "rule", "path": "a.py", "extra": {"lines": "eval(x)"}}
+    fingerprints = [fp for fp, _, _ in iter_findings({"version": "1", "results": [record, dict(record)]})]
+    assert len(set(fingerprints)) == 2
+
+def test_opengrep_fingerprint_ignores_whitespace():
+    first = {"version": "1", "results": [{"check_id": "rule", "path": "./a.py", "extra": {"lines": "eval( x )"}}]}
+    second = {"version": "1", "results": [{"check_id": "rule", "path": "a.py", "extra": {"lines": "  eval(  x  )"}}]}
+    assert [fp for fp, _, _ in iter_findings(first)] == [fp for fp, _, _ in iter_findings(second)]
@@ -0,0 +1,75 @@
+import os
+import subprocess
+
+import pytest
+
+from aspm_cli.utils.git import GitInfo, GitSnapshot
+
+CI_ENV = ("GITHUB_ACTIONS", "GITHUB_WORKSPACE", "GITHUB_SERVER_URL", "GITHUB_REPOSITORY", "GITHUB_SHA",
+          "GITHUB_REF", "GITHUB_REF_NAME", "GITHUB_HEAD_REF", "GITLAB_CI", "CI_PROJECT_DIR", "JENKINS_URL", "WORKSPACE")
+
+def _git(path, *args):
+    subprocess.check_call(["git", "-C", str(path), *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def _repo(path, url):
+    path.mkdir()
+    _git(path, "init", "-q", "-b", "main")
+    _git(path, "remote", "add", "origin", url)
+    (path / "README").write_text("readme\n")
+    _git(path, "add", "README")
+    _git(path, "-c", "user.email=dev@example.com", "-c", "user.name=dev", "commit", "-q", "-m", "init")
+    return path
+
+@pytest.fixture
+def github_actions(tmp_path, monkeypatch):
+    for name in CI_ENV:
+        monkeypatch.delenv(name, raising=False)
+    checkout = _repo(tmp_path / "checkout", "https://github.com/acme/checkout.git")
+    monkeypatch.setenv("GITHUB_ACTIONS", "true")
+    monkeypatch.setenv("GITHUB_WORKSPACE", str(checkout))
+    monkeypatch.setenv("GITHUB_SERVER_URL", "https://github.com")
+    monkeypatch.setenv("GITHUB_REPOSITORY", "acme/checkout")
+    monkeypatch.setenv("GITHUB_SHA", "c" * 40)
+    monkeypatch.setenv("GITHUB_REF", "refs/heads/ci-branch")
+    monkeypatch.setenv("GITHUB_REF_NAME", "ci-branch")
+    return checkout
+
+def test_ci_variables_describe_the_checkout(github_actions):
+    snapshot = GitSnapshot(str(github_actions / "."))
+    assert snapshot.repo_url == "https://github.com/acme/checkout"
+    assert snapshot.commit_sha == "c" * 40
+    assert snapshot.branch == "ci-branch"
+
+def test_other_repository_ignores_ci_variables(github_actions, tmp_path):
+    other = _repo(tmp_path / "other", "https://example.com/acme/other.git")
+    sha = subprocess.check_output(["git", "-C", str(other), "rev-parse", "HEAD"]).decode().strip()
+    snapshot = GitSnapshot(str(other))
+    assert snapshot.repo_url == "https://example.com/acme/other.git"
+    assert snapshot.commit_sha == sha
+    assert snapshot.branch == "main"
+    assert snapshot.commit_ref == "refs/heads/main"
+
+def test_tree_hash_from_a_subdirectory_ignores_its_result_file(tmp_path, monkeypatch):
+    repo = _repo(tmp_path / "repo", "https://github.com/acme/repo.git")
+    (repo / "app").mkdir()
+    (repo / "app" / "main.py").write_text("print(1)\n")
+    _git(repo, "add", "app")
+    _git(repo, "-c", "user.email=dev@example.com", "-c", "user.name=dev", "commit", "-q", "-m", "app")
+    monkeypatch.chdir(repo / "app")
+
+    (repo / "app" / "results.json").write_text("{}")
+    tree = GitInfo.get_tree_hash(ignore=["results.json"])
+    assert tree == subprocess.check_output(["git", "rev-parse", "HEAD:app"], cwd=repo).decode().strip()
+    assert GitInfo.get_tree_hash() is None
+
+    # Changes outside the working directory do not touch its tree
+    (repo / "README").write_text("changed\n")
+    assert GitInfo.get_tree_hash(ignore=["results.json"]) == tree
+
+def test_tree_hash_sees_the_origin_of_a_rename(tmp_path, monkeypatch):
+    repo = _repo(tmp_path / "repo", "https://github.com/acme/repo.git")
+    monkeypatch.chdir(repo)
+    _git(repo, "mv", "README", "results.json")
+    # The renamed file is ignored, its origin is not
+    assert GitInfo.get_tree_hash(ignore=["results.json"]) is None
+    assert GitInfo.get_tree_hash(ignore=["results.json", "README"]) is not None
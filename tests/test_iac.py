@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+from aspm_cli.scan import iac
+from aspm_cli.scan.iac import IaCScanner
+from aspm_cli.utils.cache import ResultCache
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASPM_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(iac.GitInfo, "get_tree_hash", staticmethod(lambda ignore=(): "tree"))
+    monkeypatch.setattr(iac, "image_identity", lambda image: "sha256:image")
+
+def test_result_cache_key_ignores_repository_details():
+    main = IaCScanner(repo_url="https://example.com/repo", repo_branch="main", directory=".")
+    feature = IaCScanner(repo_url="https://example.com/repo", repo_branch="feature", directory=".")
+    assert main._result_cache_key() == feature._result_cache_key()
+    assert main._result_cache_key() != IaCScanner(directory=".", framework="terraform")._result_cache_key()
+
+def test_cached_result_gets_the_current_details(tmp_path, monkeypatch):
+    scanner = IaCScanner(repo_url="https://example.com/repo", repo_branch="feature", directory=".")
+    raw = tmp_path / "raw.json"
+    raw.write_text(json.dumps({"check_type": "terraform", "results": {}}))
+    ResultCache().put(scanner._result_cache_key(), str(raw), 1)
+    monkeypatch.setattr(iac, "docker_pull", lambda image: pytest.fail("a cache hit must not pull"))
+
+    assert scanner.run() == (1, scanner.result_file)
+    with open(scanner.result_file) as file:
+        result = json.load(file)
+    assert result == [{"check_type": "terraform", "results": {}},
+                      {"details": {"repo": "https://example.com/repo", "branch": "feature"}}]
+
+def test_shards_leave_out_every_scanner_output(tmp_path):
+    for name in ("results.json", "results_json.json", "results.json.upload", "main.tf"):
+        (tmp_path / name).write_text("{}")
+    (tmp_path / "modules").mkdir()
+    shards = IaCScanner(directory=".", shard_by="directory")._plan_shards()
+    assert shards == [(["-d", "./modules"], None), (["-f", "./main.tf"], None)]
+
+def _git(*args):
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args], check=True, capture_output=True)
+
+def test_incremental_cache_is_scoped_by_image_identity(tmp_path, monkeypatch):
+    monkeypatch.setattr(iac, "docker_pull", lambda image: None)
+    _git("init", "-q")
+    (tmp_path / ".gitignore").write_text("results_json.json\ncache/\n")
+    for name in ("a.tf", "b.tf", "c.tf"):
+        (tmp_path / name).write_text(f'resource "aws_s3_bucket" "{name}" {{}}\n')
+    _git("add", ".")
+    _git("commit", "-qm", "initial")
+
+    scanned = []
+
+    def run_checkov(self, targets, result_file=None, framework=None, details=False):
+        paths = [target for target in targets if target not in ("-f", "-d")]
+        files = sorted(name for name in os.listdir(".") if name.endswith(".tf")) if "-d" in targets else paths
+        scanned.append(files)
+        report = {"check_type": "terraform", "results": {"passed_checks": [], "skipped_checks": [], "failed_checks": [
+            {"check_id": "CKV_1", "resource": path, "file_path": f"/{path}", "file_abs_path": f"/workdir/{path}"} for path in files
+        ]}}
+        writer = iac.JsonArrayWriter(self.result_file, self._details()) if details else iac._RawWriter(self.result_file)
+        writer.write(json.dumps(report))
+        writer.close()
+        return 1
+
+    monkeypatch.setattr(IaCScanner, "_run_checkov", run_checkov)
+    scanner = IaCScanner(directory=".", base_ref="HEAD", use_cache=False)
+    assert scanner.run()[0] == 1
+    assert scanner.run()[0] == 1
+    assert len(scanned) == 1
+
+    monkeypatch.setattr(iac, "image_identity", lambda image: "sha256:other")
+    (tmp_path / "d.tf").write_text('resource "aws_s3_bucket" "d" {}\n')
+    scanner.run()
+    # A new image build invalidates every cached file
+    assert scanned[-1] == ["a.tf", "b.tf", "c.tf", "d.tf"]
+
+def test_sharded_scan_merges_shards_into_one_result(tmp_path, monkeypatch):
+    (tmp_path / "network").mkdir()
+    (tmp_path / "storage").mkdir()
+
+    def run_checkov(self, targets, result_file=None, framework=None, details=False):
+        path = f"{targets[1].lstrip('./')}/main.tf"
+        with open(result_file, "w") as file:
+            json.dump({"check_type": "terraform", "results": {"passed_checks": [], "skipped_checks": [], "failed_checks": [
+                {"check_id": "CKV_1", "resource": path, "file_path": "/main.tf", "file_abs_path": f"/workdir/{path}"}
+            ]}, "summary": {"checkov_version": "3.2.21"}}, file)
+        return 1
+
+    monkeypatch.setattr(IaCScanner, "_run_checkov", run_checkov)
+    scanner = IaCScanner(repo_url="https://example.com/repo", repo_branch="main", directory=".", shard_by="directory", workers=2)
+    assert scanner._run_full() == 1
+    with open(scanner.result_file) as file:
+        report, details = json.load(file)
+    assert [r["repo_file_path"] for r in report["results"]["failed_checks"]] == ["/network/main.tf", "/storage/main.tf"]
+    assert details == scanner._details()
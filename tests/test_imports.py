@@ -0,0 +1,11 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_cli_import_defers_scanners_and_process_pool():
+    code = ("import sys, aspm_cli.cli; "
+            "print(sorted(m for m in ('aspm_cli.scan.iac', 'concurrent.futures.process', 'requests', 'pydantic') if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
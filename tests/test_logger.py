@@ -0,0 +1,65 @@
+import logging
+import os
+import queue
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from aspm_cli.utils.logger import _NonBlockingQueueHandler
+
+def _run(code, **env):
+    """Run code in a fresh interpreter, so the process-wide logger starts from scratch; returns its stderr."""
+    result = subprocess.run([sys.executable, "-c", textwrap.dedent(code)], capture_output=True, text=True, timeout=60,
+                            env=dict(os.environ, PYTHONPATH=os.getcwd(), **env))
+    assert result.returncode == 0, result.stderr
+    return result.stderr
+
+def test_full_queue_drops_and_counts_records_without_blocking():
+    handler = _NonBlockingQueueHandler(queue.Queue(maxsize=2))
+    for i in range(5):
+        handler.handle(logging.makeLogRecord({"msg": f"record {i}", "levelno": logging.INFO, "levelname": "INFO"}))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+def test_dropped_records_are_reported_at_exit():
+    stderr = _run("""
+        from aspm_cli.utils.logger import Logger
+        Logger.get_logger().info("first")
+        Logger._handler.dropped = 3
+    """)
+    assert "first" in stderr
+    assert "3 log record(s) dropped because the log queue was full" in stderr
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_child_restarts_the_writer():
+    stderr = _run("""
+        import os
+        from aspm_cli.utils.logger import Logger
+        Logger.get_logger().info("parent")
+        pid = os.fork()
+        if pid == 0:
+            Logger.get_logger().info("child")
+            Logger.flush()
+            os._exit(0)
+        os.waitpid(pid, 0)
+    """)
+    assert "parent" in stderr and "child" in stderr
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_pool_worker_records_are_written_before_it_exits():
+    stderr = _run("""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from aspm_cli.utils.logger import Logger
+
+        def work(i):
+            Logger.get_logger().info(f"worker {i}")
+
+        if __name__ == "__main__":
+            Logger.get_logger().info("parent")
+            with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("fork")) as executor:
+                list(executor.map(work, range(4)))
+    """)
+    assert all(f"worker {i}" in stderr for i in range(4))
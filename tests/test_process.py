@@ -0,0 +1,46 @@
+import io
+import sys
+
+from aspm_cli.utils.process import MAX_LINE_CHARS, progress_handler, run_process
+
+def _python(code):
+    return [sys.executable, "-c", code]
+
+def test_only_the_last_lines_are_kept():
+    result = run_process(_python("import sys\nfor i in range(1000): print(i); print(-i, file=sys.stderr)\nsys.exit(3)"), max_lines=5)
+    assert result.returncode == 3
+    assert result.stdout == "".join(f"{i}\n" for i in range(995, 1000))
+    assert result.stderr == "".join(f"-{i}\n" for i in range(995, 1000))
+
+def test_tail_length_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv("ASPM_OUTPUT_TAIL_LINES", "2")
+    assert run_process(_python("for i in range(10): print(i)")).stdout == "8\n9\n"
+
+def test_long_lines_are_read_in_pieces():
+    result = run_process(_python(f"print('x' * {MAX_LINE_CHARS * 2 + 10})"), max_lines=10)
+    assert result.stdout == "x" * (MAX_LINE_CHARS * 2 + 10) + "\n"
+
+def test_stdout_sink_receives_all_of_stdout():
+    sink = io.StringIO()
+    lines = []
+    result = run_process(_python("import sys\nfor i in range(1000): print(i)\nprint('done', file=sys.stderr)"),
+                         on_line=lambda stream, line: lines.append(stream), max_lines=5, stdout_sink=sink)
+    # Nothing is cut from the data written to the sink, and it is not kept as output
+    assert sink.getvalue() == "".join(f"{i}\n" for i in range(1000))
+    assert result.stdout == "" and result.stderr == "done\n"
+    assert lines == ["stderr"]
+
+def test_failing_sink_does_not_block_the_process():
+    class Broken:
+        def write(self, data):
+            raise OSError("disk full")
+
+    result = run_process(_python(f"print('x' * {MAX_LINE_CHARS * 4})"), stdout_sink=Broken())
+    assert result.returncode == 0
+
+def test_progress_handler_reports_status_messages():
+    messages = []
+    on_line = progress_handler("opengrep", messages.append, prefix="sast: ")
+    on_line("stderr", "Ran 120 rules on 42 files: 3 findings\n")
+    on_line("stderr", "unrelated\n")
+    assert messages == ["sast: ran 120 rules on 42 files"]
@@ -0,0 +1,47 @@
+import json
+import os
+import threading
+
+import pytest
+
+from aspm_cli.utils.profiler import Profiler
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    monkeypatch.setattr(Profiler, "_instance", None)
+    return Profiler.enable(str(tmp_path / "profile"))
+
+def test_disabled_profiler_records_nothing(monkeypatch):
+    monkeypatch.setattr(Profiler, "_instance", None)
+    with Profiler.phase("scan", file="a.json") as phase:
+        phase["bytes_read"] = 10
+    assert Profiler.get().phases == []
+
+def test_report_writes_a_chrome_trace(profiler):
+    with Profiler.phase("scan:iac") as phase:
+        phase["bytes_written"] = 2048
+
+    def upload():
+        with Profiler.phase("upload", file="a.json"):
+            pass
+
+    worker = threading.Thread(target=upload, name="upload-worker")
+    worker.start()
+    worker.join()
+    profiler.report()
+
+    with open(os.path.join(profiler.output_dir, "trace.json")) as file:
+        trace = json.load(file)
+    complete = {event["name"]: event for event in trace["traceEvents"] if event["ph"] == "X"}
+    names = {event["args"]["name"]: event["tid"] for event in trace["traceEvents"] if event["ph"] == "M"}
+    assert set(complete) == {"scan:iac", "upload"}
+    assert complete["scan:iac"]["args"]["bytes_written"] == 2048 and complete["upload"]["args"]["file"] == "a.json"
+    assert all(event["pid"] == os.getpid() and event["dur"] >= 0 for event in complete.values())
+    # Phases start in order, in microseconds from the start of the run
+    assert complete["scan:iac"]["ts"] <= complete["upload"]["ts"]
+    # Each thread is named after the thread that ran its phases
+    assert names["upload-worker"] == complete["upload"]["tid"] != complete["scan:iac"]["tid"]
+    assert complete["scan:iac"]["tid"] == names["MainThread"]
+
+    with open(os.path.join(profiler.output_dir, "profile.json")) as file:
+        assert [phase["name"] for phase in json.load(file)["phases"]] == ["scan:iac", "upload"]
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from aspm_cli.utils.result_writer import JsonArrayWriter, append_to_json_array, set_json_object_key, write_json_array
+
+DETAILS = {"details": {"repo": "https://example.com/repo", "branch": "main"}}
+
+@pytest.mark.parametrize("content, expected", [
+    ('[{"a": 1}, {"b": 2}]\n', [{"a": 1}, {"b": 2}, DETAILS]),
+    ("[ ]", [DETAILS]),
+    ('﻿  {"a": 1}  \n', [{"a": 1}, DETAILS]),
+])
+def test_append_to_json_array(tmp_path, content, expected):
+    path = tmp_path / "results.json"
+    path.write_text(content, encoding="utf-8")
+    stats = append_to_json_array(str(path), DETAILS)
+    assert json.loads(path.read_text(encoding="utf-8-sig")) == expected
+    assert stats["bytes"] == path.stat().st_size
+
+def test_append_to_json_array_rejects_other_documents(tmp_path):
+    path = tmp_path / "results.json"
+    path.write_text('"text"')
+    with pytest.raises(ValueError):
+        append_to_json_array(str(path), DETAILS)
+
+@pytest.mark.parametrize("content, expected", [
+    ('{"issues": []}', {"issues": [], "repo_details": {"commit": "abc"}}),
+    ("{}", {"repo_details": {"commit": "abc"}}),
+    ('{"repo_details": null}', {"repo_details": {"commit": "abc"}}),
+])
+def test_set_json_object_key(tmp_path, content, expected):
+    path = tmp_path / "results.json"
+    path.write_text(content)
+    set_json_object_key(str(path), "repo_details", {"commit": "abc"})
+    assert json.loads(path.read_text()) == expected
+
+@pytest.mark.parametrize("chunks, expected", [
+    (['[{"a"', ': 1}', "]"], [{"a": 1}, DETAILS]),
+    (["\n  ", '{"a": ', "1}\n"], [{"a": 1}, DETAILS]),
+    ([b"[]"], [DETAILS]),
+])
+def test_json_array_writer(tmp_path, chunks, expected):
+    path = tmp_path / "results.json"
+    writer = JsonArrayWriter(str(path), DETAILS)
+    for chunk in chunks:
+        writer.write(chunk)
+    assert writer.close()["bytes"] == path.stat().st_size
+    assert json.loads(path.read_text()) == expected
+
+def test_json_array_writer_without_output_leaves_no_file(tmp_path):
+    path = tmp_path / "results.json"
+    writer = JsonArrayWriter(str(path), DETAILS)
+    writer.write("  \n")
+    assert writer.close() is None
+    assert not path.exists()
+
+def test_write_json_array(tmp_path):
+    path = tmp_path / "results.json"
+    write_json_array(str(path), {"a": 1}, DETAILS)
+    assert json.loads(path.read_text()) == [{"a": 1}, DETAILS]
+    write_json_array(str(path), [{"a": 1}])
+    assert json.loads(path.read_text()) == [{"a": 1}]
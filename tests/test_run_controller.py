@@ -0,0 +1,98 @@
+import pytest
+
+from aspm_cli.utils import backends
+from aspm_cli.utils.run_controller import RunCancelled, RunController
+from aspm_cli.utils.scanner_daemon import DaemonClient
+from aspm_cli.utils.spool import SpoolFlusher, UploadSpool
+from aspm_cli.utils.upload import ArtifactUploader
+
+class FakeBackend:
+    def __init__(self):
+        self.stopped = []
+
+    def stop_labelled(self, label, timeout):
+        self.stopped.append(label)
+        return ["container-1"]
+
+class FakeProcess:
+    def __init__(self):
+        self.terminated = False
+
+    def poll(self):
+        return 0 if self.terminated else None
+
+    def terminate(self):
+        self.terminated = True
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setattr(backends, "container_backend", lambda choice=None: backend)
+    monkeypatch.setattr(DaemonClient, "available", lambda self: False)
+    return backend
+
+@pytest.fixture
+def controller(monkeypatch, backend):
+    """The run's fail-fast controller, with a fake container backend and no scanner daemon."""
+    monkeypatch.setenv("ASPM_RUN_ID", "run-1")
+    controller = RunController(fail_fast=True)
+    monkeypatch.setattr(RunController, "_instance", controller)
+    return controller
+
+def test_fail_without_fail_fast_only_keeps_going():
+    controller = RunController()
+    controller.fail("iac", "exit code 2")
+    assert controller.failure is None and not controller.cancelled.is_set()
+    controller.check("upload")
+
+def test_first_failure_stops_the_run(controller, backend):
+    process = FakeProcess()
+    controller.on_start(process)
+    controller.fail("iac", "exit code 2")
+    controller.fail("sast", "exit code 2")
+
+    assert controller.failure == ("iac", "exit code 2")
+    assert controller.cancelled.is_set()
+    assert backend.stopped == ["aspm-run=run-1"] and controller.stopped == ["container-1"]
+    assert process.terminated
+    assert controller.report()
+
+def test_process_started_after_the_failure_is_terminated(controller):
+    controller.fail("iac", "exit code 2")
+    process = FakeProcess()
+    controller.on_start(process)
+    assert process.terminated
+
+def test_only_work_for_the_failed_scan_goes_on(controller):
+    controller.fail("iac", "exit code 2")
+    with pytest.raises(RunCancelled):
+        controller.check("upload")
+    with controller.acting_for("iac"):
+        controller.check("upload")
+    assert controller.cancelled_uploads == 1
+
+def test_uploads_of_other_scans_are_cancelled(controller, tmp_path, monkeypatch):
+    artifact = tmp_path / "results.json"
+    artifact.write_text("{}")
+    uploader = ArtifactUploader("https://example.com", 1, "token")
+    monkeypatch.setattr(uploader.session, "post", lambda *args, **kwargs: pytest.fail("uploaded after the run was cancelled"))
+    controller.fail("iac", "exit code 2")
+
+    with controller.acting_for("sast"):
+        results = uploader.upload_many([(str(artifact), "SQ", None)] * 2)
+    assert [result["error"] for result in results] == ["cancelled after iac failed"] * 2
+    assert controller.cancelled_uploads == 2
+
+def test_cancelled_spooled_upload_stays_in_the_spool(controller, tmp_path, monkeypatch):
+    monkeypatch.setenv("ASPM_CACHE_DIR", str(tmp_path / "cache"))
+    artifact = tmp_path / "results.json"
+    artifact.write_text("{}")
+    spool = UploadSpool(str(tmp_path / "spool"))
+    entry_id = spool.add(str(artifact), "https://example.com", 1, "label", "SQ")
+    monkeypatch.setattr("requests.Session.post", lambda *args, **kwargs: pytest.fail("uploaded after the run was cancelled"))
+    controller.fail("iac", "exit code 2")
+
+    assert SpoolFlusher()._upload(spool, entry_id, "token") is False
+    assert [entry["id"] for entry in spool.entries()] == [entry_id]
+    # Released for a later `aspm-cli flush`
+    assert spool.claim(entry_id)
@@ -0,0 +1,121 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+from aspm_cli.scan import sast
+from aspm_cli.scan.sast import SASTScanner
+from aspm_cli.utils.cache import ResultCache
+
+def _git(*args):
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args], check=True, capture_output=True)
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASPM_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(sast, "image_identity", lambda image: "sha256:image")
+    monkeypatch.setattr(sast, "docker_pull", lambda image: None)
+    path = tmp_path / "repo"
+    path.mkdir()
+    monkeypatch.chdir(path)
+    _git("init", "-q")
+    (path / ".gitignore").write_text("results.json\n")
+    (path / "a.py").write_text("eval(input())\n")
+    (path / "b.py").write_text("print(1)\n")
+    _git("add", ".")
+    _git("commit", "-qm", "initial")
+    return path
+
+@pytest.fixture
+def opengrep(monkeypatch):
+    """Fake OpenGrep job reporting every line calling eval; exits with 1 on findings."""
+    runs = []
+
+    def run(self, workspace=None):
+        root = workspace or "."
+        results, scanned = [], []
+        for dirpath, _, names in os.walk(root):
+            for name in sorted(names):
+                path = os.path.relpath(os.path.join(dirpath, name), root)
+                if not path.endswith(".py"):
+                    continue
+                scanned.append(f"/app/{path}")
+                with open(os.path.join(root, path)) as file:
+                    for line_number, line in enumerate(file, 1):
+                        if "eval" in line:
+                            results.append({"check_id": "no-eval", "path": f"/app/{path}", "start": {"line": line_number}})
+        with open(os.path.join(root, "results.json"), "w") as file:
+            json.dump({"version": "1.0.1", "results": results, "errors": [], "run": len(runs),
+                       "paths": {"scanned": scanned}}, file)
+        runs.append(workspace)
+        return 1 if results else 0
+
+    monkeypatch.setattr(SASTScanner, "_run_opengrep", run)
+    return runs
+
+def _scan():
+    scanner = SASTScanner(repo_url="https://example.com/repo", use_cache=False, base_ref="HEAD")
+    exit_code, result_file = scanner.run()
+    with open(result_file) as file:
+        return exit_code, json.load(file)
+
+def test_cached_findings_still_fail_the_scan(repo, opengrep):
+    assert _scan()[0] == 1
+    exit_code, result = _scan()
+    assert len(opengrep) == 1
+    assert exit_code == 1
+    assert [record["path"] for record in result["results"]] == ["/app/a.py"]
+
+def test_findings_are_cached_when_opengrep_reports_them_with_exit_code_1(repo, opengrep):
+    _scan()
+    (repo / "c.py").write_text("print(2)\n")
+    exit_code, result = _scan()
+    # Only the new file is scanned; a.py's finding comes from the cache
+    assert opengrep[-1] is not None and len(opengrep) == 2
+    assert exit_code == 1
+    assert sorted(result["paths"]["scanned"]) == ["/app/a.py", "/app/b.py", "/app/c.py"]
+
+def test_top_level_fields_come_from_the_current_run(repo, opengrep):
+    _scan()
+    assert "run" not in _scan()[1]
+    (repo / "c.py").write_text("print(2)\n")
+    assert _scan()[1]["run"] == 1
+
+@pytest.mark.parametrize("writes_output", [False, True])
+def test_failed_scan_is_not_cached(repo, monkeypatch, writes_output):
+    monkeypatch.setattr(sast.GitInfo, "get_tree_hash", staticmethod(lambda ignore=(): "tree"))
+    (repo / "results.json").write_text('{"results": [], "stale": true}')
+
+    def run(self, workspace=None):
+        if writes_output:
+            (repo / "results.json").write_text('{"results": []}')
+        return 2
+
+    scanner = SASTScanner(repo_url="https://example.com/repo")
+    monkeypatch.setattr(SASTScanner, "_run_opengrep", run)
+    assert scanner.run()[0] == 2
+    assert ResultCache().entries() == []
+
+def test_stale_result_is_removed_before_scanning(repo, monkeypatch):
+    (repo / "results.json").write_text('{"results": [], "stale": true}')
+    monkeypatch.setattr(sast, "run_container", lambda job, on_line=None: subprocess.CompletedProcess([], 125, "", "no docker"))
+    assert SASTScanner(repo_url="https://example.com/repo")._run_opengrep() == 125
+    assert not (repo / "results.json").exists()
+
+def test_scanner_outputs_are_not_scanned(repo, opengrep, monkeypatch):
+    _scan()
+    (repo / "c.py").write_text("print(2)\n")
+    for name in ("results_json.json", "results.json.delta.json", "results_json.json.upload"):
+        (repo / name).write_text("{}")
+    copied = []
+    run = SASTScanner._run_opengrep
+
+    def record(self, workspace=None):
+        copied.extend(sorted(os.listdir(workspace)))
+        return run(self, workspace)
+
+    monkeypatch.setattr(SASTScanner, "_run_opengrep", record)
+    exit_code, result = _scan()
+    assert copied == ["c.py"]
+    assert sorted(result["paths"]["scanned"]) == ["/app/a.py", "/app/b.py", "/app/c.py"]
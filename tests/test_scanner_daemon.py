@@ -0,0 +1,59 @@
+import subprocess
+
+import pytest
+
+from aspm_cli.utils import container as container_module
+from aspm_cli.utils import scanner_daemon
+from aspm_cli.utils.container import ContainerJob, run_container
+from aspm_cli.utils.scanner_daemon import DaemonClient, ScannerDaemon, WarmContainer
+
+@pytest.fixture
+def warm_containers(monkeypatch):
+    """Fake WarmContainer lifecycle; returns the names of the running containers."""
+    running = set()
+    monkeypatch.setattr(WarmContainer, "_image_command", staticmethod(lambda image: ([], [])))
+    monkeypatch.setattr(WarmContainer, "start", lambda self: running.add(self.name))
+    monkeypatch.setattr(WarmContainer, "stop", lambda self: running.discard(self.name))
+    monkeypatch.setattr(scanner_daemon, "run_process", lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, "", ""))
+    return running
+
+def test_warm_container_of_a_temporary_mount_is_stopped(tmp_path, warm_containers):
+    daemon = ScannerDaemon(path=str(tmp_path / "aspm.sock"))
+    daemon.run_job(ContainerJob("scanner:1", mount_target="/app", mount_source=str(tmp_path / "aspm-sast-1"), temporary_mount=True))
+    assert warm_containers == set() and daemon.containers == {}
+
+    daemon.run_job(ContainerJob("scanner:1", mount_target="/app", mount_source=str(tmp_path)))
+    assert len(warm_containers) == 1 and len(daemon.containers) == 1
+
+def test_temporary_mount_skips_the_daemon(monkeypatch):
+    class Backend:
+        name = "docker"
+
+        def command(self, job):
+            return ["scanner"]
+
+        def popen_kwargs(self, job):
+            return {}
+
+    monkeypatch.setattr("aspm_cli.utils.backends.backend_for", lambda image: Backend())
+    monkeypatch.setattr(DaemonClient, "available", lambda self: True)
+    monkeypatch.setattr(DaemonClient, "run", lambda self, job, sink=None: pytest.fail("sent to the daemon"))
+    monkeypatch.setattr(container_module, "run_process", lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, "", ""))
+    result = run_container(ContainerJob("scanner:1", mount_target="/app", mount_source="/tmp/aspm-sast-1", temporary_mount=True))
+    assert result.args == ["scanner"]
+
+def test_cancel_removes_the_warm_containers_of_the_run(tmp_path, warm_containers, monkeypatch):
+    daemon = ScannerDaemon(path=str(tmp_path / "aspm.sock"))
+    stopped = []
+
+    def run_process(cmd, on_start=None, **kwargs):
+        on_start(object())
+        # Cancelled while the job runs in the warm container
+        stopped.extend(daemon.handle({"op": "cancel", "run_id": "run-1"})["stopped"])
+        return subprocess.CompletedProcess(cmd, 137, "", "")
+
+    monkeypatch.setattr(scanner_daemon, "run_process", run_process)
+    result = daemon.run_job(ContainerJob("scanner:1", mount_target="/app", mount_source=str(tmp_path), labels={"aspm-run": "run-1"}))
+    assert result["returncode"] == 137
+    assert len(stopped) == 1
+    assert warm_containers == set() and daemon.containers == {} and daemon.runs == {}
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from aspm_cli.utils.spool import LOCK_FILE, UploadSpool
+from aspm_cli.utils.upload import UploadSettings
+
+@pytest.fixture
+def spool(tmp_path):
+    return UploadSpool(str(tmp_path / "spool"), max_bytes=1000)
+
+@pytest.fixture
+def artifact(tmp_path):
+    def make(name, size):
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        return str(path)
+    return make
+
+def _add(spool, path):
+    return spool.add(path, "https://example.com", 1, "label", "IAC")
+
+def test_entries_are_listed_oldest_first_with_their_checksum(spool, artifact):
+    first = _add(spool, artifact("a.json", 10))
+    second = _add(spool, artifact("b.json", 20))
+    entries = spool.entries()
+    assert [entry["id"] for entry in entries] == [first, second]
+    assert entries[1]["file"] == "b.json" and entries[1]["size"] == 20 and len(entries[1]["sha256"]) == 64
+
+def test_claim_is_exclusive_until_released(spool, artifact):
+    entry_id = _add(spool, artifact("a.json", 10))
+    assert spool.claim(entry_id)
+    assert not spool.claim(entry_id)
+    spool.release(entry_id)
+    assert spool.claim(entry_id)
+
+def test_lock_of_an_exited_process_is_taken_over(spool, artifact, monkeypatch):
+    entry_id = _add(spool, artifact("a.json", 10))
+    with open(os.path.join(spool.path, entry_id, LOCK_FILE), "w") as file:
+        file.write("999999")
+    monkeypatch.setattr("aspm_cli.utils.spool._pid_alive", lambda pid: False)
+    assert spool.claim(entry_id)
+
+def test_claim_of_a_removed_entry_fails(spool, artifact):
+    entry_id = _add(spool, artifact("a.json", 10))
+    spool.remove(entry_id)
+    assert not spool.claim(entry_id)
+
+def test_prune_evicts_the_oldest_unlocked_entries(spool, artifact):
+    oldest = _add(spool, artifact("a.json", 400))
+    locked = _add(spool, artifact("b.json", 400))
+    spool.claim(locked)
+    newest = _add(spool, artifact("c.json", 400))
+    # Adding c.json went over 1000 bytes: a.json is evicted, the locked b.json and the new entry stay
+    assert [entry["id"] for entry in spool.entries()] == [locked, newest]
+    assert oldest not in os.listdir(spool.path)
+
+def test_prune_keeps_the_entry_just_added(spool, artifact):
+    entry_id = _add(spool, artifact("big.json", 2000))
+    assert [entry["id"] for entry in spool.entries()] == [entry_id]
+
+def test_backoff_delay_is_bounded(monkeypatch):
+    monkeypatch.setenv("ACCUKNOX_UPLOAD_BACKOFF", "2")
+    settings = UploadSettings()
+    assert all(0 <= settings.backoff_delay(0) <= 2 for _ in range(100))
+    assert all(0 <= settings.backoff_delay(20) <= settings.max_backoff for _ in range(100))
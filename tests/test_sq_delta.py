@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aspm_cli.scan.sq_delta import Watermarks, filter_updated_since, latest_update
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASPM_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+def test_concurrent_watermark_updates_are_all_kept():
+    keys = [f"project-{i}" for i in range(400)]
+    # Separate instances, as separate scans in one process would use
+    instances = [Watermarks("https://sonar.example.com/", "org") for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda item: instances[item[0] % 4].set(item[1], "2024-01-01T00:00:00+0000"), enumerate(keys)))
+    watermarks = Watermarks("https://sonar.example.com", "org")
+    assert all(watermarks.get(key) == "2024-01-01T00:00:00+0000" for key in keys)
+
+def test_watermarks_are_scoped_by_server():
+    Watermarks("https://a.example.com").set("project", "2024-01-01T00:00:00+0000")
+    assert Watermarks("https://b.example.com").get("project") is None
+
+def test_filter_updated_since_keeps_findings_at_the_watermark():
+    data = {"issues": [
+        {"key": "old", "updateDate": "2024-01-01T00:00:00+0000"},
+        {"key": "same", "updateDate": "2024-01-02T00:00:00+0000"},
+        {"key": "new", "updateDate": "2024-01-03T00:00:00+0000"},
+    ]}
+    assert latest_update(data) == "2024-01-03T00:00:00+0000"
+    data, kept, dropped = filter_updated_since(data, "2024-01-02T00:00:00+0000")
+    assert [item["key"] for item in data["issues"]] == ["same", "new"]
+    assert (kept, dropped) == (2, 1)
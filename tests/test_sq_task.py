@@ -0,0 +1,64 @@
+from aspm_cli.scan import sq_task
+from aspm_cli.scan.sq_task import QUALITY_GATE_FAILED, AnalysisTask, read_report_task
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+class FakeSession:
+    """Answers /api/ce/task with the given task statuses in turn and the quality gate with gate."""
+
+    def __init__(self, statuses, gate="OK"):
+        self.statuses = list(statuses)
+        self.gate = gate
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append((url, params))
+        if url.endswith("/api/ce/task"):
+            status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+            return FakeResponse({"task": {"id": params["id"], "status": status, "analysisId": "analysis-1"}})
+        return FakeResponse({"projectStatus": {"status": self.gate}})
+
+def _task(session, timeout=300):
+    task = AnalysisTask("https://sonar.example.com/", "token", "task-1", timeout=timeout)
+    task.session = session
+    return task
+
+def test_wait_polls_with_backoff_until_the_task_finishes(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(sq_task.time, "sleep", sleeps.append)
+    session = FakeSession(["PENDING", "IN_PROGRESS", "IN_PROGRESS", "SUCCESS"])
+    messages = []
+
+    task = _task(session).wait(on_status=messages.append, interval=1, max_interval=2)
+    assert task["status"] == "SUCCESS"
+    assert sleeps == [1, 1.5, 2]
+    assert messages == ["analysis pending", "analysis in progress", "analysis in progress"]
+    assert session.requests[0] == ("https://sonar.example.com/api/ce/task", {"id": "task-1"})
+
+def test_wait_gives_up_at_the_timeout(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(sq_task.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(sq_task.time, "sleep", lambda seconds: clock.__setitem__(0, clock[0] + seconds))
+    assert _task(FakeSession(["PENDING"]), timeout=10).wait(interval=1, max_interval=5) is None
+
+def test_returncode_follows_the_task_and_quality_gate():
+    assert _task(FakeSession(["SUCCESS"], gate="OK")).returncode({"status": "SUCCESS", "analysisId": "a"}) == 0
+    assert _task(FakeSession(["SUCCESS"], gate="ERROR")).returncode({"status": "SUCCESS", "analysisId": "a"}) == QUALITY_GATE_FAILED
+    assert _task(FakeSession(["FAILED"])).returncode({"status": "FAILED", "errorMessage": "boom"}) == QUALITY_GATE_FAILED
+    assert _task(FakeSession(["PENDING"])).returncode(None) == QUALITY_GATE_FAILED
+
+def test_read_report_task(tmp_path):
+    path = tmp_path / "report-task.txt"
+    path.write_text("projectKey=demo\nceTaskId=task-1\nceTaskUrl=https://sonar.example.com/api/ce/task?id=task-1\n")
+    report = read_report_task(str(path))
+    assert report["ceTaskId"] == "task-1"
+    assert report["ceTaskUrl"] == "https://sonar.example.com/api/ce/task?id=task-1"
+    assert read_report_task(str(tmp_path / "missing.txt")) is None
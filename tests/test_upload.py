@@ -0,0 +1,124 @@
+import gzip
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+from aspm_cli.utils.upload import ArtifactUploader, UploadSettings
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                length = int(self.rfile.readline().split(b";")[0], 16)
+                if length == 0:
+                    self.rfile.readline()
+                    break
+                body += self.rfile.read(length)
+                self.rfile.readline()
+        else:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append((dict(self.headers), body))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.requests, httpd.statuses = [], []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = tmp_path / "results.json"
+    path.write_text(json.dumps([{"id": i, "message": "finding " * 20} for i in range(20000)]))
+    return path
+
+def _uploader(server, monkeypatch, compress):
+    monkeypatch.setenv("ACCUKNOX_UPLOAD_COMPRESS", "TRUE" if compress else "FALSE")
+    monkeypatch.setenv("ACCUKNOX_UPLOAD_BACKOFF", "0")
+    return ArtifactUploader(f"http://127.0.0.1:{server.server_port}", 1, "token", settings=UploadSettings())
+
+def _file_part(headers, body):
+    boundary = headers["Content-Type"].split("boundary=", 1)[1].encode()
+    parts = body.split(b"--" + boundary)
+    assert parts[-1] == b"--\r\n" and len(parts) == 3
+    part_headers, content = parts[1].split(b"\r\n\r\n", 1)
+    return part_headers.decode(), content[:-len(b"\r\n")]
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_single_request_upload_streams_the_artifact(server, artifact, monkeypatch, compress):
+    stats = _uploader(server, monkeypatch, compress).upload(str(artifact), "IAC")
+    headers, body = server.requests[0]
+    part_headers, content = _file_part(headers, body)
+    if compress:
+        assert headers.get("Transfer-Encoding") == "chunked"
+        assert 'filename="results.json.gz"' in part_headers and "application/gzip" in part_headers
+        content = gzip.decompress(content)
+    else:
+        assert int(headers["Content-Length"]) == len(body)
+        assert 'filename="results.json"' in part_headers
+    assert content == artifact.read_bytes()
+    assert stats["chunks"] == 1
+    if compress:
+        assert stats["sent_bytes"] < stats["raw_bytes"]
+    else:
+        assert stats["sent_bytes"] == stats["raw_bytes"]
+
+def test_retried_request_resends_the_whole_artifact(server, artifact, monkeypatch):
+    server.statuses = [503]
+    stats = _uploader(server, monkeypatch, True).upload(str(artifact), "IAC")
+    assert stats["retries"] == 1
+    first, second = (gzip.decompress(_file_part(*request)[1]) for request in server.requests)
+    assert first == second == artifact.read_bytes()
+
+def _tracking_upload(uploader, monkeypatch):
+    """Replace uploader.upload with a slow fake; returns the list of in-flight counts seen."""
+    lock = threading.Lock()
+    in_flight = [0]
+    seen = []
+
+    def upload(result_file, data_type, label=None):
+        with lock:
+            in_flight[0] += 1
+            seen.append(in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        if result_file == "bad.json":
+            raise OSError("unreadable")
+        return {"file": result_file}
+
+    monkeypatch.setattr(uploader, "upload", upload)
+    return seen
+
+def test_upload_many_bounds_the_uploads_in_flight(monkeypatch):
+    monkeypatch.setenv("ACCUKNOX_UPLOAD_CONCURRENCY", "2")
+    uploader = ArtifactUploader("https://example.com", 1, "token")
+    seen = _tracking_upload(uploader, monkeypatch)
+    jobs = [(f"{i}.json", "IAC", None) for i in range(6)] + [("bad.json", "IAC", None)]
+    results = uploader.upload_many(jobs)
+    assert max(seen) == 2
+    # In job order, failures included
+    assert [result["file"] for result in results] == [job[0] for job in jobs]
+    assert results[-1]["error"] == "unreadable" and all("error" not in result for result in results[:-1])
+
+def test_upload_many_max_workers_overrides_the_pool_size(monkeypatch):
+    monkeypatch.setenv("ACCUKNOX_UPLOAD_CONCURRENCY", "2")
+    uploader = ArtifactUploader("https://example.com", 1, "token")
+    seen = _tracking_upload(uploader, monkeypatch)
+    uploader.upload_many([(f"{i}.json", "IAC", None) for i in range(6)], max_workers=3)
+    assert max(seen) == 3
+    assert uploader.upload_many([]) == []